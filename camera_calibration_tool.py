@@ -0,0 +1,115 @@
+import argparse
+import time
+import cv2
+import numpy as np
+from mods.camera_calibration import save_calibration, compute_fov
+from yolo_camera_tool import scan_cameras
+
+
+def find_corners(gray, pattern_size):
+    """检测棋盘格角点并做亚像素精化，未找到时返回None"""
+    flags = cv2.CALIB_CB_ADAPTIVE_THRESH | cv2.CALIB_CB_NORMALIZE_IMAGE | cv2.CALIB_CB_FAST_CHECK
+    found, corners = cv2.findChessboardCorners(gray, pattern_size, flags)
+    if not found:
+        return None
+    criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 30, 0.001)
+    return cv2.cornerSubPix(gray, corners, (11, 11), (-1, -1), criteria)
+
+def capture_views(camera_id, pattern_size, width, height, min_views=15, auto_interval=None):
+    """从摄像头采集棋盘格视图
+
+    按 c 采集当前视图，按 q 结束采集；指定auto_interval时每隔该秒数自动采集。
+    """
+    cap = cv2.VideoCapture(camera_id, cv2.CAP_V4L2)
+    if not cap.isOpened():
+        print(f"无法打开摄像头: {camera_id}")
+        return [], None
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+
+    views = []
+    image_size = None
+    last_capture = 0.0
+    print(f"按 c 采集视图，按 q 结束采集（至少 {min_views} 个视图）...")
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            print("无法读取摄像头帧")
+            break
+        image_size = (frame.shape[1], frame.shape[0])
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        corners = find_corners(gray, pattern_size)
+
+        display = frame.copy()
+        if corners is not None:
+            cv2.drawChessboardCorners(display, pattern_size, corners, True)
+        cv2.putText(display, f"views: {len(views)}/{min_views}", (20, 40),
+                    cv2.FONT_HERSHEY_SIMPLEX, 1.0, (0, 255, 0), 2)
+        cv2.imshow("Camera Calibration", display)
+
+        key = cv2.waitKey(1) & 0xFF
+        auto = auto_interval and time.time() - last_capture >= auto_interval
+        if corners is not None and (key == ord('c') or auto):
+            views.append(corners)
+            last_capture = time.time()
+            print(f"已采集视图 {len(views)}")
+        if key == ord('q'):
+            break
+
+    cap.release()
+    cv2.destroyAllWindows()
+    return views, image_size
+
+def calibrate(views, pattern_size, square_size, image_size):
+    """由角点视图求解相机内参和畸变系数"""
+    cols, rows = pattern_size
+    object_points = np.zeros((rows * cols, 3), np.float32)
+    object_points[:, :2] = np.mgrid[0:cols, 0:rows].T.reshape(-1, 2) * square_size
+
+    rms, camera_matrix, dist_coeffs, _, _ = cv2.calibrateCamera(
+        [object_points] * len(views), views, image_size, None, None)
+    return rms, camera_matrix, dist_coeffs
+
+def main():
+    parser = argparse.ArgumentParser(description="摄像头棋盘格标定工具")
+    parser.add_argument('--camera', type=int, default=None, help='摄像头ID（不指定则自动选择）')
+    parser.add_argument('--cols', type=int, default=9, help='棋盘格每行内角点数')
+    parser.add_argument('--rows', type=int, default=6, help='棋盘格每列内角点数')
+    parser.add_argument('--square', type=float, default=25.0, help='棋盘格方格边长(毫米)')
+    parser.add_argument('--width', type=int, default=1920, help='采集宽度')
+    parser.add_argument('--height', type=int, default=1080, help='采集高度')
+    parser.add_argument('--min-views', type=int, default=15, help='最少视图数')
+    parser.add_argument('--auto', type=float, default=None, help='自动采集间隔(秒)，不指定则手动按c采集')
+    parser.add_argument('--output', type=str, default='mods/camera_calib.npz', help='标定结果输出文件')
+    args = parser.parse_args()
+
+    if args.camera is None:
+        available = scan_cameras()
+        if not available:
+            print("未检测到可用摄像头！")
+            return
+        camera_id = available[0]
+        print(f"自动选择摄像头: {camera_id}")
+    else:
+        camera_id = args.camera
+
+    pattern_size = (args.cols, args.rows)
+    views, image_size = capture_views(camera_id, pattern_size, args.width, args.height,
+                                      args.min_views, args.auto)
+    if len(views) < args.min_views:
+        print(f"视图数不足: {len(views)} < {args.min_views}，未进行标定")
+        return
+
+    print("正在标定...")
+    rms, camera_matrix, dist_coeffs = calibrate(views, pattern_size, args.square, image_size)
+    h_fov, v_fov = compute_fov(camera_matrix, image_size)
+    print(f"重投影误差: {rms:.4f} 像素")
+    print(f"相机内参:\n{camera_matrix}")
+    print(f"畸变系数: {dist_coeffs.ravel()}")
+    print(f"水平视场角: {h_fov:.2f}°, 垂直视场角: {v_fov:.2f}°")
+
+    save_calibration(args.output, camera_matrix, dist_coeffs, image_size, rms)
+    print(f"标定结果已保存到: {args.output}")
+
+if __name__ == '__main__':
+    main()
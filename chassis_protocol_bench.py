@@ -0,0 +1,115 @@
+"""
+底盘协议对比工具
+比较ASCII行协议与二进制帧协议的每条命令字节数、编解码耗时、理论吞吐量，
+以及二进制协议请求应答时的往返延迟。默认使用模拟底盘，指定--port时使用真实串口
+"""
+
+import argparse
+import random
+import time
+import numpy as np
+import serial
+from mods.chassis_protocol import FrameDecoder, FLAG_ACK, encode_command, format_command, parse_command
+from mods.mock_serial import MockChassis
+
+
+def make_commands(count, decimals, seed=0):
+    """生成随机底盘命令"""
+    rng = random.Random(seed)
+    commands = []
+    for _ in range(count):
+        angle = rng.uniform(-180, 180)
+        if abs(angle) < 1:
+            commands.append('S')
+        else:
+            commands.append(format_command('R' if angle > 0 else 'L', abs(angle), decimals))
+    return commands
+
+def bench_encoding(commands, protocol):
+    """测量编码、解码耗时和每条命令字节数"""
+    start = time.perf_counter()
+    if protocol == 'ascii':
+        frames = [(command + '\n').encode() for command in commands]
+    else:
+        frames = [encode_command(command, seq) for seq, command in enumerate(commands)]
+    encode_time = time.perf_counter() - start
+
+    stream = b''.join(frames)
+    start = time.perf_counter()
+    if protocol == 'ascii':
+        decoded = [parse_command(line.decode()) for line in stream.split(b'\n') if line]
+    else:
+        decoded = FrameDecoder().feed(stream)
+    decode_time = time.perf_counter() - start
+    assert len(decoded) == len(commands)
+
+    return {
+        'bytes_per_command': len(stream) / len(commands),
+        'encode_us': encode_time / len(commands) * 1e6,
+        'decode_us': decode_time / len(commands) * 1e6
+    }
+
+def bench_ack(port, baudrate, count, decimals, corrupt_rate=0.0, timeout=0.1):
+    """测量二进制协议请求应答时的往返延迟和丢失率"""
+    if port:
+        link = serial.Serial(port, baudrate, timeout=timeout)
+    else:
+        link = MockChassis('mock', baudrate, timeout=timeout, corrupt_rate=corrupt_rate)
+    decoder = FrameDecoder()
+    rtts = []
+    lost = 0
+    for seq, command in enumerate(make_commands(count, decimals, seed=1)):
+        seq &= 0xFF
+        start = time.perf_counter()
+        link.write(encode_command(command, seq, ack=True))
+        acked = False
+        while time.perf_counter() - start < timeout and not acked:
+            for frame in decoder.feed(link.read(max(1, getattr(link, 'in_waiting', 0)))):
+                if frame['flags'] & FLAG_ACK and frame['seq'] == seq:
+                    acked = True
+        if acked:
+            rtts.append(time.perf_counter() - start)
+        else:
+            lost += 1
+    link.close()
+    remote_errors = link._decoder.crc_errors if isinstance(link, MockChassis) else None
+
+    rtts = np.array(rtts) if rtts else np.zeros(1)
+    return {
+        'rtt_ms': float(rtts.mean() * 1000),
+        'rtt_p95_ms': float(np.percentile(rtts, 95) * 1000),
+        'lost': lost,
+        'crc_errors': decoder.crc_errors,
+        'remote_crc_errors': remote_errors
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="底盘ASCII/二进制协议对比")
+    parser.add_argument('--port', type=str, default=None, help='真实底盘串口（不指定则使用模拟底盘）')
+    parser.add_argument('--baudrate', type=int, default=115200, help='波特率')
+    parser.add_argument('--count', type=int, default=10000, help='编解码测试命令数')
+    parser.add_argument('--ack-count', type=int, default=500, help='应答测试命令数')
+    parser.add_argument('--corrupt-rate', type=float, default=0.0, help='模拟底盘的错字节比例')
+    args = parser.parse_args()
+
+    # 当前ASCII协议只发送整数角度，ascii-0.01为同等精度下的ASCII对照，二进制协议为0.01度
+    results = {
+        'ascii': bench_encoding(make_commands(args.count, 0), 'ascii'),
+        'ascii-0.01': bench_encoding(make_commands(args.count, 2), 'ascii'),
+        'binary': bench_encoding(make_commands(args.count, 2), 'binary')
+    }
+    print(f"{'协议':<12}{'字节/命令':>10}{'编码(us)':>10}{'解码(us)':>10}{'线路耗时(ms)':>14}{'最大命令/秒':>12}")
+    for protocol, result in results.items():
+        wire_time = result['bytes_per_command'] * 10 / args.baudrate
+        print(f"{protocol:<12}{result['bytes_per_command']:>10.2f}{result['encode_us']:>10.2f}"
+              f"{result['decode_us']:>10.2f}{wire_time * 1000:>14.3f}{1 / wire_time:>12.0f}")
+
+    ack = bench_ack(args.port, args.baudrate, args.ack_count, 2, args.corrupt_rate)
+    print(f"\n二进制协议应答（{'串口 ' + args.port if args.port else '模拟底盘'}）:")
+    print(f"  往返延迟: 平均 {ack['rtt_ms']:.3f}ms, P95 {ack['rtt_p95_ms']:.3f}ms")
+    print(f"  丢失: {ack['lost']}/{args.ack_count}, 应答CRC错误: {ack['crc_errors']}")
+    if ack['remote_crc_errors'] is not None:
+        print(f"  底盘侧CRC错误: {ack['remote_crc_errors']}")
+
+if __name__ == '__main__':
+    main()
@@ -5,13 +5,33 @@ import logging
 import threading
 import platform
 import os
-from ultralytics.models.yolo import YOLO
-from typing import List, Dict, Optional, Tuple
+import argparse
+import queue
+import multiprocessing
+from typing import Callable, List, Dict, Optional, Tuple
 from collections import deque
 from stepper.device import Device
 from stepper.stepper_core.parameters import DeviceParams
 from stepper.stepper_core.configs import Address
 from mods.DeviceManager import DeviceManager
+from mods.detections import parse_results, fuse_detections, compute_roi, empty_detections, FUSED_DETECTION_DTYPE
+from mods.tracker import MultiObjectTracker
+from mods.inference_backend import load_model, supports_dynamic_imgsz, SUPPORTED_BACKENDS
+from mods.process_detector import SharedFrameRing, inference_worker
+from mods.motion_gate import MotionGate
+from mods.adaptive_resolution import ResolutionController
+from mods.camera_calibration import load_calibration
+from mods.target_selection import TargetSelector
+from mods.aim_controller import AimController, AxisController
+from mods.pitch_motion import PitchMotion
+from mods.cached_stepper import CachedStepper
+from mods.latency_compensation import LatencyCompensator
+from mods.chassis_protocol import FrameDecoder, TelemetryDecoder, FLAG_ACK, encode_command, format_command
+from mods.serial_transport import AsyncSerialTransport
+from mods.chassis_telemetry import ChassisTelemetry
+from mods.search_planner import SearchPlanner
+from mods.fire_control import FireController
+from mods.pipeline import Pipeline
 
 # 配置日志
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -46,10 +66,10 @@ if is_raspberry_pi():
         logger.info("使用真实的串口模块")
     except ImportError:
         logger.warning("无法导入串口模块，使用模拟串口模块")
-        from mods.mock_serial import Serial as serial
+        from mods import mock_serial as serial
 else:
     logger.info("检测到非树莓派环境，底盘串口使用模拟串口模块")
-    from mods.mock_serial import Serial as serial
+    from mods import mock_serial as serial
 
 # 条件导入GPIO模块
 if is_raspberry_pi():
@@ -68,7 +88,7 @@ if is_raspberry_pi():
     import serial
     logger.info("使用真实的串口模块")
 else:
-    from mods.mock_serial import Serial as serial
+    from mods import mock_serial as serial
     logger.info("检测到非树莓派环境，底盘串口使用模拟串口模块")
 
 # 条件导入串口模块
@@ -78,10 +98,10 @@ if is_raspberry_pi():
         logger.info("使用真实的串口模块")
     except ImportError:
         logger.warning("无法导入串口模块，使用模拟串口模块")
-        from mods.mock_serial import Serial as serial
+        from mods import mock_serial as serial
 else:
     logger.info("检测到非树莓派环境，使用模拟串口模块")
-    from mods.mock_serial import Serial as serial
+    from mods import mock_serial as serial
 
 # 配置常量
 CAMERA_SOURCE = 0  # 摄像头源
@@ -90,85 +110,395 @@ TCP_SERVER_PORT = 8080  #  配置TCP服务器端口
 SERIAL_PORT_A = '/dev/ttyUSB0'  # A串口 - 底盘STM32
 SERIAL_PORT_B = '/dev/ttyUSB1'  # B串口 - 步进电机y轴
 SERIAL_BAUDRATE = 115200
+# 底盘命令语义（需与STM32固件一致，见mods/chassis_protocol.py）:
+#   absolute: R/L为相对初始朝向的目标角度，重复发送同一命令不会继续转动（支持合并、去重和保活重发），0度发送"R0"
+#   relative: R/L为相对当前朝向的转动量（原固件语义），0度发送"S"；命令不可合并或重发，输出级关闭这些功能
+CHASSIS_SETPOINT_MODE = 'absolute'
+CHASSIS_ANGLE_LIMIT = 180.0  # 底盘目标角度范围(±度，相对初始朝向)，也是单条命令可表达的最大角度
+CHASSIS_COALESCE_WINDOW = 0.02  # 底盘命令合并窗口(秒)
+CHASSIS_KEEPALIVE_INTERVAL = 0.5  # 底盘命令保活重发间隔(秒)
+CHASSIS_PROTOCOL = 'ascii'  # 底盘通信协议: ascii（"R12\n"）/ binary（带CRC的定长帧，角度精度0.01度）
+CHASSIS_ACK = False  # 二进制协议下是否请求底盘应答
+CHASSIS_ACK_TIMEOUT = 0.1  # 应答超时时间(秒)，超时后重发最新命令
+CHASSIS_TELEMETRY_ENABLED = True  # 是否解析底盘上报的航向遥测（无遥测时按已发命令估计底盘转动）
+CHASSIS_TELEMETRY_LATENCY = 0.005  # 底盘航向采样到开始上报的延迟(秒)
+CHASSIS_TELEMETRY_TIMEOUT = 0.5  # 超过该时间没有遥测时视为失效(秒)
 FIRE_GPIO_PIN = 18  # 开火GPIO引脚
+FIRE_PULSE_WIDTH = 0.1  # 开火脉冲宽度(秒)
+FIRE_COOLDOWN = 0.5  # 两次开火最短间隔(秒)
+FIRE_BURST_LIMIT = 3  # 连发窗口内最多开火次数，0表示不限制
+FIRE_BURST_WINDOW = 2.0  # 连发限制窗口(秒)
+GUN_SPEED = 500  # 俯仰电机速度(步/秒)
+GUN_ACCELERATION = 1000  # 俯仰电机加速度(步/秒²)
+GUN_ANGLE_LIMIT = 45.0  # 俯仰行程范围(±度，相对初始位置)
 
 # 摄像头参数
-CAMERA_H_FOV = 85  # 水平视场角(度)
-CAMERA_V_FOV = CAMERA_H_FOV * (9/16)  # 垂直视场角(度)
 IMAGE_WIDTH = 1920
 IMAGE_HEIGHT = 1080
+CAMERA_H_FOV = 85  # 水平视场角(度)，无标定文件时使用
+CAMERA_DIST_COEFFS = None  # 镜头畸变系数 (k1, k2, p1, p2, k3)，None表示无畸变，无标定文件时使用
+CAMERA_CALIBRATION_FILE = 'mods/camera_calib.npz'  # 标定文件（由camera_calibration_tool.py生成）
+ANGLE_LUT_STEP = 4  # 像素-角度查找表网格间距(像素)
+CAMERA_THREADED = True  # 是否使用独立线程采集
+CAMERA_BUFFER_SIZE = 2  # 采集环形缓冲区大小（帧）
+
+# 模型参数
+MODEL_PATH = 'mods/best.pt'  # YOLO权重路径
+MODEL_BACKEND = 'pytorch'  # 推理后端: pytorch / onnx / openvino / ncnn
+MODEL_IMGSZ = 640  # 模型输入尺寸
+ADAPTIVE_IMGSZ_ENABLED = True  # 是否按目标尺寸和耗时预算自适应选择推理尺寸
+IMGSZ_CHOICES = (320, 416, 512, 640)  # 候选推理尺寸
+INFERENCE_LATENCY_BUDGET = 0.15  # 单帧推理耗时预算(秒)
+INFERENCE_LATENCY_DECAY = 10.0  # 未被选中尺寸的耗时估计衰减回面积缩放估计的时间常数(秒)
+MIN_TARGET_PIXELS = 24  # 目标缩放到模型输入后的最小边长(像素)
+DETECTOR_WORKERS = 0  # 推理进程数，0表示使用单个推理线程
+WORKER_START_TIMEOUT = 120  # 等待推理进程加载模型的超时时间(秒)
+WORKER_RESULT_TIMEOUT = 2.0  # 单帧推理结果超时时间(秒)，超时后跳过该帧
 
 # 控制参数
 AIM_THRESHOLD = 2.0  # 瞄准阈值(度)
-SEARCH_ANGLE = 25  # 搜索角度(度)
+SEARCH_PATTERN = 'last_seen'  # 搜索模式: sweep（往返扫描）/ coverage（最久未扫描优先）/ last_seen（从丢失方向向外扩展）
+SEARCH_OVERLAP = 0.2  # 相邻搜索方向视场重叠比例
+SEARCH_DWELL_INFERENCES = 2  # 每个搜索方向到位后需要的推理结果数
+SEARCH_MAX_DWELL = 1.5  # 推理停滞时每个方向的最长停留时间(秒)
+SEARCH_SETTLE_TOLERANCE = 3.0  # 底盘航向与搜索角度之差小于该值时视为到位(度)
+SEARCH_REVISIT_INTERVAL = 10.0  # 扫描超过该时间的方向视为未扫描(秒)
+AIM_CONTROL_RATE = 100  # 瞄准控制频率(Hz)
+AIM_TARGET_TIMEOUT = 0.5  # 目标估计有效时间(秒)，超时后停止瞄准输出
+AIM_ACTUATION_DELAY = 0.05  # 命令生效到反映在图像中的延迟(秒)
+AIM_YAW_SCHEDULE = [  # 水平轴增益调度 (误差上限(度), 增益)
+    (AIM_THRESHOLD, {'kp': 0.3, 'ki': 0.5, 'kd': 0.0, 'kf': 1.0}),  # 接近目标时小增益+积分消除稳态误差
+    (float('inf'), {'kp': 0.6, 'ki': 0.0, 'kd': 0.01, 'kf': 1.0}),  # 大误差时快速转向
+]
+AIM_PITCH_SCHEDULE = [  # 俯仰轴增益调度
+    (AIM_THRESHOLD, {'kp': 0.4, 'ki': 0.5, 'kd': 0.0, 'kf': 1.0}),
+    (float('inf'), {'kp': 0.7, 'ki': 0.0, 'kd': 0.01, 'kf': 1.0}),
+]
+AIM_YAW_MAX_RATE = 90.0  # 水平轴最大转速(度/秒)
+AIM_PITCH_MAX_RATE = 60.0  # 俯仰轴最大转速(度/秒)
+AIM_YAW_COMMAND_INTERVAL = 0.05  # 底盘命令最小间隔(秒)
+AIM_PITCH_COMMAND_INTERVAL = 0.02  # 俯仰命令最小间隔(秒)
+LATENCY_COMPENSATION_ENABLED = True  # 是否按目标角速度预测命令生效时刻的目标位置
+LATENCY_MAX_LEAD = 0.5  # 最大预测时长(秒)
+LATENCY_EGO_RATE_WINDOW = 0.1  # 估计底盘自身转速的时间窗口(秒)，与跟踪器速度估计的时间尺度相当
 DETECTION_AVERAGE_COUNT = 3  # 检测结果平均次数
-MAIN_LOOP_SLEEP = 0.05  # 主循环休眠时间(秒)
+DETECTION_FUSION_IOU = 0.5  # 多帧检测结果关联IoU阈值
+ROI_ENABLED = True  # 锁定目标后是否只在目标周围区域推理
+ROI_PADDING = 1.0  # 裁剪区域每侧扩展比例（相对于目标框宽高）
+ROI_MIN_SIZE = 320  # 裁剪区域最小边长(像素)
+ROI_FULL_FRAME_INTERVAL = 10  # 每隔多少次推理强制执行一次全帧推理
+MOTION_GATE_ENABLED = True  # 静止场景是否跳过推理
+MOTION_GATE_WIDTH = 160  # 运动检测降采样宽度(像素)
+MOTION_PIXEL_THRESHOLD = 12  # 灰度变化阈值
+MOTION_RATIO_THRESHOLD = 0.005  # 变化像素比例阈值
+MOTION_MAX_AGE = 1.0  # 最长跳过时间(秒)，超过后强制推理
+TRACKING_ENABLED = True  # 是否使用多目标跟踪器（关闭时使用多帧融合结果）
+TRACK_HIGH_CONF = 0.5  # 跟踪高置信度检测阈值
+TRACK_LOW_CONF = 0.1  # 跟踪低置信度检测阈值
+TRACK_MAX_AGE = 0.5  # 跟踪丢失后保留时间(秒)
+TRACK_MIN_HITS = 2  # 跟踪确认所需关联次数
+TARGET_CLASS = 0  # 瞄准的目标类别
+TARGET_SCORE_WEIGHTS = {  # 目标选择评分权重（离中心距离、置信度、尺寸、跟踪时长）
+    'center': 1.0,
+    'confidence': 0.2,
+    'size': 0.1,
+    'age': 0.2,
+}
+PIPELINE_QUEUE_SIZE = 1  # 阶段间队列长度（各阶段只处理最新数据，处理不过来时丢弃旧数据）
+CAPTURE_RETRY_INTERVAL = 0.05  # 取帧失败后的重试间隔(秒)
+PIPELINE_STATS_INTERVAL = 10.0  # 流水线统计日志间隔(秒)
 
 class SerialController:
-    """串口控制器"""
+    """串口控制器
+    
+    串口在DeviceManager中注册，读写经由异步串口传输层（AsyncSerialTransport）完成，
+    调用线程不会阻塞在串口上；收到的数据通过on_receive回调交给上层。
+    
+    send_command()将命令放入传输层写队列；submit_command()提交到输出级，由写线程发送：
+    窗口内的多条命令只发送最新一条，与上次发送相同的命令不再发送，
+    空闲超过保活间隔时重发最后一条命令。
+    
+    命令统一使用规范化字符串（如 "R12.35"），ascii协议下按行发送，
+    binary协议下编码为带序号和CRC16的定长帧，可选请求应答。
+    """
     
-    def __init__(self, port: str, baudrate: int = 115200):
+    def __init__(self, port: str, device_manager: DeviceManager, transport: AsyncSerialTransport,
+                 name: str = "chassis", baudrate: int = 115200, coalesce_window: float = 0.02,
+                 keepalive_interval: Optional[float] = 0.5, suppress_unchanged: bool = True,
+                 protocol: str = 'ascii', ack: bool = False, ack_timeout: float = 0.1):
+        """
+        Args:
+            port: 串口路径
+            device_manager: 设备管理器
+            transport: 异步串口传输层
+            name: 在设备管理器中注册的设备名称
+            baudrate: 波特率
+            coalesce_window: 两次发送之间的最小间隔(秒)，期间提交的命令合并为最新一条
+            keepalive_interval: 保活重发间隔(秒)，None表示不重发
+            suppress_unchanged: 是否丢弃与上次发送相同的命令
+            protocol: 通信协议，ascii或binary
+            ack: binary协议下是否请求应答
+            ack_timeout: 应答超时时间(秒)
+        """
+        if protocol not in ('ascii', 'binary'):
+            raise ValueError(f"不支持的协议: {protocol}")
         self.port = port
+        self.name = name
         self.baudrate = baudrate
+        self.device_manager = device_manager
+        self.transport = transport
         self.serial = None
+        self.on_receive: Optional[Callable[[bytes], None]] = None  # 收到数据时的回调（在传输层线程中调用）
+        self.protocol = protocol
+        self.ack = ack and protocol == 'binary'
+        self.ack_timeout = ack_timeout
+        self.seq = 0  # 二进制帧序号
+        self.pending_acks: Dict[int, Tuple[float, str]] = {}  # 序号 -> (发送时间, 命令)
+        self.decoder = FrameDecoder(skip=(TelemetryDecoder,))  # 跳过同一串口上的遥测帧
+        self.latency = 0.0  # 命令发送延迟(秒)，写入耗时与传输耗时的滑动平均
+        self.queue_delay = 0.0  # 命令在输出级中的等待时间(秒)，滑动平均
+        
+        # 输出级
+        self.coalesce_window = coalesce_window
+        self.keepalive_interval = keepalive_interval
+        self.suppress_unchanged = suppress_unchanged
+        self.condition = threading.Condition()
+        self.pending_command = None
+        self.pending_since = None
+        self.last_sent_command = None
+        self.last_write_time = None
+        self.writer_thread = None
+        self.running = False
+        
+        # 统计信息
+        self.submitted = 0
+        self.sent = 0
+        self.coalesced = 0  # 被窗口内更新的命令覆盖
+        self.suppressed = 0  # 与上次发送相同而丢弃
+        self.keepalives = 0
+        self.bytes_sent = 0
+        self.start_time = None
+        self.acked = 0
+        self.ack_timeouts = 0
+        self.ack_rtt = 0.0  # 应答往返时间(秒)，滑动平均
         
     def connect(self) -> bool:
-        """连接串口"""
+        """注册串口，启动异步读写和输出级写线程"""
         try:
-            self.serial = serial.Serial(self.port, self.baudrate, timeout=1)
+            self.device_manager.register_serial(self.name, self.port, self.baudrate)
+            self.serial = self.device_manager.get_device(self.name)
+            self.transport.open_port(self.name, on_data=self._on_data)
             logger.info(f"串口 {self.port} 连接成功")
-            return True
         except Exception as e:
             logger.error(f"串口 {self.port} 连接失败: {e}")
             return False
             
+        self.running = True
+        self.start_time = time.monotonic()
+        self.writer_thread = threading.Thread(target=self._writer_loop, name=f"SerialWriter-{self.port}", daemon=True)
+        self.writer_thread.start()
+        return True
+        
+    def encode(self, command: str) -> bytes:
+        """按当前协议编码命令"""
+        if self.protocol == 'ascii':
+            return (command + '\n').encode()
+        with self.condition:
+            seq = self.seq
+            self.seq = (self.seq + 1) & 0xFF
+            if self.ack:
+                self.pending_acks[seq] = (time.monotonic(), command)
+        return encode_command(command, seq, self.ack)
+            
     def send_command(self, command: str) -> bool:
-        """发送命令到串口"""
+        """发送命令到串口（放入传输层写队列，不等待写入完成）"""
         if not self.serial or not self.serial.is_open:
             logger.error("串口未连接")
             return False
             
         try:
-            self.serial.write((command + '\n').encode())
+            data = self.encode(command)
+            if not self.transport.write(self.name, data):
+                logger.error("串口传输未启动")
+                return False
+            # 传输层写入延迟 + 按波特率计算的传输耗时（每字节10位）
+            write_latency = self.transport.get_stats(self.name).get('write_latency_ms', 0.0) / 1000
+            self.latency = write_latency + len(data) * 10 / self.baudrate
+            self.bytes_sent += len(data)
             return True
         except Exception as e:
             logger.error(f"发送命令失败: {e}")
             return False
             
+    def submit_command(self, command: str):
+        """提交命令到输出级（非阻塞）"""
+        with self.condition:
+            self.submitted += 1
+            if self.pending_command is not None:
+                self.coalesced += 1
+            else:
+                self.pending_since = time.monotonic()
+            self.pending_command = command
+            self.condition.notify()
+            
+    def _next_command(self) -> Optional[Tuple[str, bool, float]]:
+        """等待下一条需要发送的命令，返回(命令, 是否为保活, 等待时间)，停止时返回None"""
+        with self.condition:
+            while self.running:
+                now = time.monotonic()
+                self._expire_acks(now)
+                if self.pending_command is not None:
+                    wait = self.last_write_time + self.coalesce_window - now if self.last_write_time else 0.0
+                    if wait <= 0:
+                        command, self.pending_command = self.pending_command, None
+                        return command, False, now - self.pending_since
+                    self.condition.wait(wait)
+                elif self.keepalive_interval and self.last_sent_command is not None:
+                    wait = self.last_write_time + self.keepalive_interval - now
+                    if wait <= 0:
+                        return self.last_sent_command, True, 0.0
+                    self.condition.wait(min(wait, self.ack_timeout) if self.pending_acks else wait)
+                else:
+                    self.condition.wait(self.ack_timeout if self.pending_acks else None)
+            return None
+            
+    def _writer_loop(self):
+        """写线程主循环"""
+        while True:
+            item = self._next_command()
+            if item is None:
+                break
+            command, keepalive, waited = item
+            
+            if not keepalive and self.suppress_unchanged and command == self.last_sent_command:
+                self.suppressed += 1
+                continue
+                
+            success = self.send_command(command)
+            with self.condition:
+                # 发送失败时同样更新时间，避免保活重发空转
+                self.last_write_time = time.monotonic()
+                if success:
+                    self.last_sent_command = command
+                    self.sent += 1
+                    self.keepalives += keepalive
+                    if not keepalive:
+                        self.queue_delay = 0.9 * self.queue_delay + 0.1 * waited if self.queue_delay else waited
+            
+    def _on_data(self, data: bytes):
+        """传输层收到数据：转交上层，并在二进制协议下匹配应答帧"""
+        if self.on_receive is not None:
+            self.on_receive(data)
+        if not self.ack:
+            return
+            
+        now = time.monotonic()
+        with self.condition:
+            for frame in self.decoder.feed(data):
+                if not frame['flags'] & FLAG_ACK or frame['seq'] not in self.pending_acks:
+                    continue
+                sent_at, _ = self.pending_acks.pop(frame['seq'])
+                self.acked += 1
+                rtt = now - sent_at
+                self.ack_rtt = 0.9 * self.ack_rtt + 0.1 * rtt if self.ack_rtt else rtt
+                
+    def _expire_acks(self, now: float):
+        """处理应答超时，超时的是当前生效的命令时重新发送（需持有condition）"""
+        expired = [seq for seq, (sent_at, _) in self.pending_acks.items() if now - sent_at > self.ack_timeout]
+        for seq in expired:
+            _, command = self.pending_acks.pop(seq)
+            self.ack_timeouts += 1
+            logger.warning(f"底盘命令 {command} (序号 {seq}) 应答超时")
+            if command == self.last_sent_command and self.pending_command is None:
+                self.last_sent_command = None
+                self.pending_command = command
+                self.pending_since = now
+                        
+    def get_stats(self) -> Dict:
+        """获取输出级统计信息"""
+        elapsed = time.monotonic() - self.start_time if self.start_time else 0.0
+        return {
+            'submitted': self.submitted,
+            'sent': self.sent,
+            'coalesced': self.coalesced,
+            'suppressed': self.suppressed,
+            'keepalives': self.keepalives,
+            'bytes_sent': self.bytes_sent,
+            'bytes_per_second': self.bytes_sent / elapsed if elapsed > 0 else 0.0,
+            'commands_per_second': self.sent / elapsed if elapsed > 0 else 0.0,
+            'queue_delay_ms': self.queue_delay * 1000,
+            'protocol': self.protocol,
+            'acked': self.acked,
+            'ack_timeouts': self.ack_timeouts,
+            'ack_rtt_ms': self.ack_rtt * 1000,
+            'crc_errors': self.decoder.crc_errors,
+            'skipped_frames': self.decoder.skipped,
+            'transport': self.transport.get_stats(self.name)
+        }
+            
     def close(self):
-        """关闭串口"""
-        if self.serial and self.serial.is_open:
-            self.serial.close()
+        """停止写线程和异步读写（串口由设备管理器统一关闭）"""
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+        if self.writer_thread is not None:
+            self.writer_thread.join(timeout=1.0)
+            self.writer_thread = None
+        self.transport.close_port(self.name)
 
 class GPIOController:
-    """GPIO控制器"""
+    """GPIO控制器（开火脉冲由后台线程输出，fire()不阻塞）"""
     
-    def __init__(self, fire_pin: int):
+    def __init__(self, fire_pin: int, pulse_width: float = 0.1, cooldown: float = 0.5,
+                 burst_limit: int = 3, burst_window: float = 2.0):
         self.fire_pin = fire_pin
         GPIO.setmode(GPIO.BCM)
         GPIO.setup(self.fire_pin, GPIO.OUT)
         GPIO.output(self.fire_pin, GPIO.LOW)
+        self.fire_control = FireController(GPIO, fire_pin, pulse_width=pulse_width, cooldown=cooldown,
+                                           burst_limit=burst_limit, burst_window=burst_window)
+        self.fire_control.start()
         
-    def fire(self):
-        """执行开火"""
-        try:
-            GPIO.output(self.fire_pin, GPIO.HIGH)
-            time.sleep(0.1)  # 开火脉冲持续时间
-            GPIO.output(self.fire_pin, GPIO.LOW)
-            logger.info("开火执行")
-        except Exception as e:
-            logger.error(f"开火失败: {e}")
+    def fire(self, frame_timestamp: Optional[float] = None) -> bool:
+        """请求开火（冷却中或超过连发限制时忽略）
+        
+        Args:
+            frame_timestamp: 触发开火的帧采集时刻，用于统计帧到开火的延迟
+            
+        Returns:
+            bool: 是否受理
+        """
+        return self.fire_control.trigger(frame_timestamp)
             
     def cleanup(self):
-        """清理GPIO"""
+        """停止开火线程并清理GPIO"""
+        self.fire_control.stop()
         GPIO.cleanup()
 
 class CameraController:
-    """摄像头控制器（使用V4L2）"""
+    """摄像头控制器（使用V4L2）
     
-    def __init__(self, source: int = 1):
+    threaded=True时由独立线程持续读取帧，只在小环形缓冲区中保留最新帧，
+    主循环通过get_latest_frame()非阻塞地获取最新帧及其采集时间戳和序号。
+    """
+    
+    def __init__(self, source: int = 1, threaded: bool = False, buffer_size: int = 2):
         self.source = source
         self.cap = None
+        self.threaded = threaded
+        
+        # 采集线程状态
+        self.frame_buffer = deque(maxlen=buffer_size)  # 仅保留最新的若干帧
+        self.lock = threading.Lock()
+        self.capture_thread = None
+        self.running = False
+        
+        # 统计信息
+        self.frame_seq = 0  # 已采集帧序号
+        self.last_read_seq = 0  # 上次被取走的帧序号
+        self.dropped_frames = 0  # 未被取走即被覆盖的帧数
+        self.read_failures = 0
+        self.start_time = None
         
     def initialize(self) -> bool:
         """初始化摄像头"""
@@ -182,14 +512,102 @@ class CameraController:
             # 设置分辨率
             self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, IMAGE_WIDTH)
             self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, IMAGE_HEIGHT)
-            logger.info("摄像头初始化成功")
+            # 尽量减少驱动队列中积压的旧帧
+            self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+            
+            if self.threaded:
+                self.start()
+            logger.info(f"摄像头初始化成功（{'线程采集' if self.threaded else '同步采集'}）")
             return True
         except Exception as e:
             logger.error(f"摄像头初始化失败: {e}")
             return False
             
+    def start(self):
+        """启动采集线程"""
+        if self.running:
+            return
+        self.running = True
+        self.start_time = time.monotonic()
+        self.capture_thread = threading.Thread(target=self._capture_loop, daemon=True)
+        self.capture_thread.start()
+        
+    def stop(self):
+        """停止采集线程"""
+        self.running = False
+        if self.capture_thread and self.capture_thread.is_alive():
+            self.capture_thread.join(timeout=2)
+        self.capture_thread = None
+        
+    def _capture_loop(self):
+        """采集循环：持续读取帧，只保留最新帧"""
+        while self.running:
+            if not self.cap or not self.cap.isOpened():
+                time.sleep(0.01)
+                continue
+                
+            ret, frame = self.cap.read()
+            timestamp = time.monotonic()
+            if not ret:
+                self.read_failures += 1
+                time.sleep(0.01)
+                continue
+                
+            with self.lock:
+                self.frame_seq += 1
+                self.frame_buffer.append({
+                    'frame': frame,
+                    'seq': self.frame_seq,
+                    'timestamp': timestamp
+                })
+                
+    def get_latest_frame(self) -> Optional[Dict]:
+        """非阻塞获取最新帧
+        
+        Returns:
+            Optional[Dict]: 包含以下字段的帧数据，无可用帧时返回None
+                frame: 图像数据
+                seq: 帧序号（单调递增）
+                timestamp: 采集时间（time.monotonic()）
+                age: 距采集时刻的时间(秒)
+                dropped: 自上次取帧以来被丢弃的帧数
+        """
+        if not self.threaded:
+            # 同步模式：直接读取一帧
+            frame = self.get_frame()
+            if frame is None:
+                return None
+            self.frame_seq += 1
+            self.last_read_seq = self.frame_seq
+            return {
+                'frame': frame,
+                'seq': self.frame_seq,
+                'timestamp': time.monotonic(),
+                'age': 0.0,
+                'dropped': 0
+            }
+            
+        with self.lock:
+            if not self.frame_buffer:
+                return None
+            packet = dict(self.frame_buffer[-1])
+            dropped = max(0, packet['seq'] - self.last_read_seq - 1)
+            if packet['seq'] > self.last_read_seq:
+                self.dropped_frames += dropped
+                self.last_read_seq = packet['seq']
+            else:
+                dropped = 0
+                
+        packet['age'] = time.monotonic() - packet['timestamp']
+        packet['dropped'] = dropped
+        return packet
+            
     def get_frame(self) -> Optional[np.ndarray]:
         """获取帧数据"""
+        if self.threaded:
+            packet = self.get_latest_frame()
+            return packet['frame'] if packet else None
+            
         if not self.cap or not self.cap.isOpened():
             return None
             
@@ -198,90 +616,553 @@ class CameraController:
             return frame
         return None
         
+    def get_stats(self) -> Dict:
+        """获取采集统计信息"""
+        with self.lock:
+            latest_timestamp = self.frame_buffer[-1]['timestamp'] if self.frame_buffer else None
+            captured = self.frame_seq
+            
+        elapsed = time.monotonic() - self.start_time if self.start_time else 0.0
+        return {
+            'captured': captured,
+            'dropped': self.dropped_frames,
+            'read_failures': self.read_failures,
+            'fps': captured / elapsed if elapsed > 0 else 0.0,
+            'latest_age': time.monotonic() - latest_timestamp if latest_timestamp else None
+        }
+        
     def release(self):
         """释放摄像头"""
+        self.stop()
         if self.cap:
             self.cap.release()
 
 class YOLODetector:
-    """YOLO11目标检测器（非阻塞方式）"""
+    """YOLO11目标检测器（非阻塞方式）
     
-    def __init__(self):
+    使用一个常驻推理线程，输入为深度为1的"最新帧"槽位：
+    推理进行中提交的新帧会覆盖尚未处理的旧帧，保证不会出现重叠推理和乱序结果。
+    
+    提交帧时若给出目标预测位置(roi)，只在其周围的裁剪区域推理，
+    并按full_frame_interval周期或目标丢失时执行全帧推理。
+    """
+    
+    def __init__(self, model_path: str = MODEL_PATH, backend: str = MODEL_BACKEND,
+                 roi_enabled: bool = ROI_ENABLED, full_frame_interval: int = ROI_FULL_FRAME_INTERVAL,
+                 roi_padding: float = ROI_PADDING, roi_min_size: int = ROI_MIN_SIZE):
         self.model = None
+        self.model_path = model_path
+        self.backend = backend
         self.detection_queue = deque(maxlen=DETECTION_AVERAGE_COUNT)
         self.lock = threading.Lock()
         
+        # 推理线程及输入槽位
+        self.slot_condition = threading.Condition()
+        self.pending_frame = None  # 待推理的最新帧
+        self.worker = None
+        self.running = False
+        self.latest_result = None
+        
+        # 统计计数
+        self.frames_submitted = 0
+        self.frames_inferred = 0
+        self.frames_dropped = 0
+        self.last_inference_time = 0.0
+        
+        # 区域推理参数及状态
+        self.roi_enabled = roi_enabled
+        self.full_frame_interval = full_frame_interval
+        self.roi_padding = roi_padding
+        self.roi_min_size = roi_min_size
+        self.inferences_since_full = 0
+        self.force_full_frame = True
+        self.roi_inferences = 0
+        self.full_inferences = 0
+        self.roi_latency = 0.0  # 区域推理耗时滑动平均(秒)
+        self.full_latency = 0.0  # 全帧推理耗时滑动平均(秒)
+        
+        # 自适应推理尺寸
+        self.resolution = ResolutionController(
+            sizes=IMGSZ_CHOICES,
+            latency_budget=INFERENCE_LATENCY_BUDGET,
+            min_target_pixels=MIN_TARGET_PIXELS,
+            decay_time=INFERENCE_LATENCY_DECAY
+        ) if ADAPTIVE_IMGSZ_ENABLED else None
+        
+    @property
+    def warmup_sizes(self) -> tuple:
+        """加载模型时需要预热的推理尺寸（自适应分辨率的候选尺寸）"""
+        return tuple(IMGSZ_CHOICES) if self.resolution else ()
+        
     def initialize(self) -> bool:
         """初始化YOLO模型"""
         try:
-            self.model = YOLO('mods/best.pt')
-            logger.info("YOLO检测器初始化成功")
+            self.model, self.backend = load_model(self.model_path, self.backend, MODEL_IMGSZ, self.warmup_sizes)
+            self._check_resolution_support()
+            self.start()
+            logger.info(f"YOLO检测器初始化成功（{self.backend}后端）")
             return True
         except Exception as e:
             logger.error(f"YOLO检测器初始化失败: {e}")
             return False
             
-    def detect_async(self, frame: np.ndarray):
-        """异步目标检测"""
-        def detection_task():
-            try:
-                # 使用YOLO模型进行目标检测
-                results = self.model.predict(frame, verbose=False)
-                
-                detections = []
-                for result in results:
-                    boxes = result.boxes
-                    if boxes is not None:
-                        for box in boxes:
-                            # 获取检测结果
-                            x1, y1, x2, y2 = box.xyxy[0].cpu().numpy()
-                            confidence = box.conf[0].cpu().numpy()
-                            class_id = int(box.cls[0].cpu().numpy())
-                            
-                            detections.append({
-                                'class': class_id,
-                                'confidence': float(confidence),
-                                'bbox': [float(x1), float(y1), float(x2), float(y2)],
-                                'id': len(detections) + 1
-                            })
+    def start(self):
+        """启动推理线程"""
+        if self.running:
+            return
+        self.running = True
+        self.worker = threading.Thread(target=self._inference_loop, daemon=True)
+        self.worker.start()
+        
+    def stop(self):
+        """停止推理线程"""
+        with self.slot_condition:
+            self.running = False
+            self.slot_condition.notify_all()
+        if self.worker and self.worker.is_alive():
+            self.worker.join(timeout=2)
+        self.worker = None
+            
+    def detect_async(self, frame: np.ndarray, seq: Optional[int] = None, timestamp: Optional[float] = None,
+                     roi: Optional[np.ndarray] = None):
+        """异步目标检测（提交帧到推理线程，立即返回）
+        
+        Args:
+            frame: 图像数据
+            seq: 源帧序号，缺省时使用提交计数
+            timestamp: 源帧采集时间（time.monotonic()），缺省时使用当前时间
+            roi: 目标在该帧中的预测检测框，为None时执行全帧推理
+        """
+        with self.slot_condition:
+            self.frames_submitted += 1
+            if self.pending_frame is not None:
+                # 上一帧尚未开始推理，直接被新帧替换
+                self.frames_dropped += 1
+            self.pending_frame = {
+                'frame': frame,
+                'seq': seq if seq is not None else self.frames_submitted,
+                'timestamp': timestamp if timestamp is not None else time.monotonic(),
+                'roi': roi
+            }
+            self.slot_condition.notify()
+            
+    def _inference_loop(self):
+        """推理循环"""
+        while True:
+            with self.slot_condition:
+                while self.running and self.pending_frame is None:
+                    self.slot_condition.wait()
+                if not self.running:
+                    break
+                task = self.pending_frame
+                self.pending_frame = None
                 
-                with self.lock:
-                    self.detection_queue.append(detections)
+            crop = self._select_crop(task['frame'], task['roi'])
+            imgsz = self._select_imgsz(task['frame'], crop)
+            try:
+                start = time.monotonic()
+                detections = self._run_inference(task['frame'], crop, imgsz)
+                inference_time = time.monotonic() - start
             except Exception as e:
                 logger.error(f"目标检测失败: {e}")
+                continue
+                
+            self._publish_result(task, crop, detections, inference_time, imgsz)
+            
+    def _publish_result(self, task: Dict, crop: Optional[Tuple[int, int, int, int]], detections: np.ndarray,
+                        inference_time: float, imgsz: Optional[int] = None):
+        """发布一次推理结果"""
+        self._update_roi_stats(crop, detections, inference_time)
+        if self.resolution and imgsz:
+            self.resolution.record(imgsz, inference_time)
+            self.resolution.observe_targets(detections['bbox'])
+        result = {
+            'seq': task['seq'],
+            'timestamp': task['timestamp'],
+            'detections': detections,
+            'inference_time': inference_time,
+            'crop': crop,
+            'imgsz': imgsz
+        }
+        with self.lock:
+            self.detection_queue.append(result)
+            self.latest_result = result
+            self.frames_inferred += 1
+            self.last_inference_time = inference_time
                 
-        threading.Thread(target=detection_task, daemon=True).start()
+    def _check_resolution_support(self):
+        """固定输入尺寸的后端不支持自适应推理尺寸"""
+        if self.resolution and not supports_dynamic_imgsz(self.backend):
+            logger.warning(f"{self.backend} 后端输入尺寸固定，禁用自适应推理尺寸")
+            self.resolution = None
+            
+    def _select_imgsz(self, frame: np.ndarray, crop: Optional[Tuple[int, int, int, int]]) -> Optional[int]:
+        """为本次推理选择输入尺寸，返回None表示使用模型默认尺寸"""
+        if not self.resolution:
+            return None
+        if crop is None:
+            return self.resolution.select(frame.shape)
+        x1, y1, x2, y2 = crop
+        return self.resolution.select((y2 - y1, x2 - x1))
         
-    def get_average_detection(self) -> List[Dict]:
-        """获取平均检测结果"""
+    def _select_crop(self, frame: np.ndarray, roi: Optional[np.ndarray]) -> Optional[Tuple[int, int, int, int]]:
+        """决定本次推理的裁剪区域，返回None表示全帧推理"""
+        if (not self.roi_enabled or roi is None or self.force_full_frame
+                or self.inferences_since_full >= self.full_frame_interval):
+            return None
+        return compute_roi(roi, frame.shape, self.roi_padding, self.roi_min_size)
+        
+    def _update_roi_stats(self, crop: Optional[Tuple[int, int, int, int]], detections: np.ndarray,
+                          inference_time: float):
+        """更新区域/全帧推理统计，区域内未检测到目标时下一次强制全帧推理"""
+        if crop is None:
+            self.full_inferences += 1
+            self.inferences_since_full = 0
+            self.force_full_frame = False
+            self.full_latency = inference_time if self.full_inferences == 1 else 0.9 * self.full_latency + 0.1 * inference_time
+        else:
+            self.roi_inferences += 1
+            self.inferences_since_full += 1
+            self.force_full_frame = len(detections) == 0
+            self.roi_latency = inference_time if self.roi_inferences == 1 else 0.9 * self.roi_latency + 0.1 * inference_time
+            
+    def _run_inference(self, frame: np.ndarray, crop: Optional[Tuple[int, int, int, int]] = None,
+                       imgsz: Optional[int] = None) -> np.ndarray:
+        """对单帧（或其裁剪区域）执行YOLO推理，返回全帧坐标下的DETECTION_DTYPE结构化数组"""
+        kwargs = {'imgsz': imgsz} if imgsz else {}
+        if crop is None:
+            results = self.model.predict(frame, verbose=False, **kwargs)
+            return parse_results(results)
+            
+        x1, y1, x2, y2 = crop
+        results = self.model.predict(frame[y1:y2, x1:x2], verbose=False, **kwargs)
+        detections = parse_results(results)
+        # 映射回全帧坐标
+        detections['bbox'] += np.array([x1, y1, x1, y1], dtype=np.float32)
+        return detections
+        
+    def get_latest_result(self) -> Optional[Dict]:
+        """获取最新一次推理结果（含源帧序号和时间戳）"""
+        with self.lock:
+            return self.latest_result
+            
+    def get_stats(self) -> Dict:
+        """获取推理统计信息"""
+        with self.slot_condition:
+            submitted = self.frames_submitted
+            dropped = self.frames_dropped
+        with self.lock:
+            inferred = self.frames_inferred
+            inference_time = self.last_inference_time
+        return {
+            'submitted': submitted,
+            'inferred': inferred,
+            'dropped': dropped,
+            'inference_time': inference_time,
+            'roi_inferences': self.roi_inferences,
+            'full_inferences': self.full_inferences,
+            'roi_latency': self.roi_latency,
+            'full_latency': self.full_latency,
+            'resolution': self.resolution.get_stats() if self.resolution else None
+        }
+        
+    def get_average_detection(self) -> np.ndarray:
+        """获取平均检测结果
+        
+        对最近DETECTION_AVERAGE_COUNT次检测结果按IoU关联，同一目标的检测框
+        按置信度加权平均，每个物理目标只输出一个检测，并附带稳定度
+        （目标在参与融合的帧中出现的比例）。
+        
+        Returns:
+            np.ndarray: FUSED_DETECTION_DTYPE类型的检测结果数组
+        """
         with self.lock:
             if not self.detection_queue:
-                return []
-                
-            # 对最近DETECTION_AVERAGE_COUNT次检测结果取平均
-            all_detections = []
-            for detections in self.detection_queue:
-                all_detections.extend(detections)
-                
-            # TODO: 实现检测结果平均逻辑
-            return all_detections
+                return empty_detections(FUSED_DETECTION_DTYPE)
+            results = list(self.detection_queue)
             
-    def _mock_detection(self, frame: np.ndarray) -> List[Dict]:
+        # 展开为数组以便向量化处理
+        detections = np.concatenate([result['detections'] for result in results])
+        if len(detections) == 0:
+            return empty_detections(FUSED_DETECTION_DTYPE)
+        frame_ids = np.repeat(np.arange(len(results)), [len(result['detections']) for result in results])
+            
+        fused_boxes, fused_scores, fused_classes, stability = fuse_detections(
+            detections['bbox'], detections['conf'], detections['cls'], frame_ids,
+            num_frames=len(results), iou_threshold=DETECTION_FUSION_IOU
+        )
+        
+        fused = np.empty(len(fused_boxes), dtype=FUSED_DETECTION_DTYPE)
+        fused['bbox'] = fused_boxes
+        fused['conf'] = fused_scores
+        fused['cls'] = fused_classes
+        fused['stability'] = stability
+        return fused
+            
+    def _mock_detection(self, frame: np.ndarray) -> np.ndarray:
         """模拟检测结果（用于测试）"""
         # 返回模拟的检测结果
-        return [{
-            'class': 0,
-            'confidence': 0.95,
-            'bbox': [IMAGE_WIDTH//2-50, IMAGE_HEIGHT//2-50, 
-                    IMAGE_WIDTH//2+50, IMAGE_HEIGHT//2+50],
-            'id': 1
-        }]
+        detections = np.zeros(1, dtype=FUSED_DETECTION_DTYPE)
+        detections['bbox'] = [IMAGE_WIDTH//2-50, IMAGE_HEIGHT//2-50,
+                              IMAGE_WIDTH//2+50, IMAGE_HEIGHT//2+50]
+        detections['conf'] = 0.95
+        detections['cls'] = 0
+        detections['stability'] = 1.0
+        return detections
+
+class ProcessPoolDetector(YOLODetector):
+    """多进程YOLO检测器
+    
+    帧写入共享内存环形缓冲区，由num_workers个推理进程并行处理，
+    进程间只传递槽位号和检测结果数组。结果按提交顺序交付，
+    没有空闲槽位时丢弃新提交的帧。
+    """
+    
+    def __init__(self, model_path: str = MODEL_PATH, backend: str = MODEL_BACKEND,
+                 num_workers: int = 2, **kwargs):
+        super().__init__(model_path, backend, **kwargs)
+        self.num_workers = num_workers
+        self.num_slots = num_workers + 1  # 每个进程一帧在推理，再预留一帧排队
+        self.threads_per_worker = max(1, (os.cpu_count() or 1) // num_workers)  # 各进程线程数合计不超过核数
+        
+        self.ring = None
+        self.processes = []
+        self.task_queue = None
+        self.result_queue = None
+        
+        # 以下状态受slot_condition保护
+        self.free_slots = []
+        self.in_flight = {}  # 提交编号 -> 任务信息（超时的任务保留到结果返回，期间槽位仍被占用）
+        self.next_ticket = 0
+        
+        # 顺序交付状态（仅收集线程访问）
+        self.reorder_buffer = {}
+        self.next_delivery = 0
+        self.worker_inferred = [0] * num_workers
+        self.start_time = None
+        
+    def initialize(self) -> bool:
+        """创建共享内存并启动推理进程"""
+        try:
+            ctx = multiprocessing.get_context('spawn')
+            slot_bytes = IMAGE_WIDTH * IMAGE_HEIGHT * 3
+            self.ring = SharedFrameRing(self.num_slots, slot_bytes)
+            self.free_slots = list(range(self.num_slots))
+            self.task_queue = ctx.Queue()
+            self.result_queue = ctx.Queue()
+            
+            for worker_id in range(self.num_workers):
+                process = ctx.Process(
+                    target=inference_worker,
+                    args=(worker_id, self.model_path, self.backend, MODEL_IMGSZ, self.ring.name,
+                          self.num_slots, slot_bytes, self.task_queue, self.result_queue, self.warmup_sizes,
+                          self.threads_per_worker),
+                    daemon=True
+                )
+                process.start()
+                self.processes.append(process)
+                
+            # 等待所有进程完成模型加载
+            for _ in range(self.num_workers):
+                _, worker_id, error = self.result_queue.get(timeout=WORKER_START_TIMEOUT)
+                if error:
+                    raise RuntimeError(f"推理进程 {worker_id} 加载模型失败: {error}")
+                    
+            self._check_resolution_support()
+            self.start_time = time.monotonic()
+            self.start()
+            logger.info(f"多进程YOLO检测器初始化成功（{self.num_workers}个进程，每进程{self.threads_per_worker}线程，"
+                        f"{self.backend}后端）")
+            return True
+        except Exception as e:
+            logger.error(f"多进程YOLO检测器初始化失败: {e}")
+            self.stop()
+            return False
+            
+    def stop(self):
+        """停止收集线程和推理进程，释放共享内存"""
+        self.running = False
+        if self.worker and self.worker.is_alive():
+            self.worker.join(timeout=2)
+        self.worker = None
+        
+        for _ in self.processes:
+            self.task_queue.put(None)
+        for process in self.processes:
+            process.join(timeout=2)
+            if process.is_alive():
+                process.terminate()
+        self.processes = []
+        
+        if self.ring:
+            self.ring.close()
+            self.ring = None
+            
+    def detect_async(self, frame: np.ndarray, seq: Optional[int] = None, timestamp: Optional[float] = None,
+                     roi: Optional[np.ndarray] = None):
+        """将帧写入空闲槽位并分发给推理进程，立即返回"""
+        with self.slot_condition:
+            self.frames_submitted += 1
+            if not self.running or not self.free_slots:
+                self.frames_dropped += 1
+                return
+            slot = self.free_slots.pop()
+            ticket = self.next_ticket
+            self.next_ticket += 1
+            
+        try:
+            shape = self.ring.write(slot, frame)
+        except ValueError as e:
+            logger.error(f"写入共享帧失败: {e}")
+            with self.slot_condition:
+                self.free_slots.append(slot)
+                self.in_flight[ticket] = None  # 占位，保证后续结果可以按序交付
+            return
+            
+        crop = self._select_crop(frame, roi)
+        imgsz = self._select_imgsz(frame, crop)
+        with self.slot_condition:
+            self.in_flight[ticket] = {
+                'seq': seq if seq is not None else self.frames_submitted,
+                'timestamp': timestamp if timestamp is not None else time.monotonic(),
+                'crop': crop,
+                'imgsz': imgsz,
+                'slot': slot,
+                'dispatched': time.monotonic()
+            }
+        self.task_queue.put((ticket, slot, shape, crop, imgsz))
+        
+    def _inference_loop(self):
+        """收集推理进程的结果并按提交顺序交付"""
+        while self.running:
+            try:
+                ticket, slot, worker_id, detections, inference_time, error = self.result_queue.get(timeout=0.1)
+            except queue.Empty:
+                self._expire_stale_tasks()
+                continue
+                
+            # 推理进程返回结果后才释放槽位（超时跳过的任务此时进程可能仍在读取该槽位）
+            with self.slot_condition:
+                if slot not in self.free_slots:
+                    self.free_slots.append(slot)
+                task = self.in_flight.pop(ticket, None)
+            if task is None or task.get('expired'):
+                # 已超时跳过的任务
+                continue
+                
+            self.worker_inferred[worker_id] += 1
+            if error:
+                logger.error(f"目标检测失败: {error}")
+                self.reorder_buffer[ticket] = None
+            else:
+                self.reorder_buffer[ticket] = (task, detections, inference_time)
+            self._expire_stale_tasks()
+            
+    def _expire_stale_tasks(self):
+        """跳过超时未返回的任务，并交付已按序到达的结果"""
+        now = time.monotonic()
+        with self.slot_condition:
+            for ticket, task in list(self.in_flight.items()):
+                if task is None:
+                    del self.in_flight[ticket]
+                    self.reorder_buffer[ticket] = None
+                elif not task.get('expired') and now - task['dispatched'] > WORKER_RESULT_TIMEOUT:
+                    # 只标记为跳过以便后续结果按序交付，槽位等结果返回后再释放
+                    logger.warning(f"帧 {task['seq']} 推理超时，跳过")
+                    task['expired'] = True
+                    self.frames_dropped += 1
+                    self.reorder_buffer[ticket] = None
+                    
+        while self.next_delivery in self.reorder_buffer:
+            entry = self.reorder_buffer.pop(self.next_delivery)
+            self.next_delivery += 1
+            if entry is not None:
+                task, detections, inference_time = entry
+                self._publish_result(task, task['crop'], detections, inference_time, task['imgsz'])
+                
+    def get_stats(self) -> Dict:
+        """获取推理统计信息（含各进程推理数和总吞吐率）"""
+        stats = super().get_stats()
+        elapsed = time.monotonic() - self.start_time if self.start_time else 0.0
+        stats['workers'] = self.num_workers
+        stats['threads_per_worker'] = self.threads_per_worker
+        stats['worker_inferred'] = list(self.worker_inferred)
+        stats['throughput'] = stats['inferred'] / elapsed if elapsed > 0 else 0.0
+        return stats
 
 class AngleCalculator:
-    """角度计算器"""
+    """角度计算器
     
-    @staticmethod
-    def pixel_to_angle(pixel_x: float, pixel_y: float) -> Tuple[float, float]:
+    使用针孔相机模型（含镜头畸变）将像素坐标转换为角度：
+    去畸变后的归一化坐标为(xn, yn)时，水平角 = atan(xn)，垂直角 = atan(-yn / sqrt(1 + xn²))。
+    初始化时按grid_step在整幅图像上预计算角度查找表，查询时双线性插值，
+    支持一次转换N个点。
+    """
+    
+    def __init__(self, width: int = IMAGE_WIDTH, height: int = IMAGE_HEIGHT, h_fov: float = CAMERA_H_FOV,
+                 camera_matrix: Optional[np.ndarray] = None, dist_coeffs: Optional[np.ndarray] = None,
+                 grid_step: int = ANGLE_LUT_STEP):
+        """
+        Args:
+            width: 图像宽度(像素)
+            height: 图像高度(像素)
+            h_fov: 水平视场角(度)，未提供相机内参时用于推算焦距
+            camera_matrix: 3x3相机内参矩阵，为None时由h_fov推算（方形像素，主点位于图像中心）
+            dist_coeffs: 畸变系数(k1, k2, p1, p2[, k3...])，为None时认为无畸变
+            grid_step: 查找表网格间距(像素)
+        """
+        self.width = width
+        self.height = height
+        self.grid_step = grid_step
+        
+        if camera_matrix is None:
+            focal = (width / 2) / np.tan(np.radians(h_fov) / 2)
+            camera_matrix = np.array([[focal, 0, width / 2],
+                                      [0, focal, height / 2],
+                                      [0, 0, 1]], dtype=np.float64)
+        self.camera_matrix = np.asarray(camera_matrix, dtype=np.float64)
+        self.dist_coeffs = np.zeros(5) if dist_coeffs is None else np.asarray(dist_coeffs, dtype=np.float64)
+        
+        self.lut = self._build_lut()
+        
+    def _build_lut(self) -> np.ndarray:
+        """预计算网格点上的(水平角, 垂直角)查找表，形状为(行数, 列数, 2)"""
+        xs = np.arange(0, self.width + self.grid_step, self.grid_step, dtype=np.float64)
+        ys = np.arange(0, self.height + self.grid_step, self.grid_step, dtype=np.float64)
+        grid_x, grid_y = np.meshgrid(xs, ys)
+        points = np.stack([grid_x, grid_y], axis=-1).reshape(-1, 1, 2)
+        
+        normalized = cv2.undistortPoints(points, self.camera_matrix, self.dist_coeffs).reshape(-1, 2)
+        xn, yn = normalized[:, 0], normalized[:, 1]
+        x_angle = np.degrees(np.arctan(xn))
+        y_angle = np.degrees(np.arctan2(-yn, np.sqrt(1 + xn ** 2)))  # 图像y轴向下，需要反转
+        
+        return np.stack([x_angle, y_angle], axis=-1).reshape(len(ys), len(xs), 2).astype(np.float32)
+        
+    def pixels_to_angles(self, points: np.ndarray) -> np.ndarray:
+        """批量将像素坐标转换为角度
+        
+        Args:
+            points: (N, 2) 像素坐标（图像坐标系）
+            
+        Returns:
+            np.ndarray: (N, 2) 每个点的(水平角度差, 垂直角度差)
+        """
+        points = np.asarray(points, dtype=np.float32).reshape(-1, 2)
+        rows, cols = self.lut.shape[:2]
+        
+        gx = np.clip(points[:, 0] / self.grid_step, 0, cols - 1.0001)
+        gy = np.clip(points[:, 1] / self.grid_step, 0, rows - 1.0001)
+        x0 = gx.astype(np.int32)
+        y0 = gy.astype(np.int32)
+        fx = (gx - x0)[:, None]
+        fy = (gy - y0)[:, None]
+        
+        top = self.lut[y0, x0] * (1 - fx) + self.lut[y0, x0 + 1] * fx
+        bottom = self.lut[y0 + 1, x0] * (1 - fx) + self.lut[y0 + 1, x0 + 1] * fx
+        return top * (1 - fy) + bottom * fy
+        
+    def pixel_to_angle(self, pixel_x: float, pixel_y: float) -> Tuple[float, float]:
         """像素坐标转换为角度
         
         Args:
@@ -291,17 +1172,8 @@ class AngleCalculator:
         Returns:
             Tuple[float, float]: (水平角度差, 垂直角度差)
         """
-        # 转换为以图像中心为原点的坐标
-        x = pixel_x - IMAGE_WIDTH / 2
-        y = IMAGE_HEIGHT / 2 - pixel_y  # y轴向下为正，需要反转
-        
-        # 计算水平角度差(度)
-        x_angle = (x / (IMAGE_WIDTH / 2)) * (CAMERA_H_FOV / 2)
-        
-        # 计算垂直角度差(度)
-        y_angle = (y / (IMAGE_HEIGHT / 2)) * (CAMERA_V_FOV / 2)
-        
-        return x_angle, y_angle
+        x_angle, y_angle = self.pixels_to_angles([[pixel_x, pixel_y]])[0]
+        return float(x_angle), float(y_angle)
         
     @staticmethod
     def calculate_target_center(bbox: List[float]) -> Tuple[float, float]:
@@ -313,21 +1185,99 @@ class AngleCalculator:
 class MainController:
     """主控制器"""
     
-    def __init__(self):
-        self.camera = CameraController(CAMERA_SOURCE)
-        self.yolo = YOLODetector()
-        self.serial_a = SerialController(SERIAL_PORT_A, SERIAL_BAUDRATE)  # 底盘串口
-        self.gpio = GPIOController(FIRE_GPIO_PIN)
-        self.angle_calc = AngleCalculator()
+    def __init__(self, model_path: str = MODEL_PATH, model_backend: str = MODEL_BACKEND,
+                 detector_workers: int = DETECTOR_WORKERS, latency_log: Optional[str] = None,
+                 fire_log: Optional[str] = None):
+        self.camera = CameraController(CAMERA_SOURCE, threaded=CAMERA_THREADED, buffer_size=CAMERA_BUFFER_SIZE)
+        if detector_workers > 0:
+            self.yolo = ProcessPoolDetector(model_path, model_backend, num_workers=detector_workers)
+        else:
+            self.yolo = YOLODetector(model_path, model_backend)
+        # 串口设备统一由设备管理器注册，读写经由异步传输层
+        self.device_manager = DeviceManager(serial_class=serial.Serial)
+        self.serial_transport = AsyncSerialTransport(self.device_manager)
+        # 相对转动命令不是幂等的：合并会丢失转动量，去重、保活和应答超时重发会重复转动
+        absolute = CHASSIS_SETPOINT_MODE == 'absolute'
+        self.serial_a = SerialController(SERIAL_PORT_A, self.device_manager, self.serial_transport,  # 底盘串口
+                                         name="chassis", baudrate=SERIAL_BAUDRATE,
+                                         coalesce_window=CHASSIS_COALESCE_WINDOW if absolute else 0.0,
+                                         keepalive_interval=CHASSIS_KEEPALIVE_INTERVAL if absolute else None,
+                                         suppress_unchanged=absolute,
+                                         protocol=CHASSIS_PROTOCOL, ack=CHASSIS_ACK and absolute,
+                                         ack_timeout=CHASSIS_ACK_TIMEOUT)
+        # 底盘航向遥测（在传输层线程中解析）
+        self.telemetry = ChassisTelemetry(protocol=CHASSIS_PROTOCOL, baudrate=SERIAL_BAUDRATE,
+                                          latency=CHASSIS_TELEMETRY_LATENCY, timeout=CHASSIS_TELEMETRY_TIMEOUT)
+        if CHASSIS_TELEMETRY_ENABLED:
+            self.serial_a.on_receive = self.telemetry.feed
+        self.gpio = GPIOController(FIRE_GPIO_PIN, pulse_width=FIRE_PULSE_WIDTH, cooldown=FIRE_COOLDOWN,
+                                   burst_limit=FIRE_BURST_LIMIT, burst_window=FIRE_BURST_WINDOW)
+        calibration = load_calibration(CAMERA_CALIBRATION_FILE, (IMAGE_WIDTH, IMAGE_HEIGHT))
+        if calibration is not None:
+            # 只对检测点去畸变，不对整帧做remap
+            self.angle_calc = AngleCalculator(camera_matrix=calibration['camera_matrix'],
+                                              dist_coeffs=calibration['dist_coeffs'])
+        else:
+            logger.warning(f"未找到标定文件 {CAMERA_CALIBRATION_FILE}，按视场角 {CAMERA_H_FOV}° 估算相机内参")
+            self.angle_calc = AngleCalculator(dist_coeffs=CAMERA_DIST_COEFFS)
+        self.motion_gate = MotionGate(
+            downsample_width=MOTION_GATE_WIDTH,
+            pixel_threshold=MOTION_PIXEL_THRESHOLD,
+            motion_ratio=MOTION_RATIO_THRESHOLD,
+            max_age=MOTION_MAX_AGE
+        )
+        self.tracker = MultiObjectTracker(
+            high_conf=TRACK_HIGH_CONF,
+            low_conf=TRACK_LOW_CONF,
+            max_age=TRACK_MAX_AGE,
+            min_hits=TRACK_MIN_HITS
+        )
+        self.latency = LatencyCompensator(self.angle_calc, max_lead=LATENCY_MAX_LEAD)
+        self.latency_log = latency_log  # 延迟补偿指标导出路径
+        self.fire_log = fire_log  # 开火记录导出路径
+        self.search_planner = SearchPlanner(CAMERA_H_FOV, pattern=SEARCH_PATTERN, overlap=SEARCH_OVERLAP,
+                                            dwell_inferences=SEARCH_DWELL_INFERENCES, max_dwell=SEARCH_MAX_DWELL,
+                                            settle_tolerance=SEARCH_SETTLE_TOLERANCE,
+                                            turn_rate=AIM_YAW_MAX_RATE,
+                                            revisit_interval=SEARCH_REVISIT_INTERVAL)
+        self.target_selector = TargetSelector((IMAGE_WIDTH, IMAGE_HEIGHT), target_class=TARGET_CLASS,
+                                              weights=TARGET_SCORE_WEIGHTS)
         
         # 步进电机控制
-        self.device_manager = DeviceManager()
         self.gun_device = None
+        self.gun_motion = None  # 俯仰轴异步运动控制
         self.steps_per_degree = 100  # 每度对应的步进脉冲数
+        self.gun_angle = 0.0  # 俯仰目标角度(度，受aim.pitch.lock保护)
+        
+        # 瞄准控制（独立线程，固定频率）
+        self.aim = AimController(
+            yaw=AxisController("水平", self.adjust_chassis, AIM_YAW_SCHEDULE,
+                               max_rate=AIM_YAW_MAX_RATE,
+                               resolution=0.01 if CHASSIS_PROTOCOL == 'binary' else 1.0,
+                               command_interval=AIM_YAW_COMMAND_INTERVAL,
+                               actuation_delay=AIM_ACTUATION_DELAY,
+                               feedback=self.chassis_heading_at),
+            pitch=AxisController("俯仰", self.adjust_gun, AIM_PITCH_SCHEDULE,
+                                 max_rate=AIM_PITCH_MAX_RATE, resolution=1.0 / self.steps_per_degree,
+                                 command_interval=AIM_PITCH_COMMAND_INTERVAL,
+                                 actuation_delay=AIM_ACTUATION_DELAY),
+            rate=AIM_CONTROL_RATE,
+            target_timeout=AIM_TARGET_TIMEOUT
+        )
         
-        self.current_angle = 0  # 当前角度
+        self.current_angle = 0  # 当前角度（受aim.yaw.lock保护，与水平轴累计位置一同修改）
         self.target_locked = False  # 目标锁定状态
         self.search_mode = True  # 搜索模式
+        self.last_frame_seq = 0  # 上一次处理的帧序号
+        self.last_result_seq = None  # 上一次送入跟踪器的推理结果序号
+        self.last_result_timestamp = None  # 上一次送入跟踪器的推理结果的源帧采集时间
+        self.last_search_result_seq = None  # 上一次计入搜索规划的推理结果序号
+        # 选择阶段写入、检测阶段读取的状态（受state_lock保护）
+        self.state_lock = threading.Lock()
+        self.current_target_id = None  # 当前瞄准目标的跟踪ID
+        self.current_target = None  # 当前瞄准目标（检测/跟踪结构化数组中的一行）
+        self.search_dwelling = False  # 搜索规划器是否在停留（搜索规划器只由控制阶段访问）
+        self.pipeline = None  # 主控制流水线（run()中创建）
         
     def initialize(self) -> bool:
         """初始化所有组件"""
@@ -350,19 +1300,24 @@ class MainController:
                 serial_device = self.device_manager.get_device("gun")
                 
                 # 初始化步进电机控制
-                self.gun_device = Device(
+                self.gun_device = CachedStepper(Device(
                     device_params=DeviceParams(
                         serial_connection=serial_device,
                         address=Address(0x01)
                     )
-                )
+                ))
                 self.gun_device.enable()
+                self.gun_motion = PitchMotion(self.gun_device, self.steps_per_degree,
+                                              speed=GUN_SPEED, acceleration=GUN_ACCELERATION)
+                self.gun_motion.start()
                 logger.info("步进电机设备初始化成功")
                 
             except Exception as e:
                 logger.error(f"步进电机设备初始化失败: {e}")
                 return False
                 
+            self.aim.start()
+            
             logger.info("所有组件初始化完成")
             return True
             
@@ -370,157 +1325,380 @@ class MainController:
             logger.error(f"初始化失败: {e}")
             return False
             
-    def control_chassis(self, angle: float):
-        """控制底盘转动"""
-        # 根据角度值生成转向命令
-        if angle > 0:
-            # 右转，角度限制在1-180度之间
-            angle_limited = max(1, min(180, abs(angle)))
-            command = f"R{int(angle_limited)}"
-        elif angle < 0:
-            # 左转，角度限制在1-180度之间
-            angle_limited = max(1, min(180, abs(angle)))
-            command = f"L{int(angle_limited)}"
-        else:
-            # 角度为0，发送停止命令
+    def control_chassis(self, angle: float) -> float:
+        """发送底盘命令
+        
+        Args:
+            angle: absolute模式下为目标角度（相对初始朝向），relative模式下为转动量
+            
+        Returns:
+            float: 按命令精度量化后实际发送的角度
+        """
+        # 二进制协议支持0.01度精度，ASCII协议只发送整数角度
+        decimals = 2 if self.serial_a.protocol == 'binary' else 0
+        angle = round(float(np.clip(angle, -CHASSIS_ANGLE_LIMIT, CHASSIS_ANGLE_LIMIT)), decimals)
+        if CHASSIS_SETPOINT_MODE == 'relative' and angle == 0:
+            # 相对模式下转动量为0，发送停止命令
             command = "S"
+        else:
+            # 绝对模式下0度同样作为目标角度发送（转回初始朝向），"S"只用于主动停止
+            command = format_command('L' if angle < 0 else 'R', abs(angle), decimals)
         
         logger.debug(f"发送底盘命令: {command}")
-        self.serial_a.send_command(command)
+        self.serial_a.submit_command(command)
+        return angle
+        
+    def set_chassis_angle(self, angle: float) -> float:
+        """设置底盘目标角度（限制在±CHASSIS_ANGLE_LIMIT内），返回目标角度的实际变化量"""
+        with self.aim.yaw.lock:
+            angle = float(np.clip(angle, -CHASSIS_ANGLE_LIMIT, CHASSIS_ANGLE_LIMIT))
+            if CHASSIS_SETPOINT_MODE == 'relative':
+                delta = self.control_chassis(angle - self.current_angle)
+            else:
+                delta = angle - self.current_angle
+                self.control_chassis(angle)
+            self.current_angle += delta
+        return delta
         
     def control_gun(self, angle: float):
-        """控制枪械俯仰"""
-        if not self.gun_device:
+        """控制枪械俯仰（非阻塞，新目标抢占正在进行的运动）"""
+        if not self.gun_motion:
             logger.error("步进电机设备未初始化")
             return
             
-        try:
-            # 计算目标步数
-            target_steps = int(angle * self.steps_per_degree)
-            
-            # 设置运动参数
-            self.gun_device.set_speed(500)  # 设置速度为500步/秒
-            self.gun_device.set_acceleration(1000)  # 设置加速度为1000步/秒²
-            
-            # 使用绝对位置移动
-            self.gun_device.move_to(target_steps)
-            
-            # 等待移动完成
-            while not self.gun_device.is_in_position:
-                time.sleep(0.01)  # 短暂等待，避免阻塞主循环
-                
-            logger.debug(f"炮台调整到 {angle} 度")
-            
-        except Exception as e:
-            logger.error(f"炮台调整失败: {e}")
+        self.gun_motion.move_to(angle)
+        logger.debug(f"炮台调整到 {angle} 度")
+        
+    def adjust_chassis(self, delta: float) -> float:
+        """底盘相对调整（按CHASSIS_SETPOINT_MODE发送目标角度或转动量）
+        
+        Returns:
+            float: 实际生效的调整量（目标角度到达范围边界时小于delta）
+        """
+        return self.set_chassis_angle(self.current_angle + delta)
+        
+    def adjust_gun(self, delta: float) -> float:
+        """俯仰相对调整（目标角度限制在±GUN_ANGLE_LIMIT内）
+        
+        Returns:
+            float: 实际生效的调整量（到达行程边界时小于delta）
+        """
+        with self.aim.pitch.lock:
+            angle = float(np.clip(self.gun_angle + delta, -GUN_ANGLE_LIMIT, GUN_ANGLE_LIMIT))
+            applied = angle - self.gun_angle
+            self.gun_angle = angle
+            if applied:
+                self.control_gun(angle)
+        return applied
+        
+    def chassis_heading_at(self, timestamp: float) -> Optional[float]:
+        """查询指定时刻的底盘航向（相对初始朝向），遥测失效时返回None"""
+        if not CHASSIS_TELEMETRY_ENABLED or not self.telemetry.is_alive():
+            return None
+        return self.telemetry.heading_at(timestamp)
+        
+    def ego_rotation(self, timestamp: float) -> float:
+        """指定时刻（如帧采集时刻）到当前的底盘转动量(度)，无遥测时返回0"""
+        then = self.chassis_heading_at(timestamp)
+        now = self.chassis_heading_at(time.monotonic())
+        return now - then if then is not None and now is not None else 0.0
+        
+    def ego_rate(self, timestamp: float) -> float:
+        """指定时刻之前LATENCY_EGO_RATE_WINDOW内的底盘平均转速(度/秒)
+        
+        使用水平轴的实际位置（有遥测时为航向，否则按已生效的命令估计）。
+        """
+        then = self.aim.yaw.position_at(timestamp - LATENCY_EGO_RATE_WINDOW)
+        return (self.aim.yaw.position_at(timestamp) - then) / LATENCY_EGO_RATE_WINDOW
         
     def is_target_locked(self, x_angle: float, y_angle: float) -> bool:
         """检查目标是否锁定"""
         return abs(x_angle) < AIM_THRESHOLD and abs(y_angle) < AIM_THRESHOLD
         
     def search_target(self):
-        """搜索目标模式"""
-        self.current_angle += SEARCH_ANGLE
-        self.control_chassis(self.current_angle)
-        logger.info(f"搜索模式：转动到角度 {self.current_angle}度")
-        
-    def process_detection(self, detections: List[Dict]) -> Optional[Tuple[float, float]]:
-        """处理检测结果"""
-        if not detections:
+        """搜索目标模式：由搜索规划器按底盘到位情况和推理结果决定何时转向下一个方向"""
+        now = time.monotonic()
+        heading = self.chassis_heading_at(now)
+        if not self.search_planner.active:
+            with self.aim.yaw.lock:
+                start = self.current_angle if heading is None else heading
+            self.search_planner.start(start, now)
+            
+        # 到位后的推理结果计入当前方向的停留
+        result = self.yolo.get_latest_result()
+        if result is not None and result['seq'] != self.last_search_result_seq:
+            self.last_search_result_seq = result['seq']
+            self.search_planner.record_inference(result['timestamp'], self.chassis_heading_at(result['timestamp']))
+            
+        setpoint = self.search_planner.update(heading, now)
+        if setpoint is None:
+            return
+        # 与瞄准控制线程互斥，保证底盘目标角度与水平轴累计位置一致
+        with self.aim.yaw.lock:
+            self.aim.yaw.record_external(self.set_chassis_angle(setpoint))
+        if heading is not None:
+            logger.info(f"搜索模式：转动到角度 {setpoint:.1f}度（当前航向 {heading:.1f}度）")
+        else:
+            logger.info(f"搜索模式：转动到角度 {setpoint:.1f}度")
+        
+    def update_tracks(self, timestamp: float, reuse_last: bool = False) -> np.ndarray:
+        """有新推理结果时更新跟踪器，并预测指定时刻的目标位置
+        
+        Args:
+            timestamp: 当前帧采集时间
+            reuse_last: 当前帧被运动门控跳过时为True，此时画面未变化，
+                只延长已关联跟踪的有效期，不重复更新跟踪器
+        """
+        result = self.yolo.get_latest_result()
+        if result is not None and result['seq'] != self.last_result_seq:
+            self.last_result_seq = result['seq']
+            self.last_result_timestamp = result['timestamp']
+            self.tracker.update(result['detections'], result['timestamp'])
+        elif reuse_last:
+            self.tracker.refresh(timestamp)
+        return self.tracker.predict(timestamp)
+        
+    def get_target_roi(self, detections: np.ndarray) -> Optional[np.ndarray]:
+        """获取当前瞄准目标的预测检测框，未锁定跟踪目标时返回None"""
+        with self.state_lock:
+            target_id = self.current_target_id
+        if target_id is None or 'track_id' not in detections.dtype.names:
+            return None
+        matched = detections[detections['track_id'] == target_id]
+        return matched['bbox'][0] if len(matched) else None
+        
+    def process_detection(self, detections: np.ndarray) -> Optional[Tuple[float, float]]:
+        """处理检测结果，选出得分最高的目标并返回其角度"""
+        index, center = self.target_selector.select(detections)
+        if index is None:
+            self.set_current_target(None)
             return None
             
-        # 找到离中心最近的目标
-        min_distance = float('inf')
-        best_target = None
+        self.set_current_target(detections[index])
         
-        for detection in detections:
-            if detection['class'] == 0:  # 只处理目标类别
-                x_center, y_center = self.angle_calc.calculate_target_center(detection['bbox'])
-                distance = np.sqrt((x_center - IMAGE_WIDTH/2)**2 + (y_center - IMAGE_HEIGHT/2)**2)
-                
-                if distance < min_distance:
-                    min_distance = distance
-                    best_target = detection
-                    
-        if best_target:
-            x_center, y_center = self.angle_calc.calculate_target_center(best_target['bbox'])
-            return self.angle_calc.pixel_to_angle(x_center, y_center)
+        x_angle, y_angle = self.angle_calc.pixels_to_angles(center[np.newaxis])[0]
+        return float(x_angle), float(y_angle)
+        
+    def set_current_target(self, target: Optional[np.void]):
+        """设置当前瞄准目标（仅选择阶段调用，目标ID供检测阶段选择推理区域）"""
+        with self.state_lock:
+            self.current_target = target
+            self.current_target_id = (int(target['track_id'])
+                                      if target is not None and 'track_id' in target.dtype.names else None)
+        
+    def compensate_latency(self, packet: Dict, result_timestamp: Optional[float],
+                           x_angle: float, y_angle: float) -> Tuple[float, float, float]:
+        """测量当前帧的端到端延迟并估计目标角速度
+        
+        目标角度已由跟踪器预测到帧采集时刻，瞄准控制器再按角速度外推到
+        命令生效时刻（当前时刻 + lead）。同时用新的观测验证之前的预测。
+        跟踪器的像素速度包含底盘自身转动的影响，而瞄准控制器会单独扣除测量之后的
+        自身转动，因此角速度需加回底盘转速，换算为世界坐标系下的目标角速度。
+        
+        Args:
+            packet: 当前帧
+            result_timestamp: 该帧的检测结果所依据的推理结果的源帧采集时间，尚无推理结果时为None
+            x_angle: 水平误差角(度)
+            y_angle: 垂直误差角(度)
             
-        return None
+        Returns:
+            Tuple[float, float, float]: (水平角速度, 垂直角速度, 命令执行延迟)
+        """
+        now = time.monotonic()
+        timestamp = packet['timestamp']
+        # 各段延迟均按该帧自身使用的推理结果计算（多进程乱序完成或复用旧结果时与最新结果不同）
+        inference = now - result_timestamp if result_timestamp is not None else packet['age']
+        serial_latency = self.serial_a.latency + self.serial_a.queue_delay + AIM_ACTUATION_DELAY
+        self.latency.record_latency(packet['age'], inference, serial_latency)
+        
+        x_rate = y_rate = 0.0
+        target = self.current_target
+        if LATENCY_COMPENSATION_ENABLED and target is not None and 'velocity' in target.dtype.names:
+            x_rate, y_rate = self.latency.angular_velocity(target['bbox'], target['velocity'])
+            x_rate += self.ego_rate(timestamp)
+        lead = self.latency.lead_time(serial_latency)
+        
+        # 以累计转动量换算到世界坐标系，比较预测值与之后的观测值
+        measured = (x_angle + self.aim.yaw.position_at(timestamp),
+                    y_angle + self.aim.pitch.position_at(timestamp))
+        self.latency.observe(timestamp, self.current_target_id, measured)
+        horizon = self.latency.lead_time(now + lead - timestamp)
+        self.latency.record_prediction(timestamp + horizon, self.current_target_id,
+                                       (measured[0] + x_rate * horizon, measured[1] + y_rate * horizon),
+                                       measured)
+        return x_rate, y_rate, lead
+        
+    def capture_stage(self) -> Optional[Dict]:
+        """采集阶段：取最新帧，没有新帧时不输出"""
+        packet = self.camera.get_latest_frame()
+        if packet is None:
+            logger.warning("获取帧数据失败")
+            time.sleep(CAPTURE_RETRY_INTERVAL)
+            return None
+        
+        # 没有新帧时不重复处理
+        if packet['seq'] == self.last_frame_seq:
+            return None
+        self.last_frame_seq = packet['seq']
+        
+        if packet['dropped']:
+            logger.debug(f"帧 {packet['seq']} 延迟 {packet['age']*1000:.1f}ms, 丢弃 {packet['dropped']} 帧")
+        return packet
+    
+    def detect_stage(self, packet: Dict) -> Dict:
+        """检测阶段：提交异步推理，输出跟踪器预测到帧采集时刻的目标及其所依据推理结果的源帧时间"""
+        frame = packet['frame']
+        
+        # 运动门控：画面无变化时跳过推理，复用上一次结果（搜索停留期间不跳过）
+        with self.state_lock:
+            dwelling = self.search_dwelling
+        infer = (not MOTION_GATE_ENABLED or dwelling or
+                 self.motion_gate.should_infer(frame, packet['timestamp']))
+        
+        # 获取目标：跟踪器以帧率预测目标位置，否则使用多帧融合结果
+        if TRACKING_ENABLED:
+            detections = self.update_tracks(packet['timestamp'], reuse_last=not infer)
+            result_timestamp = self.last_result_timestamp
+        else:
+            detections = self.yolo.get_average_detection()
+            result = self.yolo.get_latest_result()
+            result_timestamp = result['timestamp'] if result is not None else None
+        
+        # 异步目标检测（锁定目标时只推理目标周围区域）
+        if infer:
+            self.yolo.detect_async(frame, packet['seq'], packet['timestamp'], roi=self.get_target_roi(detections))
+        return {'packet': packet, 'detections': detections, 'result_timestamp': result_timestamp}
+    
+    def select_stage(self, item: Dict) -> Dict:
+        """选择阶段：选出目标并估计其角速度和命令执行延迟，没有目标时angles为None"""
+        packet, detections = item['packet'], item['detections']
+        angles = self.process_detection(detections) if len(detections) else None
+        if angles is None:
+            self.set_current_target(None)
+            return {'packet': packet, 'angles': None}
+        
+        # 按延迟预测命令生效时刻的目标位置
+        x_rate, y_rate, lead = self.compensate_latency(packet, item['result_timestamp'], *angles)
+        return {'packet': packet, 'angles': angles, 'rates': (x_rate, y_rate), 'lead': lead}
+    
+    def control_stage(self, item: Dict) -> Optional[Dict]:
+        """控制阶段：更新瞄准目标或执行搜索，锁定目标时输出开火请求"""
+        packet, angles = item['packet'], item['angles']
+        if angles is None:
+            # 没有检测到目标，进入搜索模式
+            self.aim.clear_target()
+            if not self.search_mode:
+                self.search_mode = True
+                logger.info("进入搜索模式")
+            self.search_target()
+            self.publish_search_state()
+            return None
+        
+        x_angle, y_angle = angles
+        if self.search_planner.active:
+            self.search_planner.finish(acquired=True)
+            self.publish_search_state()
+        
+        # 更新瞄准控制器的目标估计
+        x_rate, y_rate = item['rates']
+        self.aim.update_target(x_angle, y_angle, packet['timestamp'], x_rate, y_rate, item['lead'])
+        
+        # 检查是否锁定目标（扣除帧采集之后底盘自身的转动）
+        if not self.is_target_locked(x_angle - self.ego_rotation(packet['timestamp']), y_angle):
+            self.target_locked = False
+            return None
+        if not self.target_locked:
+            logger.info("目标锁定")
+            self.target_locked = True
+        self.search_mode = False
+        return {'timestamp': packet['timestamp']}
+    
+    def publish_search_state(self):
+        """发布搜索规划器的停留状态，供检测阶段的运动门控读取"""
+        with self.state_lock:
+            self.search_dwelling = self.search_planner.dwelling
+    
+    def fire_stage(self, request: Dict):
+        """开火阶段（非阻塞，冷却和连发限制由开火控制器处理）"""
+        self.gpio.fire(request['timestamp'])
+    
+    def build_pipeline(self) -> Pipeline:
+        """将主控制流程配置为流水线：采集 -> 检测 -> 选择 -> 控制 -> 开火
+        
+        帧、检测结果和目标估计只关心最新数据，队列满时丢弃旧数据；
+        开火请求在开火阶段忙时直接丢弃（冷却期内的请求本来也会被拒绝）。
+        """
+        pipeline = Pipeline("主控制")
+        pipeline.add_queue('frames', PIPELINE_QUEUE_SIZE, 'drop_oldest')
+        pipeline.add_queue('detections', PIPELINE_QUEUE_SIZE, 'drop_oldest')
+        pipeline.add_queue('targets', PIPELINE_QUEUE_SIZE, 'drop_oldest')
+        pipeline.add_queue('fire', 1, 'drop_newest')
+        pipeline.add_stage('capture', self.capture_stage, outputs=['frames'])
+        pipeline.add_stage('detect', self.detect_stage, input='frames', outputs=['detections'])
+        pipeline.add_stage('select', self.select_stage, input='detections', outputs=['targets'])
+        pipeline.add_stage('control', self.control_stage, input='targets', outputs=['fire'])
+        pipeline.add_stage('fire', self.fire_stage, input='fire')
+        return pipeline
+    
+    def log_stats(self):
+        """输出推理吞吐、运动门控和瞄准控制的周期统计"""
+        if isinstance(self.yolo, ProcessPoolDetector):
+            # 按进程数输出实测吞吐率，用于验证吞吐是否随进程数（核数）扩展
+            pool = self.yolo.get_stats()
+            logger.info(f"多进程推理: {pool['workers']}个进程 x {pool['threads_per_worker']}线程, "
+                        f"吞吐率 {pool['throughput']:.1f}帧/秒 (每进程 {pool['throughput'] / pool['workers']:.1f}), "
+                        f"各进程推理数 {pool['worker_inferred']}, 丢弃 {pool['dropped']}")
+        if MOTION_GATE_ENABLED:
+            gate = self.motion_gate.get_stats(self.yolo.get_stats()['inference_time'])
+            logger.info(f"运动门控: 跳过率 {gate['skip_ratio']:.1%}, 门控耗时 {gate['gate_time_ms']:.2f}ms, "
+                        f"节省CPU {gate['cpu_saved_s']:.1f}s ({gate['cpu_saved_ratio']:.1%})")
+        aim = self.aim.get_stats()
+        logger.info(f"瞄准控制: 实际频率 {aim['actual_rate']:.1f}/{aim['rate']:.0f}Hz, "
+                    f"抖动 {aim['jitter_mean_ms']:.2f}ms (p99 {aim['jitter_p99_ms']:.2f}ms, "
+                    f"最大 {aim['jitter_max_ms']:.2f}ms), 超时 {aim['overruns']}/{aim['ticks']}")
         
     def run(self):
-        """主控制循环"""
+        """运行主控制流水线，直到用户中断"""
         logger.info("主控制循环开始")
+        self.pipeline = self.build_pipeline()
         
         try:
-            while True:
-                # 获取帧数据
-                frame = self.camera.get_frame()
-                if frame is None:
-                    logger.warning("获取帧数据失败")
-                    time.sleep(MAIN_LOOP_SLEEP)
-                    continue
-                    
-                # 异步目标检测
-                self.yolo.detect_async(frame)
-                
-                # 获取平均检测结果
-                detections = self.yolo.get_average_detection()
-                
-                if detections:
-                    # 处理检测结果
-                    angles = self.process_detection(detections)
-                    
-                    if angles:
-                        x_angle, y_angle = angles
-                        
-                        # 控制瞄准
-                        self.control_chassis(x_angle)
-                        self.control_gun(y_angle)
-                        
-                        # 检查是否锁定目标
-                        if self.is_target_locked(x_angle, y_angle):
-                            if not self.target_locked:
-                                logger.info("目标锁定")
-                                self.target_locked = True
-                            
-                            # 执行开火
-                            self.gpio.fire()
-                            self.search_mode = False
-                        else:
-                            self.target_locked = False
-                    else:
-                        # 没有检测到目标，进入搜索模式
-                        if not self.search_mode:
-                            self.search_mode = True
-                            logger.info("进入搜索模式")
-                            
-                        self.search_target()
-                else:
-                    # 没有检测到目标，进入搜索模式
-                    if not self.search_mode:
-                        self.search_mode = True
-                        logger.info("进入搜索模式")
-                        
-                    self.search_target()
-                    
-                time.sleep(MAIN_LOOP_SLEEP)
-                
+            self.pipeline.start()
+            while not self.pipeline.wait(PIPELINE_STATS_INTERVAL):
+                logger.info(f"流水线: {self.pipeline.format_stats()}")
+                self.log_stats()
         except KeyboardInterrupt:
             logger.info("程序被用户中断")
         except Exception as e:
             logger.error(f"主循环异常: {e}")
         finally:
+            self.pipeline.stop()
             self.cleanup()
-            
+    
     def cleanup(self):
         """清理资源"""
         logger.info("清理资源")
+        self.aim.stop()
+        self.log_stats()
+        if self.latency_log:
+            try:
+                self.latency.export(self.latency_log)
+            except Exception as e:
+                logger.error(f"导出延迟补偿指标失败: {e}")
+        if self.fire_log:
+            try:
+                self.gpio.fire_control.export(self.fire_log)
+            except Exception as e:
+                logger.error(f"导出开火记录失败: {e}")
         self.camera.release()
+        self.yolo.stop()
         self.serial_a.close()
+        self.serial_transport.stop()
         self.gpio.cleanup()
         
         # 清理步进电机设备
+        if self.gun_motion:
+            self.gun_motion.stop()
         if self.gun_device:
             try:
                 self.gun_device.stop()
@@ -537,7 +1715,21 @@ class MainController:
             logger.error(f"清理设备管理器失败: {e}")
 
 if __name__ == '__main__':
-    controller = MainController()
+    parser = argparse.ArgumentParser(description='树莓派炮台主控制程序')
+    parser.add_argument('--model', type=str, default=MODEL_PATH, help='模型权重路径')
+    parser.add_argument('--backend', type=str, default=MODEL_BACKEND, choices=SUPPORTED_BACKENDS,
+                        help='推理后端（非pytorch后端首次运行时自动导出并缓存）')
+    parser.add_argument('--workers', type=int, default=DETECTOR_WORKERS,
+                        help='推理进程数（帧通过共享内存传递），0表示使用单个推理线程')
+    parser.add_argument('--latency-log', type=str, default=None,
+                        help='退出时将延迟与预测误差指标导出到该JSON文件')
+    parser.add_argument('--fire-log', type=str, default=None,
+                        help='退出时将开火触发时间戳导出到该JSON文件')
+    args = parser.parse_args()
+    
+    controller = MainController(model_path=args.model, model_backend=args.backend,
+                                detector_workers=args.workers, latency_log=args.latency_log,
+                                fire_log=args.fire_log)
     if controller.initialize():
         controller.run()
     else:
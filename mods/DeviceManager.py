@@ -1,4 +1,4 @@
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Callable
 import serial
 import cv2
 import logging
@@ -7,9 +7,14 @@ from contextlib import contextmanager
 class DeviceManager:
     """统一设备管理类，负责管理所有硬件设备资源"""
     
-    def __init__(self):
+    def __init__(self, serial_class: Optional[Callable[..., Any]] = None):
+        """
+        参数:
+            serial_class: 串口类（如mods.mock_serial.Serial），默认使用serial.Serial
+        """
         self.logger = logging.getLogger(__name__)
         self._devices: Dict[str, Any] = {}
+        self._serial_class = serial_class or serial.Serial
         
     def register_serial(self, name: str, port: str, baudrate: int, timeout: float = 1.0) -> None:
         """
@@ -25,7 +30,7 @@ class DeviceManager:
             raise ValueError(f"设备 {name} 已存在")
             
         try:
-            ser = serial.Serial(
+            ser = self._serial_class(
                 port=port,
                 baudrate=baudrate,
                 timeout=timeout
@@ -79,11 +84,12 @@ class DeviceManager:
         """关闭所有设备"""
         for name, device in self._devices.items():
             try:
-                if isinstance(device, serial.Serial):
-                    if device.is_open:
-                        device.close()
-                elif isinstance(device, cv2.VideoCapture):
+                if isinstance(device, cv2.VideoCapture):
                     device.release()
+                elif hasattr(device, 'close'):
+                    # 串口（包括模拟串口）按接口判断
+                    if getattr(device, 'is_open', True):
+                        device.close()
                 self.logger.info(f"设备 {name} 已关闭")
             except Exception as e:
                 self.logger.error(f"关闭设备 {name} 失败: {e}")
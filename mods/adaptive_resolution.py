@@ -0,0 +1,138 @@
+"""
+自适应推理分辨率模块
+根据最近观测到的目标尺寸和单帧推理耗时预算，从一组候选尺寸中为每帧选择imgsz，
+并用实测推理耗时持续修正各尺寸的耗时估计。长时间未被选中的尺寸，其耗时估计
+随时间衰减回按其他尺寸面积缩放的估计，避免一次偶然的慢推理永久排除该尺寸。
+"""
+
+import logging
+import time
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class ResolutionController:
+    """推理分辨率控制器"""
+
+    def __init__(self, sizes: Sequence[int] = (320, 416, 512, 640), latency_budget: float = 0.15,
+                 min_target_pixels: float = 24, smoothing: float = 0.2, decay_time: float = 10.0,
+                 skip_samples: int = 1):
+        """
+        Args:
+            sizes: 候选输入尺寸（需为模型步长32的整数倍）
+            latency_budget: 单帧推理耗时预算(秒)
+            min_target_pixels: 目标缩放到模型输入后的最小边长(像素)，保证小目标仍可检出
+            smoothing: 推理耗时滑动平均系数
+            decay_time: 耗时估计衰减回面积缩放估计的时间常数(秒)
+            skip_samples: 每个尺寸丢弃的前几次测量（首次推理含冷启动开销）
+        """
+        self.sizes = sorted(sizes)
+        self.latency_budget = latency_budget
+        self.min_target_pixels = min_target_pixels
+        self.smoothing = smoothing
+        self.decay_time = decay_time
+        self.skip_samples = skip_samples
+
+        self.latency: Dict[int, Optional[float]] = {size: None for size in self.sizes}
+        self.measured_at: Dict[int, Optional[float]] = {size: None for size in self.sizes}  # 最近一次测量时刻
+        self.samples: Dict[int, int] = {size: 0 for size in self.sizes}  # 各尺寸的测量次数（含丢弃的）
+        self.target_size = None  # 最近观测到的目标最小边长(原图像素)
+        self.last_size = None
+
+    def scaled_estimate(self, size: int) -> Optional[float]:
+        """按最接近的其他已测尺寸以面积比例缩放估计指定尺寸的耗时，没有其他已测尺寸时返回None"""
+        measured = [s for s in self.sizes if s != size and self.latency[s] is not None]
+        if not measured:
+            return None
+        nearest = min(measured, key=lambda s: abs(s - size))
+        return self.latency[nearest] * (size / nearest) ** 2
+
+    def estimate_latency(self, size: int, now: Optional[float] = None) -> float:
+        """估计指定尺寸的推理耗时
+
+        已测量的尺寸使用滑动平均值，并随距最近一次测量的时间按decay_time
+        指数衰减到面积缩放估计；未测量的尺寸直接使用面积缩放估计；
+        尚无任何测量时返回0（优先探索）。
+        """
+        scaled = self.scaled_estimate(size)
+        if self.latency[size] is None:
+            return 0.0 if scaled is None else scaled
+        if scaled is None or not self.decay_time:
+            return self.latency[size]
+        now = time.monotonic() if now is None else now
+        weight = float(np.exp(-(now - self.measured_at[size]) / self.decay_time))
+        return weight * self.latency[size] + (1 - weight) * scaled
+
+    def required_size(self, image_shape: Tuple[int, ...]) -> int:
+        """保证目标不小于min_target_pixels所需的最小输入尺寸"""
+        long_side = max(image_shape[:2])
+        if not self.target_size:
+            # 没有目标时使用最大尺寸，以便发现远处小目标
+            return self.sizes[-1]
+        return int(np.ceil(self.min_target_pixels * long_side / self.target_size))
+
+    def select(self, image_shape: Tuple[int, ...], now: Optional[float] = None) -> int:
+        """为输入图像选择推理尺寸
+
+        优先选择满足目标尺寸需求且在耗时预算内的最小尺寸；
+        预算内没有满足需求的尺寸时，选择预算内最大的尺寸；
+        所有尺寸都超出预算时选择最小尺寸。
+        """
+        long_side = max(image_shape[:2])
+        # 超过图像本身的尺寸没有意义（例如小的裁剪区域）
+        candidates = [s for s in self.sizes if s < long_side]
+        candidates += [s for s in self.sizes if s >= long_side][:1]
+
+        now = time.monotonic() if now is None else now
+        within_budget = [s for s in candidates if self.estimate_latency(s, now) <= self.latency_budget]
+        required = self.required_size(image_shape)
+
+        if not within_budget:
+            size = candidates[0]
+        else:
+            sufficient = [s for s in within_budget if s >= required]
+            size = sufficient[0] if sufficient else within_budget[-1]
+
+        if size != self.last_size:
+            logger.debug(f"推理尺寸切换为 {size}")
+        self.last_size = size
+        return size
+
+    def record(self, size: int, latency: float, now: Optional[float] = None):
+        """记录一次实测推理耗时（每个尺寸的前skip_samples次测量被丢弃）"""
+        if size not in self.latency:
+            return
+        self.samples[size] += 1
+        if self.samples[size] <= self.skip_samples:
+            return
+        # 先按衰减后的估计合并，长时间未测量的尺寸不会被旧的滑动平均拖累
+        now = time.monotonic() if now is None else now
+        previous = self.estimate_latency(size, now) if self.latency[size] is not None else None
+        self.latency[size] = latency if previous is None else \
+            (1 - self.smoothing) * previous + self.smoothing * latency
+        self.measured_at[size] = now
+
+    def observe_targets(self, boxes: np.ndarray):
+        """记录检测到的目标尺寸（取最小目标，保证所有目标都能检出）
+
+        Args:
+            boxes: (N, 4) 检测框，为空时清除目标尺寸
+        """
+        boxes = np.asarray(boxes).reshape(-1, 4)
+        if len(boxes) == 0:
+            self.target_size = None
+            return
+        sides = np.minimum(boxes[:, 2] - boxes[:, 0], boxes[:, 3] - boxes[:, 1])
+        self.target_size = float(max(sides.min(), 1.0))
+
+    def get_stats(self) -> Dict:
+        """获取各尺寸耗时估计及当前选择"""
+        return {
+            'imgsz': self.last_size,
+            'target_size': self.target_size,
+            'latency': {size: self.latency[size] for size in self.sizes},
+            'estimate': {size: self.estimate_latency(size) for size in self.sizes}
+        }
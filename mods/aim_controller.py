@@ -0,0 +1,305 @@
+"""
+瞄准控制模块
+在独立线程中以固定频率运行每个轴的PID+前馈控制，消费最新的目标角度估计，
+输出限速、量化后的相对转动命令，并统计控制周期抖动。
+感知（帧率）与执行（控制频率）在此解耦。
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 增益调度表: [(误差上限(度), {'kp', 'ki', 'kd', 'kf'}), ...]，按误差上限升序
+GainSchedule = Sequence[Tuple[float, Dict[str, float]]]
+
+
+class AxisController:
+    """单轴PID+前馈控制器
+
+    输出为相对转动量(度)。目标误差在测量时刻给出，由于测量之后已经发出的命令
+    尚未反映到测量中，计算当前误差时会扣除这些命令，避免在两次测量之间重复修正。
+    提供位置反馈时，改为扣除累计命令位置与测量时刻实际位置之差（即测量之后
+    已经发生和尚未完成的自身转动），不再假设执行机构准确到达命令位置。
+    """
+
+    def __init__(self, name: str, emit: Callable[[float], Optional[float]], schedule: GainSchedule,
+                 max_rate: float = 90.0, resolution: float = 1.0, command_interval: float = 0.05,
+                 actuation_delay: float = 0.0, integral_limit: float = 5.0,
+                 feedback: Optional[Callable[[float], Optional[float]]] = None):
+        """
+        Args:
+            name: 轴名称（用于日志和统计）
+            emit: 命令输出回调，参数为相对转动量(度)，可返回实际生效的转动量
+                （如执行机构到达行程边界时），返回None表示按命令全部生效
+            schedule: 增益调度表，按当前误差大小选择第一组误差上限不小于误差的增益
+            max_rate: 最大转动速度(度/秒)，用于限制单条命令的幅度
+            resolution: 命令分辨率(度)，命令按此量化，量化为0时不发送
+            command_interval: 两条命令之间的最小间隔(秒)
+            actuation_delay: 命令生效到反映在图像中的延迟(秒)，测量时刻前该时间内发出的命令也被扣除
+            integral_limit: 积分项限幅(度·秒)
+            feedback: 位置反馈，参数为时刻，返回该时刻的实际位置(度，与累计命令位置同一坐标系)，
+                不可用时返回None并退回按已发出命令估计
+        """
+        self.name = name
+        self.emit = emit
+        self.schedule = sorted(schedule, key=lambda item: item[0])
+        self.max_rate = max_rate
+        self.resolution = resolution
+        self.command_interval = command_interval
+        self.actuation_delay = actuation_delay
+        self.integral_limit = integral_limit
+        self.feedback = feedback
+
+        # 累计位置和命令记录由控制线程和外部转动命令（如搜索）共同修改，受lock保护；
+        # emit在持有lock时调用；外部调用方可持有lock，使发出命令与record_external()成为一个原子操作
+        self.lock = threading.RLock()
+        self.issued = deque(maxlen=256)  # 已发出的命令 (时间, 转动量)
+        self.position = 0.0  # 累计发出的转动量(度)
+        self.integral = 0.0
+        self.last_error = None
+        self.last_command_time = None
+
+        # 统计信息
+        self.commands = 0
+        self.suppressed = 0  # 被限频或量化为0而未发送的控制输出
+        self.errors = 0
+
+    def reset(self):
+        """清除控制器状态（目标丢失或切换时调用）"""
+        self.integral = 0.0
+        self.last_error = None
+
+    def gains(self, error: float) -> Dict[str, float]:
+        """按误差大小选择增益"""
+        for limit, gains in self.schedule:
+            if abs(error) <= limit:
+                return gains
+        return self.schedule[-1][1]
+
+    def issued_since(self, measured_at: float) -> float:
+        """测量时刻之后（考虑执行延迟）已发出的命令总量"""
+        cutoff = measured_at - self.actuation_delay
+        with self.lock:
+            issued = list(self.issued)
+        return sum(value for issued_at, value in issued if issued_at >= cutoff)
+
+    def position_at(self, timestamp: float) -> float:
+        """指定时刻的实际位置(度)，有位置反馈时使用反馈，否则为已生效的累计转动量"""
+        if self.feedback is not None:
+            position = self.feedback(timestamp)
+            if position is not None:
+                return position
+        with self.lock:
+            return self.position - self.issued_since(timestamp)
+
+    def record_external(self, delta: float, now: Optional[float] = None):
+        """记录控制器之外发出的转动命令（如搜索转动），保持累计命令位置与执行机构一致"""
+        with self.lock:
+            self.issued.append((time.monotonic() if now is None else now, delta))
+            self.position += delta
+
+    def step(self, error: float, rate: float, measured_at: float, now: float, dt: float,
+             lead: float = 0.0) -> Optional[float]:
+        """执行一次控制计算
+
+        Args:
+            error: 测量时刻的目标误差(度)
+            rate: 目标角速度(度/秒)，用于外推误差和前馈
+            measured_at: 测量时刻（time.monotonic()）
+            now: 当前时刻
+            dt: 距上次控制计算的时间(秒)
+            lead: 命令从发出到执行到位的延迟(秒)，误差外推到命令生效时刻
+
+        Returns:
+            Optional[float]: 发出的命令(度)，未发送时返回None
+        """
+        with self.lock:
+            # 扣除测量之后的自身转动（已发生的和命令后尚未完成的）
+            current = error + rate * (now + lead - measured_at) - (self.position - self.position_at(measured_at))
+            gains = self.gains(current)
+
+            if gains.get('ki', 0.0):
+                self.integral = float(np.clip(self.integral + current * dt, -self.integral_limit, self.integral_limit))
+            else:
+                self.integral = 0.0  # 大误差区间不积分，避免积分饱和
+            derivative = (current - self.last_error) / dt if self.last_error is not None and dt > 0 else 0.0
+            self.last_error = current
+
+            if self.last_command_time is not None and now - self.last_command_time < self.command_interval:
+                return None
+
+            output = (gains.get('kp', 0.0) * current + gains.get('ki', 0.0) * self.integral +
+                      gains.get('kd', 0.0) * derivative + gains.get('kf', 0.0) * rate * self.command_interval)
+            max_step = self.max_rate * self.command_interval
+            output = float(np.clip(output, -max_step, max_step))
+            command = round(output / self.resolution) * self.resolution
+            if command == 0:
+                self.suppressed += 1
+                return None
+
+            try:
+                applied = self.emit(command)
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"{self.name}轴命令发送失败: {e}")
+                return None
+            if applied is not None:
+                command = applied
+            if command == 0:
+                # 已到达行程边界，累计位置保持与执行机构一致
+                self.suppressed += 1
+                self.last_command_time = now
+                return None
+
+            self.issued.append((now, command))
+            self.position += command
+            self.last_command_time = now
+            self.commands += 1
+            return command
+
+    def get_stats(self) -> Dict:
+        return {
+            'commands': self.commands,
+            'suppressed': self.suppressed,
+            'errors': self.errors,
+            'last_error': self.last_error
+        }
+
+
+class AimController:
+    """固定频率瞄准控制器
+
+    主循环通过update_target()提交最新的目标角度估计，控制线程按固定频率
+    读取最新估计并驱动各轴；目标超过target_timeout未更新时停止输出。
+    """
+
+    def __init__(self, yaw: AxisController, pitch: AxisController, rate: float = 100.0,
+                 target_timeout: float = 0.5, jitter_window: int = 1000):
+        """
+        Args:
+            yaw: 水平轴控制器
+            pitch: 俯仰轴控制器
+            rate: 控制频率(Hz)
+            target_timeout: 目标估计的有效时间(秒)
+            jitter_window: 抖动统计窗口(控制周期数)
+        """
+        self.yaw = yaw
+        self.pitch = pitch
+        self.rate = rate
+        self.period = 1.0 / rate
+        self.target_timeout = target_timeout
+
+        self.lock = threading.Lock()
+        self.target = None  # 最新目标估计
+        self.active = False  # 是否正在跟随目标
+        self.thread = None
+        self.stop_event = threading.Event()
+
+        # 统计信息
+        self.ticks = 0
+        self.overruns = 0  # 计算超过一个周期的次数
+        self.lateness = deque(maxlen=jitter_window)  # 实际执行时刻相对计划时刻的延迟(秒)
+        self.intervals = deque(maxlen=jitter_window)  # 相邻两次执行的实际间隔(秒)
+
+    def start(self):
+        """启动控制线程"""
+        if self.thread is not None:
+            return
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._control_loop, name="AimController", daemon=True)
+        self.thread.start()
+        logger.info(f"瞄准控制线程已启动，控制频率 {self.rate:.0f}Hz")
+
+    def stop(self):
+        """停止控制线程"""
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join(timeout=1.0)
+            self.thread = None
+
+    def update_target(self, x_angle: float, y_angle: float, timestamp: float,
+                      x_rate: float = 0.0, y_rate: float = 0.0, lead: float = 0.0):
+        """提交最新的目标角度估计
+
+        Args:
+            x_angle: 水平误差角(度)，向右为正
+            y_angle: 垂直误差角(度)，向上为正
+            timestamp: 测量时刻（帧采集时间，time.monotonic()）
+            x_rate: 水平角速度(度/秒)
+            y_rate: 垂直角速度(度/秒)
+            lead: 命令执行延迟(秒)，控制器瞄准命令生效时刻的预测位置
+        """
+        with self.lock:
+            self.target = {
+                'x_angle': x_angle,
+                'y_angle': y_angle,
+                'x_rate': x_rate,
+                'y_rate': y_rate,
+                'lead': lead,
+                'timestamp': timestamp
+            }
+
+    def clear_target(self):
+        """清除目标估计，控制器停止输出"""
+        with self.lock:
+            self.target = None
+
+    def _control_loop(self):
+        """控制线程主循环（按绝对时刻调度，避免周期累积漂移）"""
+        next_tick = time.monotonic()
+        last_tick = None
+        while not self.stop_event.is_set():
+            now = time.monotonic()
+            self.lateness.append(now - next_tick)
+            dt = now - last_tick if last_tick is not None else self.period
+            if last_tick is not None:
+                self.intervals.append(dt)
+            last_tick = now
+            self.ticks += 1
+
+            with self.lock:
+                target = self.target
+
+            if target is None or now - target['timestamp'] > self.target_timeout:
+                if self.active:
+                    self.yaw.reset()
+                    self.pitch.reset()
+                    self.active = False
+            else:
+                self.active = True
+                self.yaw.step(target['x_angle'], target['x_rate'], target['timestamp'], now, dt, target['lead'])
+                self.pitch.step(target['y_angle'], target['y_rate'], target['timestamp'], now, dt, target['lead'])
+
+            next_tick += self.period
+            delay = next_tick - time.monotonic()
+            if delay > 0:
+                self.stop_event.wait(delay)
+            else:
+                self.overruns += 1
+                if delay < -self.period:
+                    # 落后超过一个周期时重新对齐，不补跑错过的周期
+                    next_tick = time.monotonic()
+
+    def get_stats(self) -> Dict:
+        """获取控制周期抖动和各轴统计"""
+        lateness = np.array(self.lateness) if self.lateness else np.zeros(1)
+        intervals = np.array(self.intervals) if self.intervals else np.full(1, self.period)
+        return {
+            'rate': self.rate,
+            'actual_rate': float(1.0 / intervals.mean()) if intervals.mean() > 0 else 0.0,
+            'ticks': self.ticks,
+            'overruns': self.overruns,
+            'active': self.active,
+            'jitter_mean_ms': float(np.abs(lateness).mean() * 1000),
+            'jitter_p99_ms': float(np.percentile(np.abs(lateness), 99) * 1000),
+            'jitter_max_ms': float(np.abs(lateness).max() * 1000),
+            'interval_std_ms': float(intervals.std() * 1000),
+            'yaw': self.yaw.get_stats(),
+            'pitch': self.pitch.get_stats()
+        }
@@ -0,0 +1,111 @@
+"""
+步进电机参数缓存模块
+包装stepper.device.Device，记住最近写入的速度和加速度，
+参数未变化时跳过写入以减少串口通信；出错或重新连接后缓存失效
+"""
+
+import logging
+import threading
+from typing import Any, Dict
+
+logger = logging.getLogger(__name__)
+
+
+class CachedStepper:
+    """带参数缓存的步进电机设备
+
+    接口与stepper.device.Device一致，未显式包装的属性直接转发给原设备。
+    """
+
+    def __init__(self, device):
+        """
+        Args:
+            device: 步进电机设备（stepper.device.Device）
+        """
+        self.device = device
+        self.lock = threading.Lock()
+        self.cache: Dict[str, Any] = {}  # 参数名 -> 最近写入的值
+
+        # 统计信息
+        self.writes = 0  # 实际发出的参数写入
+        self.saved = 0  # 因缓存命中而省去的串口事务
+        self.invalidations = 0
+        self.errors = 0
+
+    def invalidate(self):
+        """清除参数缓存（重新连接、驱动器复位或通信出错后调用）"""
+        with self.lock:
+            if self.cache:
+                self.invalidations += 1
+            self.cache.clear()
+
+    def _call(self, method: str, *args):
+        """调用原设备方法，出错时使缓存失效"""
+        try:
+            return getattr(self.device, method)(*args)
+        except Exception:
+            self.errors += 1
+            self.invalidate()
+            raise
+
+    def _set_param(self, name: str, value, force: bool = False):
+        """写入参数，与缓存值相同时跳过"""
+        with self.lock:
+            if not force and self.cache.get(name) == value:
+                self.saved += 1
+                return
+        self._call(name, value)
+        with self.lock:
+            self.cache[name] = value
+            self.writes += 1
+
+    def set_speed(self, speed: int, force: bool = False):
+        """设置速度(步/秒)，force为True时总是写入"""
+        self._set_param('set_speed', speed, force)
+
+    def set_acceleration(self, acceleration: int, force: bool = False):
+        """设置加速度(步/秒²)，force为True时总是写入"""
+        self._set_param('set_acceleration', acceleration, force)
+
+    def move_to(self, position: int):
+        return self._call('move_to', position)
+
+    def move(self, steps: int):
+        return self._call('move', steps)
+
+    def stop(self):
+        return self._call('stop')
+
+    def enable(self):
+        # 驱动器重新使能后参数状态未知
+        self.invalidate()
+        return self._call('enable')
+
+    def disable(self):
+        return self._call('disable')
+
+    @property
+    def is_in_position(self) -> bool:
+        try:
+            return self.device.is_in_position
+        except Exception:
+            self.errors += 1
+            self.invalidate()
+            raise
+
+    def __getattr__(self, name: str):
+        if name == 'device':
+            raise AttributeError(name)
+        return getattr(self.device, name)
+
+    def get_stats(self) -> Dict:
+        """获取缓存统计信息"""
+        total = self.writes + self.saved
+        return {
+            'writes': self.writes,
+            'saved': self.saved,
+            'saved_ratio': self.saved / total if total else 0.0,
+            'invalidations': self.invalidations,
+            'errors': self.errors,
+            'cache': dict(self.cache)
+        }
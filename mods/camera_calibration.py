@@ -0,0 +1,110 @@
+"""
+相机标定数据模块
+负责相机内参、畸变系数及去畸变映射表的保存和加载（numpy .npz二进制格式），
+标定数据由camera_calibration_tool.py生成
+"""
+
+import logging
+import os
+import cv2
+import numpy as np
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def compute_fov(camera_matrix: np.ndarray, image_size: Tuple[int, int]) -> Tuple[float, float]:
+    """由相机内参计算视场角
+
+    Args:
+        camera_matrix: 3x3相机内参矩阵
+        image_size: 图像尺寸 (宽, 高)
+
+    Returns:
+        Tuple[float, float]: (水平视场角, 垂直视场角)(度)
+    """
+    width, height = image_size
+    fx, fy = camera_matrix[0, 0], camera_matrix[1, 1]
+    cx, cy = camera_matrix[0, 2], camera_matrix[1, 2]
+    h_fov = np.degrees(np.arctan(cx / fx) + np.arctan((width - cx) / fx))
+    v_fov = np.degrees(np.arctan(cy / fy) + np.arctan((height - cy) / fy))
+    return float(h_fov), float(v_fov)
+
+
+def scale_camera_matrix(camera_matrix: np.ndarray, from_size: Tuple[int, int],
+                        to_size: Tuple[int, int]) -> np.ndarray:
+    """将相机内参从标定分辨率缩放到目标分辨率（要求宽高比一致）"""
+    scale_x = to_size[0] / from_size[0]
+    scale_y = to_size[1] / from_size[1]
+    scaled = np.array(camera_matrix, dtype=np.float64)
+    scaled[0, :] *= scale_x
+    scaled[1, :] *= scale_y
+    scaled[2, :] = [0, 0, 1]
+    return scaled
+
+
+def save_calibration(path: str, camera_matrix: np.ndarray, dist_coeffs: np.ndarray,
+                     image_size: Tuple[int, int], rms: float, alpha: float = 0.0) -> Dict:
+    """保存标定结果及预计算的去畸变映射表
+
+    Args:
+        path: 输出文件路径（.npz）
+        camera_matrix: 3x3相机内参矩阵
+        dist_coeffs: 畸变系数
+        image_size: 标定图像尺寸 (宽, 高)
+        rms: 重投影误差(像素)
+        alpha: 去畸变后图像的裁剪系数（0保留有效像素，1保留全部像素）
+
+    Returns:
+        Dict: 保存的标定数据
+    """
+    new_camera_matrix, _ = cv2.getOptimalNewCameraMatrix(camera_matrix, dist_coeffs, image_size, alpha)
+    map1, map2 = cv2.initUndistortRectifyMap(camera_matrix, dist_coeffs, None, new_camera_matrix,
+                                             image_size, cv2.CV_16SC2)
+    data = {
+        'camera_matrix': np.asarray(camera_matrix, dtype=np.float64),
+        'dist_coeffs': np.asarray(dist_coeffs, dtype=np.float64).reshape(-1),
+        'image_size': np.asarray(image_size, dtype=np.int32),
+        'rms': np.float64(rms),
+        'new_camera_matrix': new_camera_matrix,
+        'map1': map1,
+        'map2': map2,
+    }
+    np.savez(path, **data)
+    logger.info(f"标定结果已保存到: {path}")
+    return data
+
+
+def load_calibration(path: str, image_size: Optional[Tuple[int, int]] = None) -> Optional[Dict]:
+    """加载标定结果
+
+    Args:
+        path: 标定文件路径（.npz）
+        image_size: 实际使用的图像尺寸 (宽, 高)，与标定分辨率不同时缩放内参
+            （此时去畸变映射表不再适用，不会返回）
+
+    Returns:
+        Optional[Dict]: 标定数据，文件不存在或无法读取时返回None
+    """
+    if not os.path.exists(path):
+        return None
+
+    try:
+        with np.load(path) as archive:
+            data = {key: archive[key] for key in archive.files}
+    except Exception as e:
+        logger.error(f"读取标定文件 {path} 失败: {e}")
+        return None
+
+    calibrated_size = tuple(int(v) for v in data['image_size'])
+    if image_size is not None and tuple(image_size) != calibrated_size:
+        logger.warning(f"标定分辨率 {calibrated_size} 与当前分辨率 {tuple(image_size)} 不同，按比例缩放内参")
+        data['camera_matrix'] = scale_camera_matrix(data['camera_matrix'], calibrated_size, image_size)
+        data['image_size'] = np.asarray(image_size, dtype=np.int32)
+        for key in ('new_camera_matrix', 'map1', 'map2'):
+            data.pop(key, None)
+
+    h_fov, v_fov = compute_fov(data['camera_matrix'], tuple(data['image_size']))
+    logger.info(f"已加载相机标定: 水平视场角 {h_fov:.1f}°, 垂直视场角 {v_fov:.1f}°, "
+                f"重投影误差 {float(data['rms']):.3f}px")
+    return data
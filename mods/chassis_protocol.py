@@ -0,0 +1,258 @@
+"""
+底盘二进制通信协议模块
+将规范化的底盘命令字符串（如 "R12.35"、"L3"、"S"）编码为定长二进制帧，
+并提供流式解码器。帧格式（小端，共8字节）:
+
+    SOF(0xA5) | seq(u8) | cmd(u8) | flags(u8) | angle(i16, 0.01度) | CRC16(u16)
+
+CRC16为CRC-16/CCITT-FALSE（多项式0x1021，初值0xFFFF），覆盖seq到angle。
+flags的bit0表示请求应答，bit1表示该帧为应答帧；应答帧原样回传seq、cmd和angle。
+
+底盘上报的遥测帧（航向和里程计，共14字节）:
+
+    SOF(0xA6) | seq(u8) | heading(i16, 0.01度, -180~180) | x(i32, 毫米) | y(i32, 毫米) | CRC16(u16)
+
+ASCII协议下遥测为文本行 "T<航向(度)>,<x(米)>,<y(米)>"。
+
+R/L命令的角度有两种语义，由main.py的CHASSIS_SETPOINT_MODE选择，须与固件一致:
+
+    absolute: 角度为相对上电初始朝向的目标航向（R为右、L为左），底盘转到该航向后保持；
+              重复收到同一命令不会继续转动，"R0"表示转回初始朝向，"S"表示停在当前航向
+    relative: 角度为相对当前朝向的转动量（原固件语义），"S"表示停止转动
+"""
+
+import struct
+from typing import Dict, List, Optional, Sequence, Tuple, Type
+
+SOF = 0xA5
+FRAME_FORMAT = '<BBBBh'  # sof, seq, cmd, flags, angle
+FRAME_SIZE = struct.calcsize(FRAME_FORMAT) + 2
+
+FLAG_ACK_REQUEST = 0x01
+FLAG_ACK = 0x02
+
+# 命令字符 <-> 命令码
+COMMAND_CODES = {'S': 0x00, 'R': 0x01, 'L': 0x02}
+COMMAND_NAMES = {code: name for name, code in COMMAND_CODES.items()}
+
+ANGLE_SCALE = 100  # 角度定点数比例（0.01度）
+ANGLE_LIMIT = 32767 / ANGLE_SCALE
+
+TELEMETRY_SOF = 0xA6
+TELEMETRY_FORMAT = '<BBhii'  # sof, seq, heading, x, y
+TELEMETRY_SIZE = struct.calcsize(TELEMETRY_FORMAT) + 2
+ODOMETRY_SCALE = 1000  # 里程计定点数比例（毫米）
+
+
+def _build_crc_table() -> List[int]:
+    table = []
+    for byte in range(256):
+        crc = byte << 8
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x1021) if crc & 0x8000 else (crc << 1)
+        table.append(crc & 0xFFFF)
+    return table
+
+
+_CRC_TABLE = _build_crc_table()
+
+
+def crc16(data: bytes, crc: int = 0xFFFF) -> int:
+    """计算CRC-16/CCITT-FALSE"""
+    for byte in data:
+        crc = ((crc << 8) & 0xFFFF) ^ _CRC_TABLE[((crc >> 8) ^ byte) & 0xFF]
+    return crc
+
+
+def parse_command(command: str) -> Tuple[str, float]:
+    """解析规范化命令字符串
+
+    Args:
+        command: 命令字符串，如 "R12.35"、"L3"、"S"
+
+    Returns:
+        Tuple[str, float]: (命令字符, 角度)
+
+    Raises:
+        ValueError: 命令格式错误
+    """
+    command = command.strip()
+    if not command or command[0] not in COMMAND_CODES:
+        raise ValueError(f"未知的底盘命令: {command!r}")
+    name = command[0]
+    angle = float(command[1:]) if len(command) > 1 else 0.0
+    if abs(angle) > ANGLE_LIMIT:
+        raise ValueError(f"角度超出范围: {angle}")
+    return name, angle
+
+
+def format_command(name: str, angle: float = 0.0, decimals: int = 0) -> str:
+    """生成规范化命令字符串"""
+    if name == 'S':
+        return 'S'
+    return f"{name}{angle:.{decimals}f}" if decimals else f"{name}{int(angle)}"
+
+
+def encode_frame(name: str, angle: float, seq: int, flags: int = 0) -> bytes:
+    """编码一帧"""
+    body = struct.pack(FRAME_FORMAT, SOF, seq & 0xFF, COMMAND_CODES[name], flags,
+                       int(round(angle * ANGLE_SCALE)))
+    return body + struct.pack('<H', crc16(body[1:]))
+
+
+def encode_command(command: str, seq: int, ack: bool = False) -> bytes:
+    """将规范化命令字符串编码为二进制帧"""
+    name, angle = parse_command(command)
+    return encode_frame(name, angle, seq, FLAG_ACK_REQUEST if ack else 0)
+
+
+def encode_ack(frame: Dict) -> bytes:
+    """生成对指定帧的应答帧"""
+    return encode_frame(frame['cmd'], frame['angle'], frame['seq'], FLAG_ACK)
+
+
+def frame_to_command(frame: Dict) -> str:
+    """将解码后的帧还原为规范化命令字符串"""
+    return format_command(frame['cmd'], frame['angle'], decimals=2)
+
+
+def encode_telemetry(heading: float, x: float, y: float, seq: int) -> bytes:
+    """编码遥测帧（航向按-180~180度归一化）"""
+    heading = (heading + 180.0) % 360.0 - 180.0
+    body = struct.pack(TELEMETRY_FORMAT, TELEMETRY_SOF, seq & 0xFF, int(round(heading * ANGLE_SCALE)),
+                       int(round(x * ODOMETRY_SCALE)), int(round(y * ODOMETRY_SCALE)))
+    return body + struct.pack('<H', crc16(body[1:]))
+
+
+def format_telemetry(heading: float, x: float, y: float) -> str:
+    """生成ASCII遥测行（不含换行符）"""
+    return f"T{heading:.2f},{x:.3f},{y:.3f}"
+
+
+def parse_telemetry(line: str) -> Optional[Dict]:
+    """解析ASCII遥测行，不是遥测或格式错误时返回None"""
+    line = line.strip()
+    if not line.startswith('T'):
+        return None
+    try:
+        heading, x, y = (float(value) for value in line[1:].split(','))
+    except ValueError:
+        return None
+    return {'heading': heading, 'x': x, 'y': y}
+
+
+class FrameDecoder:
+    """流式帧解码器
+
+    可按任意长度分段输入字节流，CRC错误或帧头错位时逐字节重新同步。
+    同一串口上混有其他类型的帧（如命令应答与遥测）时，通过skip指定其他帧的解码器类型，
+    整帧跳过这些帧，避免其数据中的伪帧头被计为CRC错误。
+    """
+
+    sof = SOF
+    frame_size = FRAME_SIZE
+
+    def __init__(self, skip: Sequence[Type['FrameDecoder']] = ()):
+        """
+        Args:
+            skip: 同一字节流中需要整帧跳过的其他帧类型（FrameDecoder子类）
+        """
+        self.skip = tuple(skip)
+        self.buffer = bytearray()
+        self.frames = 0
+        self.crc_errors = 0
+        self.discarded = 0  # 重新同步时丢弃的字节数
+        self.skipped = 0  # 跳过的其他类型帧数
+
+    def _skip_foreign(self, end: int) -> Optional[bool]:
+        """跳过end之前最早的一个其他类型完整帧
+
+        Returns:
+            Optional[bool]: True表示已跳过，False表示end之前没有其他类型的帧，
+                None表示其他类型的帧尚未接收完整（等待更多数据）
+        """
+        candidates = []
+        for decoder in self.skip:
+            position = self.buffer.find(decoder.sof, 0, end)
+            while position >= 0:
+                candidates.append((position, decoder))
+                position = self.buffer.find(decoder.sof, position + 1, end)
+        for position, decoder in sorted(candidates, key=lambda item: item[0]):
+            if len(self.buffer) - position < decoder.frame_size:
+                return None
+            if decoder._decode(bytes(self.buffer[position:position + decoder.frame_size])) is not None:
+                self.discarded += position
+                del self.buffer[:position + decoder.frame_size]
+                self.skipped += 1
+                return True
+        return False
+
+    def feed(self, data: bytes) -> List[Dict]:
+        """输入字节流，返回解码出的完整帧"""
+        self.buffer.extend(data)
+        frames = []
+        while True:
+            start = self.buffer.find(self.sof)
+            if self.skip:
+                skipped = self._skip_foreign(start if start >= 0 else len(self.buffer))
+                if skipped is None:
+                    break
+                if skipped:
+                    continue
+            if start < 0:
+                self.discarded += len(self.buffer)
+                self.buffer.clear()
+                break
+            if start > 0:
+                self.discarded += start
+                del self.buffer[:start]
+            if len(self.buffer) < self.frame_size:
+                break
+
+            frame = self._decode(bytes(self.buffer[:self.frame_size]))
+            if frame is None:
+                # 可能是数据中的伪帧头，跳过一个字节重新同步
+                self.crc_errors += 1
+                self.discarded += 1
+                del self.buffer[:1]
+                continue
+            del self.buffer[:self.frame_size]
+            self.frames += 1
+            frames.append(frame)
+        return frames
+
+    @staticmethod
+    def _decode(data: bytes) -> Optional[Dict]:
+        """解码一帧，校验失败返回None"""
+        (crc,) = struct.unpack('<H', data[-2:])
+        if crc16(data[1:-2]) != crc:
+            return None
+        _, seq, cmd, flags, angle = struct.unpack(FRAME_FORMAT, data[:-2])
+        if cmd not in COMMAND_NAMES:
+            return None
+        return {
+            'seq': seq,
+            'cmd': COMMAND_NAMES[cmd],
+            'flags': flags,
+            'angle': angle / ANGLE_SCALE
+        }
+
+
+class TelemetryDecoder(FrameDecoder):
+    """遥测帧流式解码器"""
+
+    sof = TELEMETRY_SOF
+    frame_size = TELEMETRY_SIZE
+
+    @staticmethod
+    def _decode(data: bytes) -> Optional[Dict]:
+        (crc,) = struct.unpack('<H', data[-2:])
+        if crc16(data[1:-2]) != crc:
+            return None
+        _, seq, heading, x, y = struct.unpack(TELEMETRY_FORMAT, data[:-2])
+        return {
+            'seq': seq,
+            'heading': heading / ANGLE_SCALE,
+            'x': x / ODOMETRY_SCALE,
+            'y': y / ODOMETRY_SCALE
+        }
@@ -0,0 +1,188 @@
+"""
+底盘遥测模块
+解析底盘STM32上报的航向和里程计数据，存入带时间戳的环形缓冲区，
+可查询任意时刻（如帧采集时刻）的底盘航向，用于从目标测量中扣除底盘自身的转动。
+"""
+
+import logging
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from mods.chassis_protocol import TELEMETRY_SIZE, FrameDecoder, TelemetryDecoder, parse_telemetry
+
+logger = logging.getLogger(__name__)
+
+
+class ChassisTelemetry:
+    """底盘遥测缓冲区
+
+    航向按相邻采样的最短转角展开为连续值，并以第一个采样为零点，
+    与底盘命令"相对初始朝向的目标角度"处于同一坐标系。
+    feed()可直接作为SerialController.on_receive回调。
+    """
+
+    def __init__(self, protocol: str = 'ascii', capacity: int = 512, baudrate: int = 115200,
+                 latency: float = 0.0, max_extrapolation: float = 0.1, timeout: float = 0.5):
+        """
+        Args:
+            protocol: 遥测格式，ascii（"T<航向>,<x>,<y>"文本行）或binary（遥测帧）
+            capacity: 环形缓冲区容量（采样数）
+            baudrate: 串口波特率，用于扣除数据在线路上的传输耗时
+            latency: 底盘采样到开始发送的固定延迟(秒)
+            max_extrapolation: 查询时刻晚于最新采样时最多外推的时长(秒)
+            timeout: 超过该时间没有新采样时视为遥测失效(秒)
+        """
+        if protocol not in ('ascii', 'binary'):
+            raise ValueError(f"不支持的协议: {protocol}")
+        self.protocol = protocol
+        self.capacity = capacity
+        self.baudrate = baudrate
+        self.latency = latency
+        self.max_extrapolation = max_extrapolation
+        self.timeout = timeout
+
+        self.lock = threading.Lock()
+        self.times = np.zeros(capacity)
+        self.headings = np.zeros(capacity)  # 展开后的相对航向(度)
+        self.odometry = np.zeros((capacity, 2))  # 里程计 (x, y)(米)
+        self.index = 0  # 下一个写入位置
+        self.count = 0
+        self.origin = None  # 第一个采样的原始航向
+        self.last_raw = None
+        self.last_heading = 0.0
+
+        self.decoder = TelemetryDecoder(skip=(FrameDecoder,))  # 跳过同一串口上的命令应答帧
+        self.line = bytearray()
+
+        # 统计信息
+        self.samples = 0
+        self.parse_errors = 0
+
+    def feed(self, data: bytes):
+        """输入串口收到的原始数据
+
+        同一批数据中的多个采样按各自在线路上的传输耗时倒推时间戳：
+        最后一个采样刚刚到达，之前的采样依次提前。
+        """
+        now = time.monotonic()
+        samples = []  # (采样, 字节数)
+        if self.protocol == 'binary':
+            samples = [(frame, TELEMETRY_SIZE) for frame in self.decoder.feed(data)]
+        else:
+            self.line.extend(data)
+            while b'\n' in self.line:
+                line, _, rest = bytes(self.line).partition(b'\n')
+                self.line = bytearray(rest)
+                if not line.startswith(b'T'):
+                    continue  # 其他上报内容
+                sample = parse_telemetry(line.decode(errors='replace'))
+                if sample is None:
+                    self.parse_errors += 1
+                    continue
+                samples.append((sample, len(line) + 1))
+
+        delay = self.latency
+        timestamps = []
+        for _, size in reversed(samples):
+            delay += size * 10 / self.baudrate
+            timestamps.append(now - delay)
+        for (sample, _), timestamp in zip(samples, reversed(timestamps)):
+            self.add_sample(timestamp, sample['heading'], sample['x'], sample['y'])
+
+    def add_sample(self, timestamp: float, heading: float, x: float = 0.0, y: float = 0.0):
+        """添加一个采样
+
+        Args:
+            timestamp: 采样时刻（time.monotonic()）
+            heading: 底盘上报的航向(度)，可在±180度处回绕
+            x: 里程计x(米)
+            y: 里程计y(米)
+        """
+        with self.lock:
+            if self.origin is None:
+                self.origin = heading
+                self.last_raw = heading
+                self.last_heading = 0.0
+            else:
+                # 航向回绕时取最短转角，保持连续
+                self.last_heading += (heading - self.last_raw + 180.0) % 360.0 - 180.0
+                self.last_raw = heading
+            if self.count and timestamp <= self.times[(self.index - 1) % self.capacity]:
+                return  # 时间戳不递增时只更新展开状态
+            self.times[self.index] = timestamp
+            self.headings[self.index] = self.last_heading
+            self.odometry[self.index] = (x, y)
+            self.index = (self.index + 1) % self.capacity
+            self.count = min(self.count + 1, self.capacity)
+            self.samples += 1
+
+    def _ordered(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """按时间顺序返回缓冲区内容（需持有lock）"""
+        if self.count < self.capacity:
+            return self.times[:self.count], self.headings[:self.count], self.odometry[:self.count]
+        order = np.r_[self.index:self.capacity, 0:self.index]
+        return self.times[order], self.headings[order], self.odometry[order]
+
+    def is_alive(self, now: Optional[float] = None) -> bool:
+        """最近timeout时间内是否收到过采样"""
+        now = time.monotonic() if now is None else now
+        with self.lock:
+            return bool(self.count) and now - self.times[(self.index - 1) % self.capacity] <= self.timeout
+
+    def heading_at(self, timestamp: float) -> Optional[float]:
+        """查询指定时刻的相对航向(度)
+
+        在相邻采样间线性插值；晚于最新采样时按最后两个采样的角速度外推，
+        外推时长不超过max_extrapolation。早于缓冲区或没有采样时返回None。
+        """
+        with self.lock:
+            if not self.count:
+                return None
+            times, headings, _ = self._ordered()
+        if timestamp < times[0]:
+            return None
+        if timestamp <= times[-1] or len(times) < 2:
+            return float(np.interp(timestamp, times, headings))
+        rate = (headings[-1] - headings[-2]) / (times[-1] - times[-2])
+        return float(headings[-1] + rate * min(timestamp - times[-1], self.max_extrapolation))
+
+    def odometry_at(self, timestamp: float) -> Optional[Tuple[float, float]]:
+        """查询指定时刻的里程计(米)，超出缓冲区范围时返回None"""
+        with self.lock:
+            if not self.count:
+                return None
+            times, _, odometry = self._ordered()
+        if timestamp < times[0]:
+            return None
+        return float(np.interp(timestamp, times, odometry[:, 0])), float(np.interp(timestamp, times, odometry[:, 1]))
+
+    def latest(self) -> Optional[Dict]:
+        """最新采样"""
+        with self.lock:
+            if not self.count:
+                return None
+            last = (self.index - 1) % self.capacity
+            return {
+                'timestamp': float(self.times[last]),
+                'heading': float(self.headings[last]),
+                'x': float(self.odometry[last, 0]),
+                'y': float(self.odometry[last, 1])
+            }
+
+    def get_stats(self) -> Dict:
+        """获取遥测统计信息"""
+        latest = self.latest()
+        with self.lock:
+            times, _, _ = self._ordered()
+        rate = float((len(times) - 1) / (times[-1] - times[0])) if len(times) > 1 and times[-1] > times[0] else 0.0
+        return {
+            'samples': self.samples,
+            'rate': rate,
+            'alive': self.is_alive(),
+            'heading': latest['heading'] if latest else None,
+            'age_ms': (time.monotonic() - latest['timestamp']) * 1000 if latest else None,
+            'parse_errors': self.parse_errors + self.decoder.crc_errors
+        }
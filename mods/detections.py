@@ -0,0 +1,197 @@
+"""
+检测结果工具模块
+提供YOLO结果解析、检测框IoU计算和多帧检测结果融合等向量化工具函数
+"""
+
+import numpy as np
+from typing import List, Tuple, Iterable
+
+# 检测结果结构化数组类型：检测框(x1, y1, x2, y2)、置信度、类别
+DETECTION_DTYPE = np.dtype([
+    ('bbox', np.float32, (4,)),
+    ('conf', np.float32),
+    ('cls', np.int16),
+])
+
+# 多帧融合后的检测结果类型，附加稳定度
+FUSED_DETECTION_DTYPE = np.dtype(DETECTION_DTYPE.descr + [('stability', np.float32)])
+
+
+def empty_detections(dtype: np.dtype = DETECTION_DTYPE) -> np.ndarray:
+    """创建空的检测结果数组"""
+    return np.zeros(0, dtype=dtype)
+
+
+def parse_results(results: Iterable) -> np.ndarray:
+    """将ultralytics推理结果解析为结构化数组
+
+    每个结果的xyxy、conf、cls各只做一次整体的设备到主机拷贝，
+    避免逐框调用.cpu().numpy()。
+
+    Args:
+        results: model.predict()返回的结果列表
+
+    Returns:
+        np.ndarray: DETECTION_DTYPE类型的检测结果数组
+    """
+    parts = []
+    for result in results:
+        boxes = result.boxes
+        if boxes is None or len(boxes) == 0:
+            continue
+
+        detections = np.empty(len(boxes), dtype=DETECTION_DTYPE)
+        detections['bbox'] = boxes.xyxy.cpu().numpy()
+        detections['conf'] = boxes.conf.cpu().numpy()
+        detections['cls'] = boxes.cls.cpu().numpy()
+        parts.append(detections)
+
+    if not parts:
+        return empty_detections()
+    return parts[0] if len(parts) == 1 else np.concatenate(parts)
+
+
+def compute_roi(bbox: np.ndarray, frame_shape: Tuple[int, ...], padding: float = 1.0,
+                min_size: int = 320) -> Tuple[int, int, int, int]:
+    """计算目标周围的裁剪区域
+
+    Args:
+        bbox: 目标检测框 x1, y1, x2, y2
+        frame_shape: 图像尺寸 (高, 宽, ...)
+        padding: 每侧向外扩展的比例（相对于检测框宽高）
+        min_size: 裁剪区域的最小边长(像素)
+
+    Returns:
+        Tuple[int, int, int, int]: 裁剪区域 x1, y1, x2, y2（已限制在图像范围内）
+    """
+    height, width = frame_shape[:2]
+    x1, y1, x2, y2 = (float(v) for v in bbox)
+    cx, cy = (x1 + x2) / 2, (y1 + y2) / 2
+
+    roi_w = min(width, max(min_size, (x2 - x1) * (1 + 2 * padding)))
+    roi_h = min(height, max(min_size, (y2 - y1) * (1 + 2 * padding)))
+
+    # 平移而非截断，使区域尽量保持完整尺寸
+    left = int(round(min(max(cx - roi_w / 2, 0), width - roi_w)))
+    top = int(round(min(max(cy - roi_h / 2, 0), height - roi_h)))
+    return left, top, left + int(round(roi_w)), top + int(round(roi_h))
+
+
+def box_iou(boxes_a: np.ndarray, boxes_b: np.ndarray) -> np.ndarray:
+    """计算两组检测框之间的IoU矩阵
+
+    Args:
+        boxes_a: (N, 4) 检测框，格式为 x1, y1, x2, y2
+        boxes_b: (M, 4) 检测框，格式为 x1, y1, x2, y2
+
+    Returns:
+        np.ndarray: (N, M) IoU矩阵
+    """
+    boxes_a = np.asarray(boxes_a, dtype=np.float32).reshape(-1, 4)
+    boxes_b = np.asarray(boxes_b, dtype=np.float32).reshape(-1, 4)
+
+    # 交集区域
+    x1 = np.maximum(boxes_a[:, None, 0], boxes_b[None, :, 0])
+    y1 = np.maximum(boxes_a[:, None, 1], boxes_b[None, :, 1])
+    x2 = np.minimum(boxes_a[:, None, 2], boxes_b[None, :, 2])
+    y2 = np.minimum(boxes_a[:, None, 3], boxes_b[None, :, 3])
+    intersection = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+
+    area_a = (boxes_a[:, 2] - boxes_a[:, 0]) * (boxes_a[:, 3] - boxes_a[:, 1])
+    area_b = (boxes_b[:, 2] - boxes_b[:, 0]) * (boxes_b[:, 3] - boxes_b[:, 1])
+    union = area_a[:, None] + area_b[None, :] - intersection
+
+    return np.where(union > 0, intersection / np.maximum(union, 1e-9), 0.0).astype(np.float32)
+
+
+def greedy_match(cost: np.ndarray, threshold: float) -> Tuple[List[Tuple[int, int]], np.ndarray, np.ndarray]:
+    """按IoU从大到小贪心匹配
+
+    Args:
+        cost: (T, D) IoU矩阵
+        threshold: 最小IoU
+
+    Returns:
+        Tuple: (匹配对列表, 未匹配行索引, 未匹配列索引)
+    """
+    rows, cols = cost.shape
+    matches = []
+    if rows and cols:
+        row_used = np.zeros(rows, dtype=bool)
+        col_used = np.zeros(cols, dtype=bool)
+        order = np.argsort(-cost, axis=None)
+        for r, c in zip(*np.unravel_index(order, cost.shape)):
+            if cost[r, c] < threshold:
+                break
+            if row_used[r] or col_used[c]:
+                continue
+            row_used[r] = col_used[c] = True
+            matches.append((int(r), int(c)))
+
+    matched_rows = {r for r, _ in matches}
+    matched_cols = {c for _, c in matches}
+    unmatched_rows = np.array([r for r in range(rows) if r not in matched_rows], dtype=int)
+    unmatched_cols = np.array([c for c in range(cols) if c not in matched_cols], dtype=int)
+    return matches, unmatched_rows, unmatched_cols
+
+
+def fuse_detections(boxes: np.ndarray, scores: np.ndarray, classes: np.ndarray,
+                    frame_ids: np.ndarray, num_frames: int,
+                    iou_threshold: float = 0.5) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """融合多帧检测结果，每个物理目标输出一个检测
+
+    按置信度从高到低依次选取锚点，将其他帧中同类别且IoU超过阈值的检测
+    关联到该锚点（每帧最多关联一个），再按置信度加权平均检测框。
+
+    Args:
+        boxes: (N, 4) 所有帧的检测框
+        scores: (N,) 置信度
+        classes: (N,) 类别
+        frame_ids: (N,) 检测所属帧的索引
+        num_frames: 参与融合的帧数
+        iou_threshold: 关联IoU阈值
+
+    Returns:
+        Tuple: (融合检测框(K, 4), 平均置信度(K,), 类别(K,), 稳定度(K,))
+        稳定度为目标出现的帧数占参与融合帧数的比例
+    """
+    boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+    scores = np.asarray(scores, dtype=np.float32).reshape(-1)
+    classes = np.asarray(classes).reshape(-1)
+    frame_ids = np.asarray(frame_ids).reshape(-1)
+
+    n = len(boxes)
+    if n == 0:
+        return (np.zeros((0, 4), dtype=np.float32), np.zeros(0, dtype=np.float32),
+                np.zeros(0, dtype=classes.dtype), np.zeros(0, dtype=np.float32))
+
+    # 同类别、不同帧之间的关联度
+    affinity = box_iou(boxes, boxes)
+    affinity[classes[:, None] != classes[None, :]] = 0.0
+    affinity[frame_ids[:, None] == frame_ids[None, :]] = 0.0
+    np.fill_diagonal(affinity, 1.0)
+
+    assigned = np.zeros(n, dtype=bool)
+    fused_boxes, fused_scores, fused_classes, stability = [], [], [], []
+
+    for anchor in np.argsort(-scores, kind='stable'):
+        if assigned[anchor]:
+            continue
+
+        candidates = np.flatnonzero(~assigned & (affinity[anchor] >= iou_threshold))
+
+        # 每帧只保留与锚点IoU最大的检测
+        order = np.lexsort((-affinity[anchor, candidates], frame_ids[candidates]))
+        candidates = candidates[order]
+        _, first = np.unique(frame_ids[candidates], return_index=True)
+        members = candidates[first]
+        assigned[members] = True
+
+        weights = scores[members]
+        fused_boxes.append((boxes[members] * weights[:, None]).sum(axis=0) / max(weights.sum(), 1e-9))
+        fused_scores.append(weights.mean())
+        fused_classes.append(classes[anchor])
+        stability.append(len(members) / max(num_frames, 1))
+
+    return (np.asarray(fused_boxes, dtype=np.float32), np.asarray(fused_scores, dtype=np.float32),
+            np.asarray(fused_classes, dtype=classes.dtype), np.asarray(stability, dtype=np.float32))
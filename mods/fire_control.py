@@ -0,0 +1,188 @@
+"""
+开火控制模块
+开火请求立即返回，由后台脉冲线程输出HIGH/LOW脉冲；按冷却时间和连发限制
+决定是否受理请求，并记录每次触发的精确时间戳，可导出为JSON用于延迟分析
+"""
+
+import json
+import logging
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class FireController:
+    """非阻塞开火控制"""
+
+    def __init__(self, gpio, pin: int, pulse_width: float = 0.1, cooldown: float = 0.5,
+                 burst_limit: int = 3, burst_window: float = 2.0, history: int = 500):
+        """
+        Args:
+            gpio: GPIO模块（RPi.GPIO或mods.mock_gpio.GPIO），引脚需已设置为输出
+            pin: 开火引脚
+            pulse_width: 开火脉冲宽度(秒)
+            cooldown: 两次开火之间的最短间隔(秒)，从上一次受理请求开始计时
+            burst_limit: burst_window内最多开火次数，0表示不限制
+            burst_window: 连发限制的统计窗口(秒)
+            history: 保留的触发记录数
+        """
+        self.gpio = gpio
+        self.pin = pin
+        self.pulse_width = pulse_width
+        self.cooldown = cooldown
+        self.burst_limit = burst_limit
+        self.burst_window = burst_window
+
+        self.condition = threading.Condition()
+        self.pending = None  # 已受理、等待脉冲线程执行的请求
+        self.pulsing = False
+        self.last_trigger = None  # 最近一次受理请求的时刻
+        self.recent = deque()  # burst_window内受理请求的时刻
+        self.triggers = deque(maxlen=history)  # 触发记录
+        self.running = False
+        self.thread = None
+
+        # 统计信息
+        self.requests = 0
+        self.shots = 0
+        self.rejected_busy = 0  # 脉冲进行中
+        self.rejected_cooldown = 0
+        self.rejected_burst = 0
+        self.errors = 0
+
+    def start(self):
+        """启动脉冲线程"""
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._pulse_loop, name="FireController", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """停止脉冲线程，确保引脚为LOW"""
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+        if self.thread is not None:
+            self.thread.join(timeout=1.0)
+            self.thread = None
+        try:
+            self.gpio.output(self.pin, self.gpio.LOW)
+        except Exception as e:
+            logger.error(f"开火引脚复位失败: {e}")
+
+    def trigger(self, frame_timestamp: Optional[float] = None) -> bool:
+        """请求开火，立即返回
+
+        Args:
+            frame_timestamp: 触发开火的帧采集时刻（time.monotonic()），用于统计帧到开火的延迟
+
+        Returns:
+            bool: 请求是否被受理（脉冲进行中、冷却中或超过连发限制时为False）
+        """
+        now = time.monotonic()
+        with self.condition:
+            self.requests += 1
+            if not self.running:
+                return False
+            if self.pulsing or self.pending is not None:
+                self.rejected_busy += 1
+                return False
+            if self.last_trigger is not None and now - self.last_trigger < self.cooldown:
+                self.rejected_cooldown += 1
+                return False
+            while self.recent and now - self.recent[0] >= self.burst_window:
+                self.recent.popleft()
+            if self.burst_limit and len(self.recent) >= self.burst_limit:
+                self.rejected_burst += 1
+                return False
+
+            self.last_trigger = now
+            self.recent.append(now)
+            self.pending = {'requested': now, 'frame_timestamp': frame_timestamp}
+            self.condition.notify()
+        return True
+
+    def _pulse_loop(self):
+        """脉冲线程主循环"""
+        while True:
+            with self.condition:
+                while self.running and self.pending is None:
+                    self.condition.wait()
+                if not self.running:
+                    break
+                record, self.pending = self.pending, None
+                self.pulsing = True
+
+            try:
+                self.gpio.output(self.pin, self.gpio.HIGH)
+                record['high'] = time.monotonic()
+                # 脉冲期间不持有锁，trigger()可立即返回拒绝
+                deadline = record['high'] + self.pulse_width
+                while True:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    time.sleep(remaining)
+                self.gpio.output(self.pin, self.gpio.LOW)
+                record['low'] = time.monotonic()
+                logger.info("开火执行")
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"开火失败: {e}")
+                try:
+                    self.gpio.output(self.pin, self.gpio.LOW)
+                except Exception:
+                    pass
+            finally:
+                with self.condition:
+                    self.pulsing = False
+                    if 'low' in record:
+                        self.shots += 1
+                        self.triggers.append(record)
+
+    def is_ready(self, now: Optional[float] = None) -> bool:
+        """当前是否可以受理开火请求"""
+        now = time.monotonic() if now is None else now
+        with self.condition:
+            if self.pulsing or self.pending is not None:
+                return False
+            if self.last_trigger is not None and now - self.last_trigger < self.cooldown:
+                return False
+            recent = sum(1 for t in self.recent if now - t < self.burst_window)
+            return not self.burst_limit or recent < self.burst_limit
+
+    def get_triggers(self) -> List[Dict]:
+        """获取触发记录（requested/high/low及frame_timestamp，均为time.monotonic()时刻）"""
+        with self.condition:
+            return [dict(record) for record in self.triggers]
+
+    def get_stats(self) -> Dict:
+        """获取开火统计信息"""
+        triggers = self.get_triggers()
+        dispatch = np.array([r['high'] - r['requested'] for r in triggers]) if triggers else np.zeros(1)
+        width = np.array([r['low'] - r['high'] for r in triggers]) if triggers else np.zeros(1)
+        frame = [r['high'] - r['frame_timestamp'] for r in triggers if r['frame_timestamp'] is not None]
+        return {
+            'shots': self.shots,
+            'requests': self.requests,
+            'rejected_busy': self.rejected_busy,
+            'rejected_cooldown': self.rejected_cooldown,
+            'rejected_burst': self.rejected_burst,
+            'errors': self.errors,
+            'dispatch_ms': float(dispatch.mean() * 1000),
+            'dispatch_max_ms': float(dispatch.max() * 1000),
+            'pulse_width_ms': float(width.mean() * 1000),
+            'frame_to_fire_ms': float(np.mean(frame) * 1000) if frame else None
+        }
+
+    def export(self, path: str):
+        """将触发记录和统计信息导出为JSON"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'stats': self.get_stats(), 'triggers': self.get_triggers()}, f, indent=2, ensure_ascii=False)
+        logger.info(f"开火记录已导出到 {path}")
@@ -0,0 +1,133 @@
+"""
+推理后端模块
+负责将PyTorch权重导出为ONNX/OpenVINO/NCNN格式并缓存在权重文件旁，
+之后启动时直接加载导出的模型；导出或加载失败时回退到PyTorch。
+INT8量化模型由yolo_quantize_tool.py生成，此处只负责加载
+"""
+
+import logging
+import os
+import numpy as np
+from typing import Optional, Sequence, Tuple
+
+from ultralytics.models.yolo import YOLO
+
+logger = logging.getLogger(__name__)
+
+# 支持的推理后端
+SUPPORTED_BACKENDS = ('pytorch', 'onnx', 'openvino', 'ncnn', 'onnx-int8')
+
+# 各后端导出产物相对于权重文件的后缀
+EXPORT_SUFFIXES = {
+    'onnx': '.onnx',
+    'openvino': '_openvino_model',
+    'ncnn': '_ncnn_model',
+    'onnx-int8': '_int8.onnx',
+}
+
+# 需要离线生成（需要校准数据），不能在启动时自动导出的后端
+OFFLINE_BACKENDS = ('onnx-int8',)
+
+# 支持动态输入尺寸的后端（区域推理和自适应分辨率需要）
+DYNAMIC_BACKENDS = ('onnx', 'openvino')
+
+
+def supports_dynamic_imgsz(backend: str) -> bool:
+    """后端是否支持逐帧改变输入尺寸"""
+    return backend == 'pytorch' or backend in DYNAMIC_BACKENDS or backend in OFFLINE_BACKENDS
+
+
+def exported_model_path(weights: str, backend: str) -> str:
+    """获取导出模型的缓存路径（与权重文件位于同一目录）"""
+    stem, _ = os.path.splitext(weights)
+    return stem + EXPORT_SUFFIXES[backend]
+
+
+def is_export_fresh(weights: str, exported: str) -> bool:
+    """检查导出模型是否存在且不早于权重文件"""
+    if not os.path.exists(exported):
+        return False
+    return os.path.getmtime(exported) >= os.path.getmtime(weights)
+
+
+def export_model(weights: str, backend: str, imgsz: int = 640) -> Optional[str]:
+    """将PyTorch权重导出为指定后端格式
+
+    Args:
+        weights: .pt权重路径
+        backend: 目标后端
+        imgsz: 导出输入尺寸
+
+    Returns:
+        Optional[str]: 导出模型路径，失败时返回None
+    """
+    try:
+        logger.info(f"导出 {weights} 为 {backend} 格式...")
+        model = YOLO(weights)
+        exported = model.export(format=backend, imgsz=imgsz,
+                                dynamic=backend in DYNAMIC_BACKENDS, verbose=False)
+        logger.info(f"导出完成: {exported}")
+        return str(exported)
+    except Exception as e:
+        logger.error(f"导出 {backend} 模型失败: {e}")
+        return None
+
+
+def warmup_model(model: YOLO, imgsz: int = 640, sizes: Sequence[int] = ()):
+    """按imgsz及sizes中的每个输入尺寸执行一次空推理，完成后端加载和初始化
+
+    首次推理（及PyTorch每个新输入尺寸的首次推理）包含冷启动开销，
+    预热后的实测耗时才能用于自适应分辨率的耗时估计。
+    """
+    for size in dict.fromkeys([imgsz, *sizes]):
+        model.predict(np.zeros((size, size, 3), dtype=np.uint8), imgsz=size, verbose=False)
+
+
+def load_model(weights: str = 'mods/best.pt', backend: str = 'pytorch', imgsz: int = 640,
+               warmup_sizes: Sequence[int] = ()) -> Tuple[YOLO, str]:
+    """按指定后端加载YOLO模型
+
+    非PyTorch后端优先使用缓存的导出模型，缓存不存在或比权重文件旧时重新导出；
+    导出或加载失败时回退到PyTorch。
+
+    Args:
+        weights: .pt权重路径
+        backend: 推理后端，取值见SUPPORTED_BACKENDS
+        imgsz: 导出及预热使用的输入尺寸
+        warmup_sizes: 额外预热的输入尺寸（自适应分辨率的候选尺寸），仅对支持动态尺寸的后端生效
+
+    Returns:
+        Tuple[YOLO, str]: (模型, 实际使用的后端)
+    """
+    if backend not in SUPPORTED_BACKENDS:
+        raise ValueError(f"不支持的推理后端: {backend}，可选: {', '.join(SUPPORTED_BACKENDS)}")
+
+    if backend != 'pytorch':
+        exported = exported_model_path(weights, backend)
+        if backend in OFFLINE_BACKENDS:
+            if not os.path.exists(exported):
+                logger.error(f"未找到 {backend} 模型 {exported}，请先运行 yolo_quantize_tool.py 生成")
+                exported = None
+            elif not is_export_fresh(weights, exported):
+                logger.warning(f"{exported} 早于权重文件，建议重新量化")
+        elif not is_export_fresh(weights, exported):
+            exported = export_model(weights, backend, imgsz)
+
+        if exported:
+            try:
+                model = YOLO(exported, task='detect')
+                warmup_model(model, imgsz, warmup_sizes if supports_dynamic_imgsz(backend) else ())
+                logger.info(f"使用 {backend} 后端: {exported}")
+                return model, backend
+            except Exception as e:
+                logger.error(f"加载 {backend} 模型失败: {e}")
+
+        logger.warning(f"{backend} 后端不可用，回退到PyTorch")
+
+    model = YOLO(weights)
+    try:
+        warmup_model(model, imgsz, warmup_sizes)
+    except Exception as e:
+        logger.warning(f"PyTorch模型预热失败: {e}")
+    logger.info(f"使用 pytorch 后端: {weights}")
+    return model, 'pytorch'
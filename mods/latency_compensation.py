@@ -0,0 +1,144 @@
+"""
+延迟补偿模块
+统计每帧从采集到命令生效的端到端延迟（采集、推理、串口），由跟踪器的像素速度
+经角度查找表换算目标角速度，用于瞄准命令生效时刻的目标位置；
+同时记录预测值与之后实际观测值的偏差，指标可导出为JSON离线验证补偿效果
+"""
+
+import json
+import logging
+from collections import deque
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+LATENCY_COMPONENTS = ('capture', 'inference', 'serial', 'total')
+
+
+class LatencyCompensator:
+    """延迟测量与目标位置预测"""
+
+    def __init__(self, angle_calc, window: int = 500, rate_horizon: float = 0.1,
+                 max_lead: float = 0.5, match_tolerance: float = 0.02):
+        """
+        Args:
+            angle_calc: 角度计算器（提供pixels_to_angles）
+            window: 延迟和预测误差的统计窗口(样本数)
+            rate_horizon: 由像素速度换算角速度时的差分时长(秒)
+            max_lead: 预测时长上限(秒)，防止异常延迟导致过度外推
+            match_tolerance: 预测时刻与观测帧采集时刻的最大允许偏差(秒)
+        """
+        self.angle_calc = angle_calc
+        self.rate_horizon = rate_horizon
+        self.max_lead = max_lead
+        self.match_tolerance = match_tolerance
+
+        self.latency = {name: deque(maxlen=window) for name in LATENCY_COMPONENTS}
+        self.pending = deque(maxlen=64)  # 待验证的预测
+        self.errors = deque(maxlen=window)  # 预测误差记录
+
+    def record_latency(self, capture: float, inference: float, serial: float) -> float:
+        """记录一帧的各段延迟
+
+        Args:
+            capture: 帧采集到主循环取得该帧的延迟(秒)
+            inference: 检测结果对应帧的采集时刻到当前的延迟(秒)，包含排队和推理
+            serial: 命令发送到执行的延迟(秒)
+
+        Returns:
+            float: 端到端延迟(秒)
+        """
+        total = inference + serial
+        for name, value in zip(LATENCY_COMPONENTS, (capture, inference, serial, total)):
+            self.latency[name].append(value)
+        return total
+
+    def lead_time(self, latency: float) -> float:
+        """预测时长（按上限截断）"""
+        return float(np.clip(latency, 0.0, self.max_lead))
+
+    def angular_velocity(self, bbox: np.ndarray, velocity: np.ndarray) -> Tuple[float, float]:
+        """将目标像素速度换算为角速度
+
+        Args:
+            bbox: 目标检测框 [x1, y1, x2, y2]
+            velocity: 目标中心像素速度 [vx, vy](像素/秒)
+
+        Returns:
+            Tuple[float, float]: (水平角速度, 垂直角速度)(度/秒)
+        """
+        center = np.array([(bbox[0] + bbox[2]) / 2, (bbox[1] + bbox[3]) / 2], dtype=np.float32)
+        points = np.stack([center, center + np.asarray(velocity, dtype=np.float32) * self.rate_horizon])
+        angles = self.angle_calc.pixels_to_angles(points)
+        rate = (angles[1] - angles[0]) / self.rate_horizon
+        return float(rate[0]), float(rate[1])
+
+    def record_prediction(self, target_time: float, track_id: Optional[int],
+                          predicted: Tuple[float, float], uncompensated: Tuple[float, float]):
+        """记录一次预测，待目标在target_time附近被再次观测时计算误差
+
+        Args:
+            target_time: 预测对应的时刻（命令生效时刻）
+            track_id: 目标跟踪ID
+            predicted: 补偿后的预测角度（世界坐标系，度）
+            uncompensated: 不做补偿时的角度（即测量值，世界坐标系，度）
+        """
+        if track_id is None:
+            return
+        self.pending.append((target_time, track_id, predicted, uncompensated))
+
+    def observe(self, timestamp: float, track_id: Optional[int], measured: Tuple[float, float]):
+        """用新的观测验证到期的预测
+
+        Args:
+            timestamp: 观测帧采集时刻
+            track_id: 目标跟踪ID
+            measured: 观测角度（世界坐标系，度）
+        """
+        while self.pending and self.pending[0][0] < timestamp - self.match_tolerance:
+            self.pending.popleft()  # 过期未验证的预测
+        if track_id is None:
+            return
+
+        for target_time, pending_id, predicted, uncompensated in self.pending:
+            if abs(target_time - timestamp) > self.match_tolerance:
+                continue
+            if pending_id == track_id:
+                self.errors.append({
+                    'timestamp': timestamp,
+                    'track_id': track_id,
+                    'error': (measured[0] - predicted[0], measured[1] - predicted[1]),
+                    'uncompensated_error': (measured[0] - uncompensated[0], measured[1] - uncompensated[1])
+                })
+                break
+
+    def get_stats(self) -> Dict:
+        """获取延迟和预测误差统计"""
+        stats = {}
+        for name, samples in self.latency.items():
+            values = np.array(samples) if samples else np.zeros(1)
+            stats[f'{name}_ms'] = float(values.mean() * 1000)
+            stats[f'{name}_p95_ms'] = float(np.percentile(values, 95) * 1000)
+
+        if self.errors:
+            errors = np.array([e['error'] for e in self.errors])
+            baseline = np.array([e['uncompensated_error'] for e in self.errors])
+            stats['prediction_samples'] = len(errors)
+            stats['prediction_rms'] = np.sqrt((errors ** 2).mean(axis=0)).tolist()
+            stats['uncompensated_rms'] = np.sqrt((baseline ** 2).mean(axis=0)).tolist()
+        else:
+            stats['prediction_samples'] = 0
+        return stats
+
+    def export(self, path: str):
+        """导出统计信息和原始样本为JSON"""
+        data = {
+            'stats': self.get_stats(),
+            'latency': {name: list(samples) for name, samples in self.latency.items()},
+            'prediction_errors': list(self.errors)
+        }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        logger.info(f"延迟补偿指标已导出到: {path}")
@@ -3,10 +3,15 @@
 """
 
 import logging
+import random
+import threading
 import time
 from typing import Optional, Any, Dict
 from io import BytesIO
 
+from mods.chassis_protocol import (FLAG_ACK_REQUEST, FrameDecoder, encode_ack, encode_telemetry, format_telemetry,
+                                   frame_to_command, parse_command)
+
 logger = logging.getLogger(__name__)
 
 class MockSerial:
@@ -119,3 +124,123 @@ def create_mock_serial(port: str, baudrate: int = 115200, timeout: Optional[floa
 class Serial(MockSerial):
     """模拟的serial.Serial类，保持与真实serial模块相同的接口"""
     pass
+
+class MockChassis(MockSerial):
+    """模拟底盘STM32，解析收到的ASCII或二进制帧命令，按请求回复应答帧
+
+    可按比例模拟丢失或损坏的字节，用于验证二进制协议的校验和应答。
+    指定telemetry_interval时按命令的目标角度以turn_rate匀速转动，并定时上报航向遥测。
+    """
+    
+    def __init__(self, port: str, baudrate: int = 115200, timeout: Optional[float] = None,
+                 protocol: str = 'binary', drop_rate: float = 0.0, corrupt_rate: float = 0.0,
+                 telemetry_interval: Optional[float] = None, turn_rate: float = 90.0,
+                 setpoint_mode: str = 'absolute'):
+        super().__init__(port, baudrate, timeout)
+        self.protocol = protocol
+        self.setpoint_mode = setpoint_mode  # R/L命令语义，见chassis_protocol模块说明
+        self.drop_rate = drop_rate
+        self.corrupt_rate = corrupt_rate
+        self._decoder = FrameDecoder()
+        self._line = bytearray()
+        self._responses = bytearray()
+        self._lock = threading.Lock()
+        self._random = random.Random(0)
+        self.received_commands: list = []  # 解析出的规范化命令
+        
+        # 航向模拟
+        self.telemetry_interval = telemetry_interval
+        self.turn_rate = turn_rate
+        self.heading = 0.0  # 当前航向(度)
+        self.setpoint = 0.0  # 目标航向(度)
+        self._sim_time = time.monotonic()
+        self._next_telemetry = self._sim_time
+        self._telemetry_seq = 0
+    
+    @property
+    def in_waiting(self) -> int:
+        """待读取的应答和遥测字节数"""
+        self._simulate()
+        return len(self._responses)
+    
+    def _simulate(self):
+        """推进航向模拟，到达上报时刻时生成遥测"""
+        if self.telemetry_interval is None:
+            return
+        with self._lock:
+            now = time.monotonic()
+            while self._next_telemetry <= now:
+                step = self.turn_rate * (self._next_telemetry - self._sim_time)
+                self.heading += max(-step, min(step, self.setpoint - self.heading))
+                self._sim_time = self._next_telemetry
+                if self.protocol == 'binary':
+                    self._responses.extend(encode_telemetry(self.heading, 0.0, 0.0, self._telemetry_seq))
+                else:
+                    heading = (self.heading + 180.0) % 360.0 - 180.0
+                    self._responses.extend((format_telemetry(heading, 0.0, 0.0) + '\n').encode())
+                self._telemetry_seq += 1
+                self._next_telemetry += self.telemetry_interval
+    
+    def _apply_command(self, command: str):
+        """记录命令并按setpoint_mode更新目标航向"""
+        self.received_commands.append(command)
+        try:
+            name, angle = parse_command(command)
+        except ValueError:
+            return
+        with self._lock:
+            if name == 'S':
+                self.setpoint = self.heading
+            elif self.setpoint_mode == 'relative':
+                self.setpoint += angle if name == 'R' else -angle
+            else:
+                self.setpoint = angle if name == 'R' else -angle
+    
+    def _corrupt(self, data: bytes) -> bytes:
+        """模拟传输中的丢字节和错字节"""
+        if not self.drop_rate and not self.corrupt_rate:
+            return data
+        output = bytearray()
+        for byte in data:
+            if self._random.random() < self.drop_rate:
+                continue
+            if self._random.random() < self.corrupt_rate:
+                byte ^= 1 << self._random.randrange(8)
+            output.append(byte)
+        return bytes(output)
+    
+    def write(self, data: bytes) -> int:
+        """接收主机数据并解析命令"""
+        if not self._is_open:
+            logger.warning(f"模拟串口: 串口 {self.port} 未打开，无法写入")
+            return 0
+        
+        self._write_log.append(data)
+        received = self._corrupt(data)
+        if self.protocol == 'binary':
+            for frame in self._decoder.feed(received):
+                self._apply_command(frame_to_command(frame))
+                if frame['flags'] & FLAG_ACK_REQUEST:
+                    with self._lock:
+                        self._responses.extend(encode_ack(frame))
+        else:
+            self._line.extend(received)
+            while b'\n' in self._line:
+                line, _, rest = bytes(self._line).partition(b'\n')
+                self._line = bytearray(rest)
+                self._apply_command(line.decode(errors='replace'))
+        
+        logger.debug(f"模拟底盘: 收到 {len(data)} 字节数据: {data.hex()}")
+        return len(data)
+    
+    def read(self, size: int = 1) -> bytes:
+        """读取应答数据"""
+        if not self._is_open:
+            return b''
+        self._simulate()
+        with self._lock:
+            data = bytes(self._responses[:size])
+            del self._responses[:size]
+        if not data and self.timeout:
+            time.sleep(min(self.timeout, 0.01))  # 模拟短暂等待
+        return data
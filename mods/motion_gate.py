@@ -0,0 +1,107 @@
+"""
+运动门控模块
+在YOLO推理之前用降采样灰度帧差判断画面是否变化，静止场景下跳过推理、
+复用上一次的检测结果，并按最大间隔强制推理
+"""
+
+import time
+import cv2
+import numpy as np
+from typing import Dict, Optional
+
+
+class MotionGate:
+    """基于降采样帧差的推理门控"""
+
+    def __init__(self, downsample_width: int = 160, pixel_threshold: int = 12,
+                 motion_ratio: float = 0.005, max_age: float = 1.0):
+        """
+        Args:
+            downsample_width: 降采样后的图像宽度(像素)
+            pixel_threshold: 灰度差超过该值的像素视为变化
+            motion_ratio: 变化像素比例超过该值时认为场景有运动
+            max_age: 距上次推理超过该时间(秒)时强制推理
+        """
+        self.downsample_width = downsample_width
+        self.pixel_threshold = pixel_threshold
+        self.motion_ratio = motion_ratio
+        self.max_age = max_age
+
+        self.reference = None  # 上次推理时的降采样灰度帧
+        self.last_inference_time = None
+        self.last_motion_ratio = 0.0
+
+        # 统计信息
+        self.frames = 0
+        self.skipped = 0
+        self.forced = 0
+        self.gate_time = 0.0  # 门控计算累计耗时(秒)
+
+    def _downsample(self, frame: np.ndarray) -> np.ndarray:
+        """降采样并转换为灰度图"""
+        height, width = frame.shape[:2]
+        size = (self.downsample_width, max(1, int(height * self.downsample_width / width)))
+        small = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return small
+
+    def should_infer(self, frame: np.ndarray, timestamp: Optional[float] = None) -> bool:
+        """判断当前帧是否需要推理
+
+        Args:
+            frame: 图像数据
+            timestamp: 帧采集时间（time.monotonic()），缺省时使用当前时间
+
+        Returns:
+            bool: 需要推理时返回True，此时当前帧成为新的参考帧
+        """
+        start = time.perf_counter()
+        timestamp = timestamp if timestamp is not None else time.monotonic()
+        self.frames += 1
+
+        small = self._downsample(frame)
+        if self.reference is None or self.reference.shape != small.shape:
+            infer = True
+        else:
+            changed = cv2.absdiff(small, self.reference) > self.pixel_threshold
+            self.last_motion_ratio = float(np.count_nonzero(changed)) / changed.size
+            infer = self.last_motion_ratio >= self.motion_ratio
+            if not infer and timestamp - self.last_inference_time >= self.max_age:
+                infer = True
+                self.forced += 1
+
+        if infer:
+            self.reference = small
+            self.last_inference_time = timestamp
+        else:
+            self.skipped += 1
+
+        self.gate_time += time.perf_counter() - start
+        return infer
+
+    def reset(self):
+        """清除参考帧，下一帧必定推理"""
+        self.reference = None
+
+    def get_stats(self, inference_time: float = 0.0) -> Dict:
+        """获取门控统计信息
+
+        Args:
+            inference_time: 单次推理平均耗时(秒)，用于估算节省的CPU时间
+
+        Returns:
+            Dict: 跳过率、门控耗时及估算节省的CPU时间
+        """
+        saved = self.skipped * inference_time - self.gate_time
+        baseline = self.frames * inference_time
+        return {
+            'frames': self.frames,
+            'skipped': self.skipped,
+            'forced': self.forced,
+            'skip_ratio': self.skipped / self.frames if self.frames else 0.0,
+            'motion_ratio': self.last_motion_ratio,
+            'gate_time_ms': self.gate_time / self.frames * 1000 if self.frames else 0.0,
+            'cpu_saved_s': saved,
+            'cpu_saved_ratio': saved / baseline if baseline > 0 else 0.0
+        }
@@ -0,0 +1,290 @@
+"""
+流水线运行框架
+每个阶段运行在独立线程中，阶段之间通过有界队列连接，队列满时按丢弃策略处理
+（阻塞、丢弃最旧、丢弃最新），各阶段独立统计吞吐率、处理耗时和队列深度，
+慢阶段不会拖慢上游，只会使其输入队列按策略丢弃数据
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DROP_POLICIES = ('block', 'drop_oldest', 'drop_newest')
+
+
+class StageQueue:
+    """阶段间有界队列
+
+    drop_oldest: 队列满时丢弃最旧的数据（只关心最新数据，如帧和目标估计）
+    drop_newest: 队列满时丢弃新数据（已排队的请求优先）
+    block: 队列满时阻塞生产者，超时后丢弃新数据
+    """
+
+    def __init__(self, name: str, maxsize: int = 1, policy: str = 'drop_oldest', block_timeout: float = 0.1):
+        """
+        Args:
+            name: 队列名称
+            maxsize: 最大长度
+            policy: 丢弃策略，见DROP_POLICIES
+            block_timeout: block策略下生产者的最长等待时间(秒)
+        """
+        if policy not in DROP_POLICIES:
+            raise ValueError(f"不支持的丢弃策略: {policy}")
+        if maxsize < 1:
+            raise ValueError("队列长度至少为1")
+        self.name = name
+        self.maxsize = maxsize
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self.condition = threading.Condition()
+        self.items = deque()
+        self.closed = False
+
+        # 统计信息
+        self.offered = 0  # put()调用次数
+        self.put_count = 0
+        self.dropped = 0
+        self.max_depth = 0
+        self.depths = deque(maxlen=1000)  # 入队时的队列深度
+
+    def put(self, item: Any) -> bool:
+        """放入数据，被丢弃时返回False（drop_oldest策略下丢弃的是旧数据，返回True）"""
+        with self.condition:
+            if self.closed:
+                return False
+            self.offered += 1
+            if len(self.items) >= self.maxsize:
+                if self.policy == 'drop_oldest':
+                    self.items.popleft()
+                    self.dropped += 1
+                elif self.policy == 'drop_newest':
+                    self.dropped += 1
+                    return False
+                else:
+                    deadline = time.monotonic() + self.block_timeout
+                    while len(self.items) >= self.maxsize and not self.closed:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self.condition.wait(remaining)
+                    if len(self.items) >= self.maxsize or self.closed:
+                        self.dropped += 1
+                        return False
+            self.items.append(item)
+            self.put_count += 1
+            self.depths.append(len(self.items))
+            self.max_depth = max(self.max_depth, len(self.items))
+            self.condition.notify_all()
+            return True
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Any]:
+        """取出数据，超时或队列关闭时返回None"""
+        with self.condition:
+            if not self.items and not self.closed:
+                self.condition.wait_for(lambda: self.items or self.closed, timeout)
+            if not self.items:
+                return None
+            item = self.items.popleft()
+            self.condition.notify_all()
+            return item
+
+    def close(self):
+        """关闭队列，唤醒所有等待的线程"""
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+    def __len__(self) -> int:
+        with self.condition:
+            return len(self.items)
+
+    def get_stats(self) -> Dict:
+        """获取队列统计信息"""
+        with self.condition:
+            depths = np.array(self.depths) if self.depths else np.zeros(1)
+            return {
+                'policy': self.policy,
+                'maxsize': self.maxsize,
+                'depth': len(self.items),
+                'mean_depth': float(depths.mean()),
+                'max_depth': self.max_depth,
+                'put': self.put_count,
+                'dropped': self.dropped,
+                'drop_ratio': self.dropped / self.offered if self.offered else 0.0
+            }
+
+
+class Stage:
+    """流水线阶段
+
+    有输入队列时，每取到一条数据调用一次func(item)；没有输入队列时为源阶段，
+    反复调用func()。func返回None表示没有输出，否则结果放入所有输出队列。
+    """
+
+    def __init__(self, name: str, func: Callable[..., Any], input: Optional[StageQueue] = None,
+                 outputs: Sequence[StageQueue] = (), idle_sleep: float = 0.001, window: int = 200):
+        """
+        Args:
+            name: 阶段名称
+            func: 处理函数
+            input: 输入队列，None表示源阶段
+            outputs: 输出队列
+            idle_sleep: 源阶段没有输出时的休眠时间(秒)
+            window: 吞吐率和耗时的统计窗口(处理次数)
+        """
+        self.name = name
+        self.func = func
+        self.input = input
+        self.outputs = list(outputs)
+        self.idle_sleep = idle_sleep
+        self.thread = None
+        self.stop_event = threading.Event()
+
+        # 统计信息
+        self.processed = 0
+        self.emitted = 0
+        self.errors = 0
+        self.busy_time = 0.0  # 累计处理耗时(秒)
+        self.start_time = None
+        self.durations = deque(maxlen=window)  # 单次处理耗时(秒)
+        self.finished = deque(maxlen=window)  # 处理完成时刻
+
+    def start(self):
+        """启动阶段线程"""
+        if self.thread is not None:
+            return
+        self.stop_event.clear()
+        self.start_time = time.monotonic()
+        self.thread = threading.Thread(target=self._run, name=f"Stage-{self.name}", daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout: float = 1.0):
+        """停止阶段线程（等待当前处理完成）"""
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join(timeout=timeout)
+            if self.thread.is_alive():
+                logger.warning(f"流水线阶段 {self.name} 未能在 {timeout}s 内停止")
+            self.thread = None
+
+    def _run(self):
+        """阶段线程主循环"""
+        while not self.stop_event.is_set():
+            if self.input is not None:
+                item = self.input.get(timeout=0.1)
+                if item is None:
+                    continue
+            start = time.perf_counter()
+            try:
+                result = self.func(item) if self.input is not None else self.func()
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"流水线阶段 {self.name} 处理失败: {e}")
+                result = None
+            duration = time.perf_counter() - start
+            self.busy_time += duration
+            if result is None and self.input is None:
+                # 源阶段没有新数据（空转不计入吞吐率）
+                if self.idle_sleep:
+                    self.stop_event.wait(self.idle_sleep)
+                continue
+            self.durations.append(duration)
+            self.finished.append(time.monotonic())
+            self.processed += 1
+
+            if result is None:
+                continue
+            for output in self.outputs:
+                output.put(result)
+            self.emitted += 1
+
+    def get_stats(self) -> Dict:
+        """获取阶段统计信息"""
+        elapsed = time.monotonic() - self.start_time if self.start_time else 0.0
+        durations = np.array(self.durations) if self.durations else np.zeros(1)
+        finished = list(self.finished)
+        span = finished[-1] - finished[0] if len(finished) > 1 else 0.0
+        return {
+            'processed': self.processed,
+            'emitted': self.emitted,
+            'errors': self.errors,
+            'throughput': (len(finished) - 1) / span if span > 0 else 0.0,
+            'busy_ms': float(durations.mean() * 1000),
+            'busy_p95_ms': float(np.percentile(durations, 95) * 1000),
+            'utilization': self.busy_time / elapsed if elapsed > 0 else 0.0,
+            'input_depth': len(self.input) if self.input is not None else None
+        }
+
+
+class Pipeline:
+    """由有界队列连接的多线程阶段集合"""
+
+    def __init__(self, name: str = "pipeline"):
+        self.name = name
+        self.queues: Dict[str, StageQueue] = {}
+        self.stages: Dict[str, Stage] = {}
+        self.stop_event = threading.Event()
+
+    def add_queue(self, name: str, maxsize: int = 1, policy: str = 'drop_oldest', **kwargs) -> StageQueue:
+        """添加队列"""
+        if name in self.queues:
+            raise ValueError(f"队列 {name} 已存在")
+        self.queues[name] = StageQueue(name, maxsize, policy, **kwargs)
+        return self.queues[name]
+
+    def add_stage(self, name: str, func: Callable[..., Any], input: Optional[str] = None,
+                  outputs: Sequence[str] = (), **kwargs) -> Stage:
+        """添加阶段，input和outputs为已添加的队列名称"""
+        if name in self.stages:
+            raise ValueError(f"阶段 {name} 已存在")
+        stage = Stage(name, func, self.queues[input] if input is not None else None,
+                      [self.queues[output] for output in outputs], **kwargs)
+        self.stages[name] = stage
+        return stage
+
+    def start(self):
+        """按添加顺序的逆序启动阶段（下游先就绪）"""
+        self.stop_event.clear()
+        for stage in reversed(list(self.stages.values())):
+            stage.start()
+        logger.info(f"流水线 {self.name} 已启动: {' -> '.join(self.stages)}")
+
+    def stop(self, timeout: float = 1.0):
+        """停止所有阶段"""
+        self.stop_event.set()
+        for stage in self.stages.values():
+            stage.stop_event.set()
+        for queue in self.queues.values():
+            queue.close()
+        for stage in self.stages.values():
+            stage.stop(timeout)
+        logger.info(f"流水线 {self.name} 已停止")
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """等待流水线停止，返回是否已停止"""
+        return self.stop_event.wait(timeout)
+
+    def get_stats(self) -> Dict:
+        """获取各阶段和队列的统计信息"""
+        return {
+            'stages': {name: stage.get_stats() for name, stage in self.stages.items()},
+            'queues': {name: queue.get_stats() for name, queue in self.queues.items()}
+        }
+
+    def format_stats(self) -> str:
+        """各阶段统计的单行摘要（用于日志）"""
+        parts = []
+        for name, stage in self.stages.items():
+            stats = stage.get_stats()
+            part = f"{name} {stats['throughput']:.1f}/s {stats['busy_ms']:.1f}ms {stats['utilization']:.0%}"
+            if stage.input is not None:
+                queue = stage.input.get_stats()
+                part += f" 队列{queue['depth']}/{queue['maxsize']} 丢弃{queue['dropped']}"
+            parts.append(part)
+        return " | ".join(parts)
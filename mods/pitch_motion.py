@@ -0,0 +1,178 @@
+"""
+俯仰轴异步运动模块
+由后台线程向步进电机下发绝对位置运动并跟踪完成状态，调用方提交目标后立即返回；
+运动过程中提交的新目标会抢占当前运动（直接改发新的目标位置），只执行最新的目标
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class PitchMotion:
+    """俯仰轴非阻塞运动控制"""
+
+    def __init__(self, device, steps_per_degree: float = 100, speed: int = 500, acceleration: int = 1000,
+                 poll_interval: float = 0.01, move_timeout: float = 5.0, stop_before_retarget: bool = False):
+        """
+        Args:
+            device: 步进电机设备（stepper.device.Device）
+            steps_per_degree: 每度对应的步进脉冲数
+            speed: 运动速度(步/秒)
+            acceleration: 加速度(步/秒²)
+            poll_interval: 运动中查询到位状态的间隔(秒)
+            move_timeout: 单次运动超时时间(秒)，超时后认为运动结束
+            stop_before_retarget: 抢占时是否先停止当前运动再下发新目标
+                （驱动器不支持运动中更新目标位置时使用）
+        """
+        self.device = device
+        self.steps_per_degree = steps_per_degree
+        self.speed = speed
+        self.acceleration = acceleration
+        self.poll_interval = poll_interval
+        self.move_timeout = move_timeout
+        self.stop_before_retarget = stop_before_retarget
+
+        self.condition = threading.Condition()
+        self.pending_steps = None  # 等待下发的目标位置(步)
+        self.commanded_steps = None  # 最近一次下发的目标位置(步)
+        self.moving = False
+        self.move_started = None
+        self.running = False
+        self.thread = None
+
+        # 统计信息
+        self.moves = 0
+        self.preempted = 0  # 运动中被新目标抢占的次数
+        self.completed = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.durations = deque(maxlen=100)  # 已完成运动的耗时(秒)
+
+    def start(self):
+        """启动运动线程"""
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._motion_loop, name="PitchMotion", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """停止运动线程（不停止电机，需要时调用halt()）"""
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+        if self.thread is not None:
+            self.thread.join(timeout=1.0)
+            self.thread = None
+
+    def move_to(self, angle: float):
+        """提交目标角度，立即返回
+
+        Args:
+            angle: 俯仰目标角度(度)
+        """
+        with self.condition:
+            self.pending_steps = int(round(angle * self.steps_per_degree))
+            self.condition.notify_all()
+
+    def halt(self):
+        """立即停止电机并丢弃未下发的目标"""
+        with self.condition:
+            self.pending_steps = None
+            self.commanded_steps = None
+            self.moving = False
+            self.condition.notify_all()
+        try:
+            self.device.stop()
+        except Exception as e:
+            logger.error(f"俯仰电机停止失败: {e}")
+
+    @property
+    def is_moving(self) -> bool:
+        with self.condition:
+            return self.moving or self.pending_steps is not None
+
+    @property
+    def target_angle(self) -> Optional[float]:
+        """最近一次下发的目标角度(度)"""
+        steps = self.commanded_steps
+        return steps / self.steps_per_degree if steps is not None else None
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """等待当前运动完成，超时返回False"""
+        with self.condition:
+            return self.condition.wait_for(lambda: not self.moving and self.pending_steps is None, timeout)
+
+    def _issue(self, steps: int):
+        """下发目标位置"""
+        if self.moving:
+            self.preempted += 1
+            if self.stop_before_retarget:
+                self.device.stop()
+        self.device.set_speed(self.speed)
+        self.device.set_acceleration(self.acceleration)
+        self.device.move_to(steps)
+        self.moves += 1
+        logger.debug(f"俯仰运动到 {steps / self.steps_per_degree:.2f} 度")
+
+    def _motion_loop(self):
+        """运动线程主循环"""
+        while True:
+            with self.condition:
+                if self.moving:
+                    self.condition.wait_for(lambda: not self.running or self.pending_steps is not None,
+                                            self.poll_interval)
+                else:
+                    self.condition.wait_for(lambda: not self.running or self.pending_steps is not None)
+                if not self.running:
+                    break
+                steps, self.pending_steps = self.pending_steps, None
+
+            try:
+                if steps is not None and steps != self.commanded_steps:
+                    self._issue(steps)
+                    with self.condition:
+                        self.commanded_steps = steps
+                        self.moving = True
+                        self.move_started = time.monotonic()
+                elif self.moving:
+                    elapsed = time.monotonic() - self.move_started
+                    if self.device.is_in_position:
+                        self._finish(elapsed)
+                        self.completed += 1
+                    elif elapsed > self.move_timeout:
+                        logger.warning(f"俯仰运动超时 ({elapsed:.1f}s)")
+                        self._finish(elapsed)
+                        self.timeouts += 1
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"俯仰运动失败: {e}")
+                with self.condition:
+                    self.moving = False
+                    self.commanded_steps = None  # 下次必定重新下发
+                    self.condition.notify_all()
+
+    def _finish(self, elapsed: float):
+        """标记运动结束"""
+        with self.condition:
+            self.moving = False
+            self.durations.append(elapsed)
+            self.condition.notify_all()
+
+    def get_stats(self) -> Dict:
+        """获取运动统计信息"""
+        return {
+            'moving': self.moving,
+            'target_angle': self.target_angle,
+            'moves': self.moves,
+            'preempted': self.preempted,
+            'completed': self.completed,
+            'timeouts': self.timeouts,
+            'errors': self.errors,
+            'avg_duration': sum(self.durations) / len(self.durations) if self.durations else 0.0
+        }
@@ -0,0 +1,123 @@
+"""
+多进程检测支持模块
+提供基于multiprocessing.shared_memory的帧环形缓冲区和推理工作进程入口，
+帧数据只在共享内存中写入一次，进程间只传递槽位号和紧凑的检测结果数组
+"""
+
+import logging
+import os
+import time
+import numpy as np
+from multiprocessing import shared_memory
+from typing import Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class SharedFrameRing:
+    """共享内存帧环形缓冲区
+
+    每个槽位可容纳一帧不超过slot_bytes字节的uint8图像，
+    帧的实际尺寸随任务一起传递，读取时按尺寸构造零拷贝视图。
+    """
+
+    def __init__(self, slots: int, slot_bytes: int, name: Optional[str] = None):
+        """
+        Args:
+            slots: 槽位数
+            slot_bytes: 每个槽位的字节数
+            name: 已存在的共享内存名称，为None时创建新的共享内存
+        """
+        self.slots = slots
+        self.slot_bytes = slot_bytes
+        self.owner = name is None
+        if self.owner:
+            self.shm = shared_memory.SharedMemory(create=True, size=slots * slot_bytes)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.buffer = np.ndarray((slots, slot_bytes), dtype=np.uint8, buffer=self.shm.buf)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def write(self, slot: int, frame: np.ndarray) -> Tuple[int, ...]:
+        """写入一帧，返回帧尺寸"""
+        if frame.nbytes > self.slot_bytes:
+            raise ValueError(f"帧大小 {frame.nbytes} 超过槽位容量 {self.slot_bytes}")
+        self.buffer[slot, :frame.nbytes] = frame.reshape(-1).view(np.uint8)
+        return frame.shape
+
+    def view(self, slot: int, shape: Tuple[int, ...]) -> np.ndarray:
+        """获取槽位中帧的零拷贝视图"""
+        size = int(np.prod(shape))
+        return self.buffer[slot, :size].reshape(shape)
+
+    def close(self):
+        """关闭共享内存（创建者同时释放）"""
+        self.buffer = None
+        self.shm.close()
+        if self.owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+
+
+def inference_worker(worker_id: int, model_path: str, backend: str, imgsz: int,
+                     shm_name: str, slots: int, slot_bytes: int, task_queue, result_queue,
+                     warmup_sizes: Tuple[int, ...] = (), num_threads: int = 1):
+    """推理工作进程入口（模型在所有预热尺寸上预热完成后才报告就绪）
+
+    任务格式: (ticket, slot, shape, crop, imgsz)，None表示退出
+    结果格式: (ticket, slot, worker_id, detections, inference_time, error)
+
+    num_threads限制每个进程的计算线程数，多个进程的线程池合计不超过CPU核数，
+    避免线程过度订阅抵消多进程带来的吞吐提升。
+    """
+    # 环境变量只对之后创建的线程池生效（spawn子进程可能已随主模块导入torch），因此同时显式设置
+    for variable in ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS'):
+        os.environ[variable] = str(num_threads)
+    import cv2
+    import torch
+    cv2.setNumThreads(1)
+    torch.set_num_threads(num_threads)
+
+    # 子进程中再导入，避免主进程加载不需要的依赖
+    from mods.detections import parse_results, empty_detections
+    from mods.inference_backend import load_model
+
+    ring = SharedFrameRing(slots, slot_bytes, name=shm_name)
+    try:
+        model, _ = load_model(model_path, backend, imgsz, warmup_sizes)
+    except Exception as e:
+        result_queue.put(('ready', worker_id, str(e)))
+        ring.close()
+        return
+    result_queue.put(('ready', worker_id, None))
+
+    frame = None
+    while True:
+        task = task_queue.get()
+        if task is None:
+            break
+
+        ticket, slot, shape, crop, imgsz = task
+        kwargs = {'imgsz': imgsz} if imgsz else {}
+        start = time.monotonic()
+        try:
+            frame = ring.view(slot, shape)
+            if crop is not None:
+                x1, y1, x2, y2 = crop
+                detections = parse_results(model.predict(frame[y1:y2, x1:x2], verbose=False, **kwargs))
+                detections['bbox'] += np.array([x1, y1, x1, y1], dtype=np.float32)
+            else:
+                detections = parse_results(model.predict(frame, verbose=False, **kwargs))
+            error = None
+        except Exception as e:
+            detections = empty_detections()
+            error = str(e)
+        result_queue.put((ticket, slot, worker_id, detections, time.monotonic() - start, error))
+        frame = None  # 释放共享内存视图
+
+    ring.close()
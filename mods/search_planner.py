@@ -0,0 +1,264 @@
+"""
+搜索规划模块
+按时间而非主循环次数调度底盘搜索：转到搜索角度并等待底盘到位后，停留到
+足够次数的推理结果覆盖该方向再转向下一个角度。覆盖图记录每个扇区最近一次
+被扫描的时刻，搜索模式据此优先转向未扫描或扫描较久的扇区。
+"""
+
+import logging
+import time
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SEARCH_PATTERNS = ('sweep', 'coverage', 'last_seen')
+
+
+class SearchPlanner:
+    """底盘搜索规划器
+
+    搜索模式:
+        sweep: 在角度范围内往返扫描，跳过最近已扫描的方向
+        coverage: 每次选择覆盖图中最久未扫描（扣除转动代价）的方向
+        last_seen: 从丢失目标的方向开始左右交替向外扩展，扩展完后改用coverage
+    """
+
+    def __init__(self, fov: float, pattern: str = 'sweep', limits: Tuple[float, float] = (-180.0, 180.0),
+                 overlap: float = 0.2, dwell_inferences: int = 2, min_dwell: float = 0.1,
+                 max_dwell: float = 1.5, settle_tolerance: float = 3.0, turn_rate: float = 90.0,
+                 sector_width: float = 5.0, revisit_interval: float = 10.0, travel_cost: float = 0.002,
+                 last_seen_radius: int = 2):
+        """
+        Args:
+            fov: 相机水平视场角(度)
+            pattern: 搜索模式，见SEARCH_PATTERNS
+            limits: 底盘目标角度范围(度，相对初始朝向)
+            overlap: 相邻搜索方向视场的重叠比例
+            dwell_inferences: 到位后每个方向需要的推理结果数
+            min_dwell: 推理停滞时的最短停留时间(秒)
+            max_dwell: 推理停滞时的最长停留时间(秒)
+            settle_tolerance: 底盘航向与目标角度之差小于该值时视为到位(度)
+            turn_rate: 底盘转速(度/秒)，无航向反馈时用于估计到位时间
+            sector_width: 覆盖图扇区宽度(度)
+            revisit_interval: 扫描超过该时间的扇区视为完全未扫描(秒)
+            travel_cost: coverage模式中每度转动的代价（相对于一个完全未扫描方向的收益）
+            last_seen_radius: last_seen模式向两侧扩展的步数
+        """
+        if pattern not in SEARCH_PATTERNS:
+            raise ValueError(f"不支持的搜索模式: {pattern}")
+        self.fov = fov
+        self.pattern = pattern
+        self.limits = limits
+        self.step = fov * (1.0 - overlap)
+        self.dwell_inferences = dwell_inferences
+        self.min_dwell = min_dwell
+        self.max_dwell = max_dwell
+        self.settle_tolerance = settle_tolerance
+        self.turn_rate = turn_rate
+        self.revisit_interval = revisit_interval
+        self.travel_cost = travel_cost
+        self.last_seen_radius = last_seen_radius
+
+        # 覆盖图：各扇区中心角度和最近一次扫描时刻
+        count = max(1, int(np.ceil((limits[1] - limits[0]) / sector_width)))
+        self.sectors = limits[0] + (np.arange(count) + 0.5) * (limits[1] - limits[0]) / count
+        self.scanned_at = np.full(count, -np.inf)
+
+        self.inference_times = deque(maxlen=32)  # 推理结果帧时间戳，用于估计推理频率
+        self.active = False
+        self.started_at = None
+        self.setpoint = None  # 当前搜索方向
+        self.last_heading = 0.0  # 最近一次搜索方向（刚进入搜索时为丢失目标的方向）
+        self.moved_at = None  # 开始转向当前方向的时刻
+        self.move_time = 0.0  # 无反馈时估计的转动耗时(秒)
+        self.settled_at = None  # 到位时刻
+        self.dwell_count = 0  # 到位后的推理结果数
+        self.direction = 1  # sweep方向
+        self.candidates: List[float] = []  # last_seen模式的待搜索方向
+
+        # 统计信息
+        self.moves = 0
+        self.dwell_timeouts = 0
+        self.searches = 0
+        self.acquire_times = deque(maxlen=100)  # 每次搜索到捕获目标的耗时(秒)
+
+    def _clip(self, heading: float) -> float:
+        return float(np.clip(heading, *self.limits))
+
+    def _view(self, heading: float) -> np.ndarray:
+        """指定方向视场内的扇区"""
+        return np.abs(self.sectors - heading) <= self.fov / 2
+
+    def staleness(self, heading: float, now: float) -> float:
+        """指定方向视场内扇区的平均未扫描程度，0为刚扫描过，1为完全未扫描"""
+        age = np.minimum(now - self.scanned_at[self._view(heading)], self.revisit_interval)
+        return float(age.mean() / self.revisit_interval) if age.size else 1.0
+
+    def mark_scanned(self, heading: float, now: float):
+        """在覆盖图中标记指定方向的视场已扫描"""
+        self.scanned_at[self._view(heading)] = now
+
+    @property
+    def inference_rate(self) -> float:
+        """最近的推理频率(Hz)"""
+        if len(self.inference_times) < 2:
+            return 0.0
+        span = self.inference_times[-1] - self.inference_times[0]
+        return (len(self.inference_times) - 1) / span if span > 0 else 0.0
+
+    def dwell_timeout(self) -> float:
+        """到位后的最长停留时间：按推理频率预计收到dwell_inferences个结果所需时间的两倍"""
+        rate = self.inference_rate
+        if rate <= 0:
+            return self.max_dwell
+        return float(np.clip(2 * self.dwell_inferences / rate, self.min_dwell, self.max_dwell))
+
+    def start(self, heading: float, now: Optional[float] = None):
+        """进入搜索模式
+
+        Args:
+            heading: 当前底盘方向（丢失目标的方向，last_seen模式由此开始）
+            now: 当前时刻
+        """
+        now = time.monotonic() if now is None else now
+        self.active = True
+        self.started_at = now
+        self.setpoint = None
+        self.searches += 1
+        heading = self._clip(heading)
+        self.candidates = [self._clip(heading + sign * i * self.step)
+                           for i in range(1, self.last_seen_radius + 1) for sign in (1, -1)]
+        # 刚丢失目标的方向仍在视场中，不必再停留
+        self.mark_scanned(heading, now)
+        self.last_heading = heading
+
+    def finish(self, acquired: bool = True, now: Optional[float] = None):
+        """退出搜索模式，acquired为True时记录捕获耗时"""
+        now = time.monotonic() if now is None else now
+        if self.active and acquired:
+            self.acquire_times.append(now - self.started_at)
+        self.active = False
+        self.setpoint = None
+
+    def record_inference(self, timestamp: float, heading: Optional[float] = None):
+        """记录一次推理结果
+
+        Args:
+            timestamp: 推理帧的采集时刻
+            heading: 采集时刻的底盘航向，None表示未知（使用当前搜索方向）
+        """
+        self.inference_times.append(timestamp)
+        if not self.active or self.settled_at is None or timestamp < self.settled_at:
+            return
+        self.dwell_count += 1
+        self.mark_scanned(self.setpoint if heading is None else heading, timestamp)
+
+    @property
+    def dwelling(self) -> bool:
+        """是否已到位并在等待推理结果"""
+        return self.active and self.settled_at is not None
+
+    def update(self, heading: Optional[float], now: Optional[float] = None) -> Optional[float]:
+        """推进搜索状态
+
+        Args:
+            heading: 当前底盘航向，None表示没有航向反馈
+            now: 当前时刻
+
+        Returns:
+            Optional[float]: 需要转向的新搜索方向，保持当前方向时返回None
+        """
+        now = time.monotonic() if now is None else now
+        if not self.active:
+            return None
+        if self.setpoint is None:
+            return self._move_to(self._next_heading(now), heading, now)
+
+        if self.settled_at is None:
+            if heading is not None:
+                settled = abs(heading - self.setpoint) <= self.settle_tolerance
+            else:
+                settled = now - self.moved_at >= self.move_time
+            # 底盘长时间未到位（如被阻挡）时同样视为到位，避免搜索停住
+            if settled or now - self.moved_at >= self.move_time + self.max_dwell:
+                self.settled_at = now
+                self.dwell_count = 0
+            return None
+
+        if self.dwell_count < self.dwell_inferences:
+            if now - self.settled_at < self.dwell_timeout():
+                return None
+            self.dwell_timeouts += 1
+            self.mark_scanned(self.setpoint, now)
+        return self._move_to(self._next_heading(now), heading, now)
+
+    def _move_to(self, target: float, heading: Optional[float], now: float) -> float:
+        start = self.last_heading if heading is None else heading
+        self.move_time = abs(target - start) / self.turn_rate
+        self.setpoint = target
+        self.last_heading = target
+        self.moved_at = now
+        self.settled_at = None
+        self.dwell_count = 0
+        self.moves += 1
+        return target
+
+    def _next_heading(self, now: float) -> float:
+        """按搜索模式选择下一个方向"""
+        current = self.last_heading
+        if self.pattern == 'last_seen':
+            while self.candidates:
+                candidate = self.candidates.pop(0)
+                if self.staleness(candidate, now) > 0.5:
+                    return candidate
+            return self._best_coverage(current, now)
+        if self.pattern == 'coverage':
+            return self._best_coverage(current, now)
+        return self._next_sweep(current, now)
+
+    def _best_coverage(self, current: float, now: float) -> float:
+        """覆盖图中收益最高的方向（未扫描程度减转动代价）"""
+        candidates = np.clip(self.sectors, self.limits[0] + self.fov / 2, self.limits[1] - self.fov / 2)
+        gains = np.array([self.staleness(candidate, now) for candidate in candidates])
+        gains -= self.travel_cost * np.abs(candidates - current)
+        return float(candidates[int(np.argmax(gains))])
+
+    def _next_sweep(self, current: float, now: float) -> float:
+        """往返扫描的下一个方向，跳过最近扫描过的方向"""
+        low, high = self.limits
+        target = current
+        for _ in range(int(np.ceil((high - low) / self.step)) * 2):
+            if (self.direction > 0 and target >= high) or (self.direction < 0 and target <= low):
+                self.direction = -self.direction
+            target = self._clip(target + self.direction * self.step)
+            if self.staleness(target, now) > 0.5:
+                return target
+        # 所有方向都刚扫描过，按正常步长继续
+        if (self.direction > 0 and current >= high) or (self.direction < 0 and current <= low):
+            self.direction = -self.direction
+        return self._clip(current + self.direction * self.step)
+
+    def coverage(self, now: Optional[float] = None) -> float:
+        """最近revisit_interval内扫描过的扇区比例"""
+        now = time.monotonic() if now is None else now
+        return float(np.mean(now - self.scanned_at < self.revisit_interval))
+
+    def get_stats(self) -> Dict:
+        """获取搜索统计信息"""
+        acquire = np.array(self.acquire_times) if self.acquire_times else None
+        return {
+            'pattern': self.pattern,
+            'active': self.active,
+            'setpoint': self.setpoint,
+            'moves': self.moves,
+            'searches': self.searches,
+            'dwell_timeouts': self.dwell_timeouts,
+            'inference_rate': self.inference_rate,
+            'dwell_timeout': self.dwell_timeout(),
+            'coverage': self.coverage(),
+            'acquire_time_mean': float(acquire.mean()) if acquire is not None else None,
+            'acquire_time_median': float(np.median(acquire)) if acquire is not None else None
+        }
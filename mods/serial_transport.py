@@ -0,0 +1,206 @@
+"""
+asyncio串口传输模块
+在后台线程中运行asyncio事件循环，为DeviceManager中注册的每个串口创建写任务和读任务：
+写入经队列异步发送，调用方不会阻塞在串口上；收到的数据通过回调交给上层解析
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+DataCallback = Callable[[bytes], None]
+
+
+class SerialPort:
+    """单个串口的异步读写状态"""
+
+    def __init__(self, name: str, device, on_data: Optional[DataCallback], max_queue: int):
+        self.name = name
+        self.device = device
+        self.on_data = on_data
+        self.queue: Optional[asyncio.Queue] = None  # 在事件循环中创建
+        self.max_queue = max_queue
+        self.tasks = []
+        self.fd = None  # 使用add_reader监听时的文件描述符
+
+        # 统计信息
+        self.bytes_written = 0
+        self.bytes_read = 0
+        self.dropped = 0  # 队列满时丢弃的写入
+        self.errors = 0
+        self.write_latency = 0.0  # 入队到写入完成的时间(秒)，滑动平均
+
+
+class AsyncSerialTransport:
+    """asyncio串口传输层"""
+
+    def __init__(self, device_manager, poll_interval: float = 0.005):
+        """
+        Args:
+            device_manager: 设备管理器，串口需先通过register_serial注册
+            poll_interval: 不支持文件描述符监听的串口（如模拟串口）的读取轮询间隔(秒)
+        """
+        self.device_manager = device_manager
+        self.poll_interval = poll_interval
+        self.ports: Dict[str, SerialPort] = {}
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.thread = None
+
+    def start(self):
+        """启动事件循环线程"""
+        if self.thread is not None:
+            return
+        self.loop = asyncio.new_event_loop()
+        ready = threading.Event()
+        self.thread = threading.Thread(target=self._run_loop, args=(ready,), name="SerialTransport", daemon=True)
+        self.thread.start()
+        ready.wait()
+        logger.info("串口传输事件循环已启动")
+
+    def _run_loop(self, ready: threading.Event):
+        asyncio.set_event_loop(self.loop)
+        self.loop.call_soon(ready.set)
+        self.loop.run_forever()
+
+    def stop(self):
+        """关闭所有端口任务并停止事件循环"""
+        if self.thread is None:
+            return
+        for name in list(self.ports):
+            self.close_port(name)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout=1.0)
+        self.loop.close()
+        self.thread = None
+        self.loop = None
+
+    def open_port(self, name: str, on_data: Optional[DataCallback] = None, max_queue: int = 64):
+        """为已注册的串口创建读写任务
+
+        Args:
+            name: DeviceManager中的设备名称
+            on_data: 收到数据时的回调（在事件循环线程中调用，应尽快返回）
+            max_queue: 写队列长度，队列满时丢弃最早的写入
+        """
+        if name in self.ports:
+            raise ValueError(f"端口 {name} 已打开")
+        self.start()
+        port = SerialPort(name, self.device_manager.get_device(name), on_data, max_queue)
+        self.ports[name] = port
+        asyncio.run_coroutine_threadsafe(self._open(port), self.loop).result(timeout=1.0)
+        logger.info(f"串口 {name} 异步传输已启动（读取方式: {'事件' if port.fd is not None else '轮询'}）")
+
+    def close_port(self, name: str, drain_timeout: float = 0.2):
+        """停止端口任务（尽量发送完队列中的数据，不关闭串口本身）"""
+        port = self.ports.pop(name, None)
+        if port is None or self.loop is None:
+            return
+        future = asyncio.run_coroutine_threadsafe(self._close(port, drain_timeout), self.loop)
+        try:
+            future.result(timeout=drain_timeout + 1.0)
+        except Exception as e:
+            logger.error(f"关闭串口 {name} 传输失败: {e}")
+
+    def write(self, name: str, data: bytes) -> bool:
+        """非阻塞写入（线程安全），端口未打开时返回False"""
+        port = self.ports.get(name)
+        if port is None or self.loop is None:
+            return False
+        self.loop.call_soon_threadsafe(self._enqueue, port, data, time.monotonic())
+        return True
+
+    def _enqueue(self, port: SerialPort, data: bytes, submitted: float):
+        if port.queue.full():
+            port.queue.get_nowait()
+            port.queue.task_done()  # 丢弃的数据同样算作已完成，否则关闭时join()永远等不到
+            port.dropped += 1
+        port.queue.put_nowait((data, submitted))
+
+    async def _open(self, port: SerialPort):
+        port.queue = asyncio.Queue(maxsize=port.max_queue)
+        port.tasks.append(asyncio.ensure_future(self._write_task(port)))
+        if port.on_data is None:
+            return
+        try:
+            fd = port.device.fileno()
+            self.loop.add_reader(fd, self._on_readable, port)
+            port.fd = fd
+        except Exception:
+            # 模拟串口等没有文件描述符的设备改为轮询
+            port.tasks.append(asyncio.ensure_future(self._poll_task(port)))
+
+    async def _close(self, port: SerialPort, drain_timeout: float):
+        try:
+            await asyncio.wait_for(port.queue.join(), drain_timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"串口 {port.name} 仍有 {port.queue.qsize()} 条数据未发送")
+        if port.fd is not None:
+            self.loop.remove_reader(port.fd)
+        for task in port.tasks:
+            task.cancel()
+        await asyncio.gather(*port.tasks, return_exceptions=True)
+
+    async def _write_task(self, port: SerialPort):
+        """写任务：按顺序发送队列中的数据（阻塞写入在线程池中执行）"""
+        while True:
+            data, submitted = await port.queue.get()
+            try:
+                await self.loop.run_in_executor(None, port.device.write, data)
+                port.bytes_written += len(data)
+                latency = time.monotonic() - submitted
+                port.write_latency = 0.9 * port.write_latency + 0.1 * latency if port.write_latency else latency
+            except Exception as e:
+                port.errors += 1
+                logger.error(f"串口 {port.name} 写入失败: {e}")
+            finally:
+                port.queue.task_done()
+
+    def _read_available(self, port: SerialPort):
+        """读取已到达的数据并交给回调"""
+        try:
+            waiting = port.device.in_waiting
+            if not waiting:
+                return
+            data = port.device.read(waiting)
+        except Exception as e:
+            port.errors += 1
+            logger.error(f"串口 {port.name} 读取失败: {e}")
+            if port.fd is not None:
+                self.loop.remove_reader(port.fd)
+                port.fd = None
+            return
+        if data:
+            port.bytes_read += len(data)
+            try:
+                port.on_data(data)
+            except Exception as e:
+                logger.error(f"串口 {port.name} 数据处理失败: {e}")
+
+    def _on_readable(self, port: SerialPort):
+        self._read_available(port)
+
+    async def _poll_task(self, port: SerialPort):
+        """读轮询任务（设备不支持add_reader时使用）"""
+        if not hasattr(port.device, 'in_waiting'):
+            return  # 设备无法非阻塞读取，只写
+        while True:
+            self._read_available(port)
+            await asyncio.sleep(self.poll_interval)
+
+    def get_stats(self, name: str) -> Dict:
+        """获取端口统计信息"""
+        port = self.ports.get(name)
+        if port is None:
+            return {}
+        return {
+            'queued': port.queue.qsize() if port.queue else 0,
+            'bytes_written': port.bytes_written,
+            'bytes_read': port.bytes_read,
+            'dropped': port.dropped,
+            'errors': port.errors,
+            'write_latency_ms': port.write_latency * 1000
+        }
@@ -0,0 +1,137 @@
+"""
+目标选择模块
+在检测/跟踪结构化数组上向量化地为所有候选目标打分并选出最佳目标，
+评分函数可替换，默认按离画面中心距离、置信度、目标尺寸和跟踪时长加权
+"""
+
+import numpy as np
+from typing import Callable, Dict, Optional, Tuple
+
+# 评分函数: (detections, centers, frame_size) -> (N,) 分数，分数越高越优先
+Scorer = Callable[[np.ndarray, np.ndarray, Tuple[int, int]], np.ndarray]
+
+DEFAULT_WEIGHTS = {
+    'center': 1.0,      # 离画面中心越近越优先
+    'confidence': 0.0,  # 置信度越高越优先
+    'size': 0.0,        # 目标越大越优先
+    'age': 0.0,         # 跟踪越稳定越优先
+}
+
+
+def box_centers(bboxes: np.ndarray) -> np.ndarray:
+    """计算检测框中心点
+
+    Args:
+        bboxes: (N, 4) 检测框 [x1, y1, x2, y2]
+
+    Returns:
+        np.ndarray: (N, 2) 中心点坐标
+    """
+    bboxes = np.asarray(bboxes, dtype=np.float32).reshape(-1, 4)
+    return (bboxes[:, :2] + bboxes[:, 2:]) / 2
+
+
+def center_score(detections: np.ndarray, centers: np.ndarray, frame_size: Tuple[int, int]) -> np.ndarray:
+    """离画面中心的距离得分，中心为1，角落为0"""
+    width, height = frame_size
+    half = np.array([width / 2, height / 2], dtype=np.float32)
+    distance = np.sqrt(np.sum((centers - half) ** 2, axis=1))
+    return 1.0 - distance / np.hypot(*half)
+
+
+def confidence_score(detections: np.ndarray, centers: np.ndarray, frame_size: Tuple[int, int]) -> np.ndarray:
+    """置信度得分"""
+    return detections['conf'].astype(np.float32)
+
+
+def size_score(detections: np.ndarray, centers: np.ndarray, frame_size: Tuple[int, int]) -> np.ndarray:
+    """尺寸得分，目标面积占画面比例的平方根"""
+    bboxes = detections['bbox']
+    area = np.clip(bboxes[:, 2] - bboxes[:, 0], 0, None) * np.clip(bboxes[:, 3] - bboxes[:, 1], 0, None)
+    return np.sqrt(area / float(frame_size[0] * frame_size[1]))
+
+
+def age_score(detections: np.ndarray, centers: np.ndarray, frame_size: Tuple[int, int],
+              age_scale: float = 1.0) -> np.ndarray:
+    """跟踪时长得分，存在age_scale秒时为0.5并趋近于1
+
+    跟踪结果使用age字段；多帧融合结果使用stability字段；都没有时为0。
+    """
+    names = detections.dtype.names
+    if 'age' in names:
+        age = detections['age'].astype(np.float32)
+        return age / (age + age_scale)
+    if 'stability' in names:
+        return detections['stability'].astype(np.float32)
+    return np.zeros(len(detections), dtype=np.float32)
+
+
+SCORE_TERMS = {
+    'center': center_score,
+    'confidence': confidence_score,
+    'size': size_score,
+    'age': age_score,
+}
+
+
+def weighted_scorer(weights: Optional[Dict[str, float]] = None) -> Scorer:
+    """按权重组合各项得分，构造评分函数
+
+    Args:
+        weights: 各项得分权重，键为SCORE_TERMS中的名称，缺省项使用DEFAULT_WEIGHTS
+    """
+    weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+    unknown = set(weights) - set(SCORE_TERMS)
+    if unknown:
+        raise ValueError(f"未知的评分项: {', '.join(sorted(unknown))}")
+    terms = [(SCORE_TERMS[name], weight) for name, weight in weights.items() if weight]
+
+    def scorer(detections: np.ndarray, centers: np.ndarray, frame_size: Tuple[int, int]) -> np.ndarray:
+        scores = np.zeros(len(detections), dtype=np.float32)
+        for term, weight in terms:
+            scores += weight * term(detections, centers, frame_size)
+        return scores
+
+    return scorer
+
+
+class TargetSelector:
+    """目标选择器"""
+
+    def __init__(self, frame_size: Tuple[int, int], target_class: Optional[int] = 0,
+                 scorer: Optional[Scorer] = None, weights: Optional[Dict[str, float]] = None):
+        """
+        Args:
+            frame_size: 画面尺寸 (宽, 高)
+            target_class: 参与选择的类别，为None时不过滤类别
+            scorer: 自定义评分函数，提供时忽略weights
+            weights: 默认加权评分函数的权重
+        """
+        self.frame_size = frame_size
+        self.target_class = target_class
+        self.scorer = scorer if scorer is not None else weighted_scorer(weights)
+
+    def select(self, detections: np.ndarray) -> Tuple[Optional[int], Optional[np.ndarray]]:
+        """选择得分最高的目标
+
+        Args:
+            detections: 检测/跟踪结构化数组
+
+        Returns:
+            Tuple[Optional[int], Optional[np.ndarray]]: (目标在detections中的索引, 目标中心点)，
+            没有候选目标时返回(None, None)
+        """
+        if len(detections) == 0:
+            return None, None
+
+        if self.target_class is None:
+            indices = np.arange(len(detections))
+        else:
+            indices = np.flatnonzero(detections['cls'] == self.target_class)
+            if len(indices) == 0:
+                return None, None
+
+        candidates = detections[indices]
+        centers = box_centers(candidates['bbox'])
+        best = int(np.argmax(self.scorer(candidates, centers, self.frame_size)))
+        return int(indices[best]), centers[best]
@@ -0,0 +1,256 @@
+"""
+多目标跟踪模块
+使用恒速卡尔曼滤波器和ByteTrack风格的两阶段IoU关联维持稳定的目标ID，
+并可预测任意时刻的目标位置，使控制环路能够以摄像头帧率而非推理帧率更新
+"""
+
+import logging
+import numpy as np
+from typing import List, Tuple
+
+from mods.detections import box_iou, greedy_match
+
+logger = logging.getLogger(__name__)
+
+# 跟踪结果结构化数组类型
+TRACK_DTYPE = np.dtype([
+    ('bbox', np.float32, (4,)),        # 预测检测框 x1, y1, x2, y2
+    ('conf', np.float32),              # 最近一次关联检测的置信度
+    ('cls', np.int16),                 # 类别
+    ('track_id', np.int32),            # 跟踪ID
+    ('age', np.float32),               # 跟踪存在时长(秒)
+    ('hits', np.int32),                # 累计关联次数
+    ('time_since_update', np.float32), # 距最近一次关联的时长(秒)
+    ('velocity', np.float32, (2,)),    # 中心点速度(像素/秒)
+])
+
+
+def bbox_to_state(bbox: np.ndarray) -> np.ndarray:
+    """检测框(x1, y1, x2, y2)转换为观测量(cx, cy, w, h)"""
+    x1, y1, x2, y2 = bbox
+    return np.array([(x1 + x2) / 2, (y1 + y2) / 2, x2 - x1, y2 - y1], dtype=np.float64)
+
+
+def state_to_bbox(state: np.ndarray) -> np.ndarray:
+    """状态量(cx, cy, w, h, ...)转换为检测框(x1, y1, x2, y2)，支持批量"""
+    state = np.asarray(state)
+    cx, cy = state[..., 0], state[..., 1]
+    w, h = np.maximum(state[..., 2], 1.0), np.maximum(state[..., 3], 1.0)
+    return np.stack([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], axis=-1)
+
+
+class KalmanBoxFilter:
+    """检测框恒速卡尔曼滤波器
+
+    状态量为 (cx, cy, w, h, vx, vy, vw, vh)，观测量为 (cx, cy, w, h)，
+    按实际时间间隔dt进行预测，支持非均匀的推理间隔。
+    """
+
+    # 观测矩阵
+    H = np.hstack([np.eye(4), np.zeros((4, 4))])
+
+    def __init__(self, bbox: np.ndarray, timestamp: float,
+                 measurement_std: Tuple[float, ...] = (4.0, 4.0, 8.0, 8.0),
+                 acceleration_std: Tuple[float, ...] = (400.0, 400.0, 100.0, 100.0)):
+        """
+        Args:
+            bbox: 初始检测框
+            timestamp: 初始时刻（time.monotonic()）
+            measurement_std: 观测噪声标准差(像素)
+            acceleration_std: 过程噪声（加速度）标准差(像素/秒²)
+        """
+        self.x = np.zeros(8)
+        self.x[:4] = bbox_to_state(bbox)
+        self.P = np.diag([10.0, 10.0, 10.0, 10.0, 1000.0, 1000.0, 200.0, 200.0]) ** 2
+        self.R = np.diag(np.square(measurement_std))
+        self.acceleration_var = np.square(acceleration_std)
+        self.timestamp = timestamp
+
+    def predict(self, timestamp: float):
+        """将状态预测到指定时刻"""
+        dt = timestamp - self.timestamp
+        if dt <= 0:
+            return
+
+        F = np.eye(8)
+        F[:4, 4:] = np.eye(4) * dt
+
+        # 白噪声加速度模型的过程噪声
+        Q = np.zeros((8, 8))
+        Q[:4, :4] = np.diag(self.acceleration_var * dt ** 4 / 4)
+        Q[:4, 4:] = np.diag(self.acceleration_var * dt ** 3 / 2)
+        Q[4:, :4] = Q[:4, 4:]
+        Q[4:, 4:] = np.diag(self.acceleration_var * dt ** 2)
+
+        self.x = F @ self.x
+        self.P = F @ self.P @ F.T + Q
+        self.timestamp = timestamp
+
+    def update(self, bbox: np.ndarray):
+        """用观测检测框更新状态"""
+        z = bbox_to_state(bbox)
+        y = z - self.H @ self.x
+        S = self.H @ self.P @ self.H.T + self.R
+        K = self.P @ self.H.T @ np.linalg.inv(S)
+        self.x = self.x + K @ y
+        self.P = (np.eye(8) - K @ self.H) @ self.P
+
+
+class Track:
+    """单个跟踪目标"""
+
+    def __init__(self, track_id: int, detection: np.void, timestamp: float):
+        self.track_id = track_id
+        self.cls = int(detection['cls'])
+        self.conf = float(detection['conf'])
+        self.kf = KalmanBoxFilter(detection['bbox'], timestamp)
+        self.first_seen = timestamp
+        self.last_update = timestamp
+        self.hits = 1
+
+    def update(self, detection: np.void, timestamp: float):
+        """关联到新的检测"""
+        self.kf.update(detection['bbox'])
+        self.conf = float(detection['conf'])
+        self.last_update = timestamp
+        self.hits += 1
+
+
+class MultiObjectTracker:
+    """多目标跟踪器（SORT/ByteTrack风格）
+
+    update()在每次有新的推理结果时调用，predict()可在任意时刻调用，
+    返回已确认跟踪在该时刻的预测位置。
+    """
+
+    def __init__(self, high_conf: float = 0.5, low_conf: float = 0.1,
+                 iou_threshold: float = 0.3, low_iou_threshold: float = 0.5,
+                 max_age: float = 0.5, min_hits: int = 2):
+        """
+        Args:
+            high_conf: 高置信度检测阈值，只有高置信度检测可以创建新跟踪
+            low_conf: 低置信度检测阈值，低于此值的检测被丢弃
+            iou_threshold: 第一阶段（高置信度检测）关联IoU阈值
+            low_iou_threshold: 第二阶段（低置信度检测）关联IoU阈值
+            max_age: 跟踪在无关联检测时保留的最长时间(秒)
+            min_hits: 跟踪被确认所需的最少关联次数
+        """
+        self.high_conf = high_conf
+        self.low_conf = low_conf
+        self.iou_threshold = iou_threshold
+        self.low_iou_threshold = low_iou_threshold
+        self.max_age = max_age
+        self.min_hits = min_hits
+
+        self.tracks: List[Track] = []
+        self.next_id = 1
+        self.last_timestamp = None
+
+    def update(self, detections: np.ndarray, timestamp: float) -> np.ndarray:
+        """用一帧检测结果更新跟踪器
+
+        Args:
+            detections: 含bbox、conf、cls字段的结构化数组
+            timestamp: 检测结果源帧的采集时间
+
+        Returns:
+            np.ndarray: 该时刻已确认跟踪的TRACK_DTYPE数组
+        """
+        if self.last_timestamp is not None and timestamp < self.last_timestamp:
+            logger.debug("忽略过期的检测结果")
+            return self.predict(self.last_timestamp)
+        self.last_timestamp = timestamp
+
+        for track in self.tracks:
+            track.kf.predict(timestamp)
+
+        detections = detections[detections['conf'] >= self.low_conf]
+        high = np.flatnonzero(detections['conf'] >= self.high_conf)
+        low = np.flatnonzero(detections['conf'] < self.high_conf)
+
+        # 第一阶段：所有跟踪与高置信度检测关联
+        track_indices = np.arange(len(self.tracks))
+        matches, unmatched_tracks, unmatched_high = self._associate(
+            track_indices, detections, high, self.iou_threshold)
+
+        # 第二阶段：剩余跟踪与低置信度检测关联
+        low_matches, unmatched_tracks, _ = self._associate(
+            unmatched_tracks, detections, low, self.low_iou_threshold)
+
+        for track_index, det_index in matches + low_matches:
+            self.tracks[track_index].update(detections[det_index], timestamp)
+
+        # 未关联的高置信度检测创建新跟踪
+        for det_index in unmatched_high:
+            self.tracks.append(Track(self.next_id, detections[det_index], timestamp))
+            self.next_id += 1
+
+        # 移除长时间未关联的跟踪
+        self.tracks = [t for t in self.tracks if timestamp - t.last_update <= self.max_age]
+
+        return self.predict(timestamp)
+
+    def _associate(self, track_indices: np.ndarray, detections: np.ndarray,
+                   det_indices: np.ndarray, threshold: float):
+        """按IoU关联一组跟踪和一组检测（类别必须一致）"""
+        if len(track_indices) == 0 or len(det_indices) == 0:
+            return [], np.asarray(track_indices, dtype=int), np.asarray(det_indices, dtype=int)
+
+        track_boxes = state_to_bbox(np.array([self.tracks[i].kf.x for i in track_indices]))
+        track_classes = np.array([self.tracks[i].cls for i in track_indices])
+        subset = detections[det_indices]
+
+        iou = box_iou(track_boxes, subset['bbox'])
+        iou[track_classes[:, None] != subset['cls'][None, :]] = 0.0
+
+        pairs, unmatched_rows, unmatched_cols = greedy_match(iou, threshold)
+        matches = [(int(track_indices[r]), int(det_indices[c])) for r, c in pairs]
+        return matches, track_indices[unmatched_rows], det_indices[unmatched_cols]
+
+    def refresh(self, timestamp: float):
+        """画面未变化时延长最近一次已关联跟踪的有效期
+
+        不增加关联次数，也不用旧检测更新卡尔曼滤波（否则会把速度拉向0）。
+
+        Args:
+            timestamp: 当前帧采集时间
+        """
+        if self.last_timestamp is None:
+            return
+        for track in self.tracks:
+            if track.last_update >= self.last_timestamp:
+                track.last_update = max(track.last_update, timestamp)
+
+    def predict(self, timestamp: float) -> np.ndarray:
+        """预测已确认跟踪在指定时刻的位置（不修改跟踪器状态）
+
+        Args:
+            timestamp: 目标时刻（time.monotonic()）
+
+        Returns:
+            np.ndarray: TRACK_DTYPE结构化数组
+        """
+        tracks = [t for t in self.tracks
+                  if t.hits >= self.min_hits and timestamp - t.last_update <= self.max_age]
+        output = np.zeros(len(tracks), dtype=TRACK_DTYPE)
+        if not tracks:
+            return output
+
+        states = np.array([t.kf.x for t in tracks])
+        dt = np.array([max(0.0, timestamp - t.kf.timestamp) for t in tracks])
+        states[:, :4] += states[:, 4:] * dt[:, None]
+
+        output['bbox'] = state_to_bbox(states)
+        output['conf'] = [t.conf for t in tracks]
+        output['cls'] = [t.cls for t in tracks]
+        output['track_id'] = [t.track_id for t in tracks]
+        output['age'] = [timestamp - t.first_seen for t in tracks]
+        output['hits'] = [t.hits for t in tracks]
+        output['time_since_update'] = [timestamp - t.last_update for t in tracks]
+        output['velocity'] = states[:, 4:6]
+        return output
+
+    def reset(self):
+        """清空所有跟踪"""
+        self.tracks.clear()
+        self.last_timestamp = None
@@ -17,6 +17,7 @@ from stepper.device import Device
 from stepper.stepper_core.parameters import DeviceParams
 from stepper.stepper_core.configs import Address
 from mods.DeviceManager import DeviceManager
+from mods.cached_stepper import CachedStepper
 
 # 配置日志
 logging.basicConfig(
@@ -120,13 +121,13 @@ class StepperDebugTool:
             # 获取串口设备
             serial_device = self.device_manager.get_device("debug_device")
             
-            # 初始化步进电机设备
-            self.device = Device(
+            # 初始化步进电机设备（新连接使用新的参数缓存）
+            self.device = CachedStepper(Device(
                 device_params=DeviceParams(
                     serial_connection=serial_device,
                     address=Address(self.address)
                 )
-            )
+            ))
             
             # 验证设备连接
             if self._validate_device():
@@ -323,7 +324,7 @@ class StepperDebugTool:
             return False
         
         try:
-            self.device.set_speed(speed)
+            self.device.set_speed(speed, force=True)
             self.current_speed = speed
             self._log_command(StepperCommand.SET_SPEED, str(speed))
             logger.info(f"速度设置为: {speed} 步/秒")
@@ -339,7 +340,7 @@ class StepperDebugTool:
             return False
         
         try:
-            self.device.set_acceleration(acceleration)
+            self.device.set_acceleration(acceleration, force=True)
             self.current_acceleration = acceleration
             self._log_command(StepperCommand.SET_ACCEL, str(acceleration))
             logger.info(f"加速度设置为: {acceleration} 步/秒²")
@@ -370,6 +371,7 @@ class StepperDebugTool:
                 'is_moving': self.is_moving,
                 'is_enabled': self.is_enabled,
                 'is_connected': self.is_connected,
+                'saved_transactions': self.device.get_stats()['saved'],
                 'timestamp': datetime.now()
             }
             
@@ -634,6 +636,7 @@ def main():
                 print(f"  是否移动: {'是' if status['is_moving'] else '否'}")
                 print(f"  是否启用: {'是' if status['is_enabled'] else '否'}")
                 print(f"  是否连接: {'是' if status['is_connected'] else '否'}")
+                print(f"  节省的串口事务: {status['saved_transactions']}")
             else:
                 print(f"获取状态失败: {status['error']}")
     
@@ -0,0 +1,106 @@
+"""
+开火控制模块测试（使用模拟GPIO）
+"""
+
+import time
+
+import pytest
+
+from mods.fire_control import FireController
+from mods.mock_gpio import GPIO
+
+FIRE_PIN = 18
+
+
+def wait_for(predicate, timeout=1.0):
+    """等待条件成立，超时返回False"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.001)
+    return predicate()
+
+
+@pytest.fixture
+def make_controller():
+    """创建并启动开火控制器，测试结束后停止并清理引脚"""
+    controllers = []
+
+    def make(**kwargs):
+        GPIO.setmode(GPIO.BCM)
+        GPIO.setup(FIRE_PIN, GPIO.OUT)
+        controller = FireController(GPIO, FIRE_PIN, **kwargs)
+        controller.start()
+        controllers.append(controller)
+        return controller
+
+    yield make
+    for controller in controllers:
+        controller.stop()
+    GPIO.cleanup()
+
+
+def test_pulse_width(make_controller):
+    controller = make_controller(pulse_width=0.05, cooldown=0.0, burst_limit=0)
+    frame_timestamp = time.monotonic()
+
+    assert controller.trigger(frame_timestamp)
+    assert wait_for(lambda: GPIO.get_pin_state(FIRE_PIN) == GPIO.HIGH)
+    assert wait_for(lambda: controller.shots == 1)
+    assert GPIO.get_pin_state(FIRE_PIN) == GPIO.LOW
+
+    record = controller.get_triggers()[0]
+    assert record['frame_timestamp'] == frame_timestamp
+    assert record['requested'] <= record['high'] < record['low']
+    assert record['low'] - record['high'] == pytest.approx(0.05, abs=0.02)
+    assert controller.get_stats()['pulse_width_ms'] == pytest.approx(50, abs=20)
+
+
+def test_cooldown_rejects_requests(make_controller):
+    controller = make_controller(pulse_width=0.01, cooldown=0.2, burst_limit=0)
+
+    assert controller.trigger()
+    assert wait_for(lambda: controller.shots == 1)
+    assert not controller.trigger()
+    assert not controller.is_ready()
+    assert controller.get_stats()['rejected_cooldown'] == 1
+
+    time.sleep(0.2)
+    assert controller.is_ready()
+    assert controller.trigger()
+    assert wait_for(lambda: controller.shots == 2)
+
+
+def test_busy_rejects_requests(make_controller):
+    controller = make_controller(pulse_width=0.1, cooldown=0.0, burst_limit=0)
+
+    assert controller.trigger()
+    assert wait_for(lambda: controller.pulsing)
+    assert not controller.trigger()
+    assert controller.get_stats()['rejected_busy'] == 1
+
+
+def test_burst_limit(make_controller):
+    controller = make_controller(pulse_width=0.01, cooldown=0.0, burst_limit=3, burst_window=0.5)
+
+    for shot in range(1, 4):
+        assert controller.trigger()
+        assert wait_for(lambda: controller.shots == shot)
+    assert not controller.trigger()
+    assert controller.get_stats()['rejected_burst'] == 1
+
+    # 最早的一次开火移出统计窗口后可以再次开火
+    time.sleep(0.5)
+    assert controller.trigger()
+    assert wait_for(lambda: controller.shots == 4)
+
+
+def test_pin_low_after_stop(make_controller):
+    controller = make_controller(pulse_width=0.5, cooldown=0.0, burst_limit=0)
+
+    assert controller.trigger()
+    assert wait_for(lambda: GPIO.get_pin_state(FIRE_PIN) == GPIO.HIGH)
+    controller.stop()
+    assert GPIO.get_pin_state(FIRE_PIN) == GPIO.LOW
+    assert not controller.trigger()
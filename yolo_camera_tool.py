@@ -1,6 +1,7 @@
 import argparse
 import cv2
-from ultralytics import YOLO
+from mods.detections import parse_results
+from mods.inference_backend import load_model, SUPPORTED_BACKENDS
 
 
 def scan_cameras(max_id=10):
@@ -13,8 +14,8 @@ def scan_cameras(max_id=10):
             cap.release()
     return available
 
-def run_yolo_on_camera(model_path, conf=0.25, camera_id=0):
-    model = YOLO(model_path)
+def run_yolo_on_camera(model_path, conf=0.25, camera_id=0, backend='pytorch'):
+    model, _ = load_model(model_path, backend)
     cap = cv2.VideoCapture(camera_id)
     if not cap.isOpened():
         print(f"无法打开摄像头: {camera_id}")
@@ -26,15 +27,10 @@ def run_yolo_on_camera(model_path, conf=0.25, camera_id=0):
             print("无法读取摄像头帧")
             break
         results = model.predict(frame, conf=conf)
-        for result in results:
-            boxes = result.boxes
-            if boxes is not None:
-                for box in boxes:
-                    x1, y1, x2, y2 = map(int, box.xyxy[0].cpu().numpy())
-                    conf_score = float(box.conf[0].cpu().numpy())
-                    class_id = int(box.cls[0].cpu().numpy())
-                    cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
-                    cv2.putText(frame, f"{class_id}:{conf_score:.2f}", (x1, y1-10), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0,255,0), 2)
+        detections = parse_results(results)
+        for (x1, y1, x2, y2), conf_score, class_id in zip(detections['bbox'].astype(int).tolist(), detections['conf'], detections['cls']):
+            cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
+            cv2.putText(frame, f"{class_id}:{conf_score:.2f}", (x1, y1-10), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0,255,0), 2)
         cv2.imshow("YOLO Camera Detection", frame)
         if cv2.waitKey(1) & 0xFF == ord('q'):
             break
@@ -45,6 +41,7 @@ def main():
     parser = argparse.ArgumentParser(description="YOLO模型摄像头测试工具")
     parser.add_argument('--model', type=str, default='mods/best.pt', help='模型路径')
     parser.add_argument('--conf', type=float, default=0.25, help='置信度阈值')
+    parser.add_argument('--backend', type=str, default='pytorch', choices=SUPPORTED_BACKENDS, help='推理后端')
     parser.add_argument('--camera', type=int, default=None, help='摄像头ID（不指定则自动选择）')
     parser.add_argument('--scan', action='store_true', help='仅扫描可用摄像头并退出')
     args = parser.parse_args()
@@ -65,7 +62,7 @@ def main():
             print(f"指定的摄像头ID {camera_id} 不可用！可用摄像头: {available}")
             return
     print(f"可用摄像头ID: {available}")
-    run_yolo_on_camera(args.model, conf=args.conf, camera_id=camera_id)
+    run_yolo_on_camera(args.model, conf=args.conf, camera_id=camera_id, backend=args.backend)
 
 if __name__ == '__main__':
     main()
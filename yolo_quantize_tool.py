@@ -0,0 +1,258 @@
+"""
+YOLO模型INT8量化工具
+使用本地校准图片将mods/best.pt量化为INT8 ONNX模型（mods/best_int8.onnx），
+并在独立的评估图片集上比较FP32与INT8模型的延迟、内存和检测一致性。
+每个后端在独立的子进程中测试，内存测量不受先加载的模型影响
+"""
+
+import argparse
+import gc
+import json
+import multiprocessing
+import os
+import time
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+from mods.detections import box_iou, greedy_match, parse_results
+from mods.inference_backend import load_model, exported_model_path, is_export_fresh, export_model
+from yolo_test_tool import list_images, load_image
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+def current_rss_mb():
+    """当前进程常驻内存(MB)，无psutil时返回None（峰值内存只增不减，不能用于计算差值）"""
+    if psutil is None:
+        return None
+    gc.collect()
+    return psutil.Process().memory_info().rss / (1024 * 1024)
+
+def preprocess(image, imgsz):
+    """按YOLO的letterbox方式预处理图片，返回(1, 3, imgsz, imgsz)的float32张量"""
+    height, width = image.shape[:2]
+    scale = min(imgsz / height, imgsz / width)
+    new_w, new_h = int(round(width * scale)), int(round(height * scale))
+    resized = cv2.resize(image, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+
+    canvas = np.full((imgsz, imgsz, 3), 114, dtype=np.uint8)
+    top, left = (imgsz - new_h) // 2, (imgsz - new_w) // 2
+    canvas[top:top + new_h, left:left + new_w] = resized
+
+    tensor = cv2.cvtColor(canvas, cv2.COLOR_BGR2RGB).transpose(2, 0, 1)
+    return np.ascontiguousarray(tensor[None], dtype=np.float32) / 255.0
+
+def quantize_model(weights, calib_dir, imgsz=640, max_images=200, per_channel=False):
+    """使用校准图片对导出的FP32 ONNX模型做静态INT8量化
+
+    Returns:
+        str: INT8模型路径
+    """
+    import onnx
+    from onnxruntime.quantization import (CalibrationDataReader, CalibrationMethod,
+                                          QuantFormat, QuantType, quantize_static)
+
+    fp32_path = exported_model_path(weights, 'onnx')
+    if not is_export_fresh(weights, fp32_path):
+        fp32_path = export_model(weights, 'onnx', imgsz)
+        if fp32_path is None:
+            raise RuntimeError("FP32 ONNX模型导出失败")
+
+    image_paths = list_images(calib_dir)[:max_images]
+    if not image_paths:
+        raise RuntimeError(f"校准目录中没有图片: {calib_dir}")
+    print(f"使用 {len(image_paths)} 张图片进行校准...")
+
+    input_name = onnx.load(fp32_path, load_external_data=False).graph.input[0].name
+
+    class ImageCalibrationReader(CalibrationDataReader):
+        """逐张提供校准图片"""
+
+        def __init__(self):
+            self.paths = iter(image_paths)
+
+        def get_next(self):
+            for path in self.paths:
+                image = load_image(path)
+                if image is not None:
+                    return {input_name: preprocess(image, imgsz)}
+            return None
+
+    int8_path = exported_model_path(weights, 'onnx-int8')
+    quantize_static(
+        fp32_path, int8_path, ImageCalibrationReader(),
+        quant_format=QuantFormat.QDQ,
+        per_channel=per_channel,
+        activation_type=QuantType.QUInt8,
+        weight_type=QuantType.QInt8,
+        calibrate_method=CalibrationMethod.MinMax,
+    )
+
+    # 保留ultralytics导出的元数据（类别名、输入尺寸等），便于直接用YOLO()加载
+    fp32_model = onnx.load(fp32_path)
+    int8_model = onnx.load(int8_path)
+    del int8_model.metadata_props[:]
+    int8_model.metadata_props.extend(fp32_model.metadata_props)
+    onnx.save(int8_model, int8_path)
+
+    print(f"INT8模型已保存到: {int8_path}")
+    return int8_path
+
+def benchmark_backend(weights, backend, image_paths, imgsz=640, conf=0.25, warmup=3):
+    """在评估图片上测试指定后端的延迟、内存并收集检测结果（在当前进程中执行）"""
+    rss_before = current_rss_mb()
+    model, actual_backend = load_model(weights, backend, imgsz)
+    if actual_backend != backend:
+        raise RuntimeError(f"{backend} 后端加载失败")
+
+    images = [(path, load_image(path)) for path in image_paths]
+    images = [(path, image) for path, image in images if image is not None]
+    for _, image in images[:warmup]:
+        model.predict(image, imgsz=imgsz, conf=conf, verbose=False)
+    rss_loaded = current_rss_mb()
+
+    latencies, detections = [], {}
+    for path, image in images:
+        start = time.perf_counter()
+        results = model.predict(image, imgsz=imgsz, conf=conf, verbose=False)
+        latencies.append(time.perf_counter() - start)
+        detections[path] = parse_results(results)
+
+    latencies = np.array(latencies) * 1000
+    stats = {
+        'backend': backend,
+        'images': len(images),
+        'latency_ms': {
+            'mean': float(latencies.mean()) if len(latencies) else None,
+            'p50': float(np.percentile(latencies, 50)) if len(latencies) else None,
+            'p90': float(np.percentile(latencies, 90)) if len(latencies) else None,
+        },
+        'memory_mb': {
+            'model_delta': rss_loaded - rss_before if rss_before is not None else None,
+            'rss': current_rss_mb(),
+        },
+    }
+    del model
+    gc.collect()
+    return stats, detections
+
+def benchmark_isolated(weights, backend, image_paths, imgsz=640, conf=0.25):
+    """在新的子进程中测试指定后端，避免其他模型残留的内存影响测量"""
+    ctx = multiprocessing.get_context('spawn')
+    with ctx.Pool(1) as pool:
+        return pool.apply(benchmark_backend, (weights, backend, image_paths, imgsz, conf))
+
+def compare_detections(reference, candidate, iou_threshold=0.5):
+    """比较两组检测结果的一致性（以reference为基准）"""
+    matched, ref_total, cand_total = 0, 0, 0
+    ious, conf_diffs = [], []
+
+    for path, ref in reference.items():
+        cand = candidate.get(path)
+        if cand is None:
+            continue
+        ref_total += len(ref)
+        cand_total += len(cand)
+        if len(ref) == 0 or len(cand) == 0:
+            continue
+
+        iou = box_iou(ref['bbox'], cand['bbox'])
+        iou[ref['cls'][:, None] != cand['cls'][None, :]] = 0.0
+        pairs, _, _ = greedy_match(iou, iou_threshold)
+        matched += len(pairs)
+        for r, c in pairs:
+            ious.append(float(iou[r, c]))
+            conf_diffs.append(abs(float(ref['conf'][r]) - float(cand['conf'][c])))
+
+    return {
+        'iou_threshold': iou_threshold,
+        'reference_detections': ref_total,
+        'candidate_detections': cand_total,
+        'matched': matched,
+        'recall': matched / ref_total if ref_total else None,
+        'precision': matched / cand_total if cand_total else None,
+        'mean_iou': float(np.mean(ious)) if ious else None,
+        'mean_conf_diff': float(np.mean(conf_diffs)) if conf_diffs else None,
+    }
+
+def build_report(weights, eval_path, imgsz=640, conf=0.25):
+    """生成FP32与INT8模型的对比报告"""
+    image_paths = list_images(eval_path)
+    if not image_paths:
+        raise RuntimeError(f"评估路径中没有图片: {eval_path}")
+
+    fp32_stats, fp32_detections = benchmark_isolated(weights, 'onnx', image_paths, imgsz, conf)
+    int8_stats, int8_detections = benchmark_isolated(weights, 'onnx-int8', image_paths, imgsz, conf)
+
+    fp32_p50 = fp32_stats['latency_ms']['p50']
+    int8_p50 = int8_stats['latency_ms']['p50']
+    return {
+        'timestamp': datetime.now().isoformat(),
+        'weights': weights,
+        'eval_path': eval_path,
+        'imgsz': imgsz,
+        'conf': conf,
+        'fp32': fp32_stats,
+        'int8': int8_stats,
+        'speedup_p50': fp32_p50 / int8_p50 if fp32_p50 and int8_p50 else None,
+        'agreement': compare_detections(fp32_detections, int8_detections),
+    }
+
+def print_report(report):
+    """打印报告摘要"""
+    print("=" * 50)
+    print("FP32 / INT8 对比报告")
+    print("=" * 50)
+    for key in ('fp32', 'int8'):
+        stats = report[key]
+        latency = stats['latency_ms']
+        memory = stats['memory_mb']['model_delta']
+        memory = f"{memory:.1f}MB" if memory is not None else "不可用（未安装psutil）"
+        if latency['p50'] is None:
+            print(f"{key.upper()}: 无延迟数据, 模型内存 {memory}")
+            continue
+        print(f"{key.upper()}: p50 {latency['p50']:.1f}ms, p90 {latency['p90']:.1f}ms, 模型内存 {memory}")
+    if report['speedup_p50']:
+        print(f"加速比(p50): {report['speedup_p50']:.2f}x")
+    agreement = report['agreement']
+    print(f"检测一致性: 召回 {agreement['recall']}, 精确 {agreement['precision']}, "
+          f"平均IoU {agreement['mean_iou']}")
+
+def main():
+    parser = argparse.ArgumentParser(description="YOLO模型INT8量化工具")
+    parser.add_argument('--model', type=str, default='mods/best.pt', help='模型路径')
+    parser.add_argument('--calib', type=str, help='校准图片目录（不指定则跳过量化，仅生成报告）')
+    parser.add_argument('--eval', type=str, help='评估图片目录或文件（不指定则不生成报告）')
+    parser.add_argument('--imgsz', type=int, default=640, help='输入尺寸')
+    parser.add_argument('--conf', type=float, default=0.25, help='置信度阈值')
+    parser.add_argument('--max-calib', type=int, default=200, help='最多使用的校准图片数')
+    parser.add_argument('--per-channel', action='store_true', help='权重逐通道量化')
+    parser.add_argument('--report', type=str, default=None, help='报告输出文件（默认按时间命名）')
+    args = parser.parse_args()
+
+    if not args.calib and not args.eval:
+        parser.print_help()
+        return
+
+    if args.calib:
+        quantize_model(args.model, args.calib, args.imgsz, args.max_calib, args.per_channel)
+
+    if args.eval:
+        if not os.path.exists(exported_model_path(args.model, 'onnx-int8')):
+            print("未找到INT8模型，请先使用 --calib 进行量化")
+            return
+        report = build_report(args.model, args.eval, args.imgsz, args.conf)
+        print_report(report)
+
+        filename = args.report or f"quantization_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"报告已保存到: {filename}")
+
+if __name__ == '__main__':
+    main()
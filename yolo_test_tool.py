@@ -1,25 +1,39 @@
 import argparse
+import os
 import cv2
-from ultralytics import YOLO
+from mods.detections import parse_results
+from mods.inference_backend import load_model, SUPPORTED_BACKENDS
 import numpy as np
 
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
 
-def run_yolo_on_image(model_path, image_path, conf=0.25, show=True):
-    model = YOLO(model_path)
+
+def list_images(path):
+    """列出图片路径：path为图片文件时返回其本身，为目录时返回目录下所有图片（按文件名排序）"""
+    if os.path.isdir(path):
+        return sorted(
+            os.path.join(path, name) for name in os.listdir(path)
+            if name.lower().endswith(IMAGE_EXTENSIONS)
+        )
+    return [path]
+
+def load_image(image_path):
+    """读取图片，失败时打印提示并返回None"""
     image = cv2.imread(image_path)
     if image is None:
         print(f"无法读取图片: {image_path}")
+    return image
+
+def run_yolo_on_image(model_path, image_path, conf=0.25, show=True, backend='pytorch'):
+    model, _ = load_model(model_path, backend)
+    image = load_image(image_path)
+    if image is None:
         return
     results = model.predict(image, conf=conf)
-    for result in results:
-        boxes = result.boxes
-        if boxes is not None:
-            for box in boxes:
-                x1, y1, x2, y2 = map(int, box.xyxy[0].cpu().numpy())
-                conf_score = float(box.conf[0].cpu().numpy())
-                class_id = int(box.cls[0].cpu().numpy())
-                cv2.rectangle(image, (x1, y1), (x2, y2), (0, 255, 0), 2)
-                cv2.putText(image, f"{class_id}:{conf_score:.2f}", (x1, y1-10), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0,255,0), 2)
+    detections = parse_results(results)
+    for (x1, y1, x2, y2), conf_score, class_id in zip(detections['bbox'].astype(int).tolist(), detections['conf'], detections['cls']):
+        cv2.rectangle(image, (x1, y1), (x2, y2), (0, 255, 0), 2)
+        cv2.putText(image, f"{class_id}:{conf_score:.2f}", (x1, y1-10), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0,255,0), 2)
     if show:
         cv2.imshow("YOLO Detection", image)
         cv2.waitKey(0)
@@ -31,9 +45,10 @@ def main():
     parser.add_argument('--model', type=str, default='mods/best.pt', help='模型路径')
     parser.add_argument('--image', type=str, required=True, help='待检测图片路径')
     parser.add_argument('--conf', type=float, default=0.25, help='置信度阈值')
+    parser.add_argument('--backend', type=str, default='pytorch', choices=SUPPORTED_BACKENDS, help='推理后端')
     parser.add_argument('--noshow', action='store_true', help='不显示检测结果窗口')
     args = parser.parse_args()
-    run_yolo_on_image(args.model, args.image, conf=args.conf, show=not args.noshow)
+    run_yolo_on_image(args.model, args.image, conf=args.conf, show=not args.noshow, backend=args.backend)
 
 if __name__ == '__main__':
     main()